@@ -0,0 +1,3 @@
+"""
+Benchmarks for the extraction and load stages on synthetic NYC taxi data
+"""
@@ -0,0 +1,300 @@
+"""
+Deterministic generator of synthetic NYC taxi raw files for benchmarking
+
+Trip files follow the TLC layout of the schemas in src/extract/schemas.py:
+trips are spread over the month with a daily profile, pickup and dropoff
+zones are Zipf-skewed towards a few busy zones, distances and durations are
+log-normal, fares are derived from them, a small share of trips fall outside
+the month, and ~1% of yellow (~4% of green) rows belong to the "unknown
+vendor" block whose vendor, passenger, rate code, flag and payment fields are
+empty. The same seed and row count always produce the same bytes.
+"""
+import argparse
+import lzma
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pv
+
+from src.extract.schemas import GREEN_TAXI_SCHEMA, YELLOW_TAXI_SCHEMA
+from src.utils.config import Config
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Rows generated (and held in memory) at a time; also the unit of seeding
+GENERATOR_CHUNK_ROWS = 1_000_000
+
+ZONE_COUNT = 265
+
+# Input compression -> raw file suffix (None writes plain CSV)
+INPUT_SUFFIXES = {
+    None: ".csv",
+    "gzip": ".csv.gz",
+    "bz2": ".csv.bz2",
+    "zstd": ".csv.zst",
+    "xz": ".csv.xz",
+}
+
+# Relative pickup volume per hour of day
+_HOURLY_PROFILE = np.array([
+    0.9, 0.6, 0.45, 0.3, 0.25, 0.3, 0.7, 1.2, 1.5, 1.45, 1.35, 1.4,
+    1.5, 1.5, 1.6, 1.65, 1.6, 1.8, 2.0, 1.9, 1.7, 1.6, 1.5, 1.2,
+])
+
+# Per color: source name, pickup/dropoff prefix, vendor weights, share of
+# unknown-vendor rows and share of trips paying the congestion surcharge
+_TRIP_SOURCES = {
+    "yellow": {"name": "Yellow Taxi", "prefix": "tpep", "schema": YELLOW_TAXI_SCHEMA,
+               "vendors": ([1, 2, 4], [0.33, 0.66, 0.01]), "unknown_rate": 0.01,
+               "congestion": (2.5, 0.92)},
+    "green": {"name": "Green Taxi", "prefix": "lpep", "schema": GREEN_TAXI_SCHEMA,
+              "vendors": ([1, 2], [0.2, 0.8]), "unknown_rate": 0.04,
+              "congestion": (2.75, 0.15)},
+}
+
+# Share of trips whose pickup falls before the month (TLC files carry a few)
+_STRAY_RATE = 0.0002
+
+
+def zone_weights(seed: int) -> np.ndarray:
+    """
+    Zipf-like pickup/dropoff probabilities over location IDs 1..ZONE_COUNT
+
+    Args:
+        seed: Random seed (the busiest zones depend on it)
+
+    Returns:
+        Probability of each location ID, indexed from 0
+    """
+    rng = np.random.default_rng([seed, 0])
+    weights = 1.0 / np.arange(1, ZONE_COUNT + 1) ** 1.1
+    weights = weights[rng.permutation(ZONE_COUNT)]
+    return weights / weights.sum()
+
+
+def _with_nulls(values: np.ndarray, mask: np.ndarray, type: pa.DataType) -> pa.Array:
+    """Build an Arrow array with nulls where mask is set"""
+    return pa.array(values, type=type, mask=mask)
+
+
+def trip_chunk(color: str, rows: int, month: str, seed: int, index: int,
+               zones: np.ndarray) -> pa.Table:
+    """
+    Generate one chunk of trips
+
+    Args:
+        color: "yellow" or "green"
+        rows: Number of trips
+        month: Month of the trips (YYYY-MM)
+        seed: Random seed of the dataset
+        index: Chunk number, mixed into the seed
+        zones: Output of zone_weights
+
+    Returns:
+        Table with the columns of the color's raw schema, in file order
+    """
+    source = _TRIP_SOURCES[color]
+    rng = np.random.default_rng([seed, list(_TRIP_SOURCES).index(color) + 1, index])
+    month_start = np.datetime64(f"{month}-01T00:00:00", "s")
+    month_end = (np.datetime64(month, "M") + 1).astype("datetime64[s]")
+    days = int((month_end - month_start) // np.timedelta64(1, "D"))
+
+    # Pickups: uniform over the days, daily profile over the hours, a few strays
+    hours = rng.choice(24, size=rows, p=_HOURLY_PROFILE / _HOURLY_PROFILE.sum())
+    offsets = rng.integers(0, days, rows) * 86400 + hours * 3600 + rng.integers(0, 3600, rows)
+    strays = rng.random(rows) < _STRAY_RATE
+    offsets[strays] -= rng.integers(1, 400, int(strays.sum())) * 86400
+    pickup = month_start + offsets.astype("timedelta64[s]")
+
+    minutes = np.clip(rng.lognormal(np.log(11), 0.6, rows), 1, 180)
+    dropoff = pickup + (minutes * 60).astype("timedelta64[s]")
+    speed = rng.lognormal(np.log(11), 0.35, rows)
+    distance = np.round(np.where(rng.random(rows) < 0.01, 0.0, speed * minutes / 60), 2)
+
+    unknown = rng.random(rows) < source["unknown_rate"]
+    payment = rng.choice([1, 2, 3, 4], size=rows, p=[0.70, 0.28, 0.012, 0.008])
+    fare = np.round(2.5 + 2.0 * distance + 0.25 * minutes, 2)
+    extra = rng.choice([0.0, 0.5, 1.0, 2.5, 3.0], size=rows, p=[0.35, 0.3, 0.2, 0.1, 0.05])
+    mta_tax = np.full(rows, 0.5)
+    tip = np.where(payment == 1, np.round(fare * rng.uniform(0.1, 0.3, rows), 2), 0.0)
+    tolls = np.where(rng.random(rows) < 0.04, 6.12, 0.0)
+    improvement = np.full(rows, 0.3)
+    surcharge, surcharge_rate = source["congestion"]
+    congestion = np.where(rng.random(rows) < surcharge_rate, surcharge, 0.0)
+    total = np.round(fare + extra + mta_tax + tip + tolls + improvement + congestion, 2)
+
+    vendor_ids, vendor_weights = source["vendors"]
+    columns = {
+        "VendorID": _with_nulls(rng.choice(vendor_ids, size=rows, p=vendor_weights),
+                                unknown, pa.int64()),
+        f"{source['prefix']}_pickup_datetime": pa.array(pickup),
+        f"{source['prefix']}_dropoff_datetime": pa.array(dropoff),
+        "passenger_count": _with_nulls(
+            rng.choice(7, size=rows, p=[0.02, 0.70, 0.14, 0.04, 0.02, 0.05, 0.03]),
+            unknown, pa.int64()
+        ),
+        "trip_distance": pa.array(distance),
+        "RatecodeID": _with_nulls(
+            rng.choice([1, 2, 3, 4, 5, 99], size=rows,
+                       p=[0.965, 0.022, 0.002, 0.001, 0.009, 0.001]),
+            unknown, pa.int64()
+        ),
+        "store_and_fwd_flag": _with_nulls(np.where(rng.random(rows) < 0.01, "Y", "N"),
+                                          unknown, pa.string()),
+        "PULocationID": pa.array(rng.choice(ZONE_COUNT, size=rows, p=zones) + 1),
+        "DOLocationID": pa.array(rng.choice(ZONE_COUNT, size=rows, p=zones) + 1),
+        "payment_type": _with_nulls(payment, unknown, pa.int64()),
+        "fare_amount": pa.array(fare),
+        "extra": pa.array(extra),
+        "mta_tax": pa.array(mta_tax),
+        "tip_amount": pa.array(tip),
+        "tolls_amount": pa.array(tolls),
+        "ehail_fee": pa.nulls(rows, pa.float64()),
+        "improvement_surcharge": pa.array(improvement),
+        "total_amount": pa.array(total),
+        "trip_type": _with_nulls(rng.choice([1, 2], size=rows, p=[0.97, 0.03]),
+                                 unknown, pa.int64()),
+        "congestion_surcharge": pa.array(congestion),
+    }
+    return pa.table({field.name: columns[field.name] for field in source["schema"]})
+
+
+def generate_trips(color: str, rows: int, month: str = "2019-12",
+                   seed: int = 42) -> Iterator[pa.Table]:
+    """
+    Generate trips of one color in chunks of at most GENERATOR_CHUNK_ROWS
+
+    Args:
+        color: "yellow" or "green"
+        rows: Total number of trips
+        month: Month of the trips (YYYY-MM)
+        seed: Random seed
+
+    Yields:
+        Trip tables
+    """
+    zones = zone_weights(seed)
+    for index, start in enumerate(range(0, rows, GENERATOR_CHUNK_ROWS)):
+        yield trip_chunk(color, min(GENERATOR_CHUNK_ROWS, rows - start), month, seed, index, zones)
+
+
+def zone_lookup() -> pa.Table:
+    """
+    Build a taxi zone lookup shaped like the TLC one
+
+    Returns:
+        Table of LocationID, Borough, Zone and service_zone; 264 and 265 are
+        the unknown zones with empty fields, as in the TLC file
+    """
+    boroughs = ["Manhattan", "Brooklyn", "Queens", "Bronx", "Staten Island"]
+    rows = {"LocationID": [], "Borough": [], "Zone": [], "service_zone": []}
+    for location_id in range(1, ZONE_COUNT + 1):
+        if location_id == 1:
+            borough, zone, service_zone = "EWR", "Newark Airport", "EWR"
+        elif location_id >= 264:
+            borough, zone, service_zone = "Unknown", "NV" if location_id == 264 else None, None
+        else:
+            borough = boroughs[location_id % len(boroughs)]
+            zone = f"Zone {location_id}"
+            service_zone = "Yellow Zone" if borough == "Manhattan" else "Boro Zone"
+            if location_id in (132, 138):
+                service_zone = "Airports"
+        for column, value in zip(rows, (location_id, borough, zone, service_zone)):
+            rows[column].append(value)
+    return pa.table(rows)
+
+
+def _open_output(path: Path, compression: Optional[str]) -> Union[pa.NativeFile, BinaryIO]:
+    """Open a raw file for writing, compressed with the given codec"""
+    if compression == "xz":
+        return lzma.open(path, "wb")
+    return pa.output_stream(str(path), compression=compression)
+
+
+def write_csv(tables: Iterator[pa.Table], path: Path, compression: Optional[str] = None) -> int:
+    """
+    Write tables to one CSV file with an unquoted header, as the TLC files have
+
+    Args:
+        tables: Tables sharing one schema
+        path: Output file
+        compression: None, "gzip", "bz2", "zstd" or "xz"
+
+    Returns:
+        Number of rows written
+    """
+    rows = 0
+    with _open_output(path, compression) as sink:
+        for table in tables:
+            if not rows:
+                sink.write((",".join(table.column_names) + "\n").encode())
+            pv.write_csv(table, sink, pv.WriteOptions(include_header=False, quoting_style="none"))
+            rows += table.num_rows
+    return rows
+
+
+def generate_dataset(
+    data_dir: str,
+    rows: int,
+    green_rows: int = None,
+    month: str = "2019-12",
+    seed: int = 42,
+    compression: Optional[str] = None,
+    overwrite: bool = False
+) -> Dict[str, str]:
+    """
+    Write yellow and green trip files and the zone lookup into data_dir
+
+    Files are named like the raw TLC files (so data_dir can also be used as a
+    raw data directory) and are reused if they already exist.
+
+    Args:
+        data_dir: Output directory
+        rows: Yellow trips
+        green_rows: Green trips (defaults to a tenth of rows, about the TLC ratio)
+        month: Month of the trips (YYYY-MM)
+        seed: Random seed
+        compression: Compression of the trip files (None for plain CSV)
+        overwrite: Regenerate files that already exist
+
+    Returns:
+        Mapping of source name to file path
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    counts = {"yellow": rows, "green": rows // 10 if green_rows is None else green_rows}
+
+    paths = {}
+    for color, count in counts.items():
+        path = data_dir / f"{color}_tripdata_{month}{INPUT_SUFFIXES[compression]}"
+        if overwrite or not path.exists():
+            logger.info(f"Generating {count} {color} trips into {path}")
+            write_csv(generate_trips(color, count, month, seed), path, compression)
+        paths[_TRIP_SOURCES[color]["name"]] = str(path)
+
+    zone_path = data_dir / Config.TAXI_ZONE_CSV
+    if overwrite or not zone_path.exists():
+        write_csv(iter([zone_lookup()]), zone_path)
+    paths["Taxi Zone"] = str(zone_path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic NYC taxi raw files")
+    parser.add_argument("data_dir", help="Output directory")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Yellow trips")
+    parser.add_argument("--green-rows", type=int, help="Green trips (default: rows / 10)")
+    parser.add_argument("--month", default="2019-12", help="Month of the trips (YYYY-MM)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--compression", choices=[c for c in INPUT_SUFFIXES if c])
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args()
+
+    for name, path in generate_dataset(
+        args.data_dir, args.rows, green_rows=args.green_rows, month=args.month,
+        seed=args.seed, compression=args.compression, overwrite=args.overwrite
+    ).items():
+        print(f"{name}: {path}")
@@ -0,0 +1,319 @@
+"""
+Extraction and load benchmarks over engines, chunk sizes and Parquet codecs
+
+Each case converts one synthetic raw file with convert_file in a fresh
+process (so peak RSS is the case's own), then uploads the output through
+GCSUploader to a local bucket directory and streams it back as a stand-in
+for the BigQuery load. Throughput in MB/s is of the raw file as stored
+(compressed bytes for compressed inputs). Results are written as JSON and
+can be compared against a saved baseline:
+
+    python -m benchmarks.run_benchmarks --rows 5000000 --save-baseline
+    python -m benchmarks.run_benchmarks --rows 5000000 --baseline benchmarks/baseline.json
+"""
+import argparse
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+
+from src.extract.extract_parquet import ENGINES, convert_file
+from src.load.load_to_gcp import GCSUploader
+from src.utils.config import Config
+from src.utils.logger import setup_logger
+from .generate_data import INPUT_SUFFIXES, generate_dataset
+from .stand_ins import LocalStorageClient, load_parquet
+
+logger = setup_logger(__name__)
+
+BENCHMARKS_DIR = Path(__file__).parent
+DEFAULT_WORK_DIR = BENCHMARKS_DIR / "data"
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+
+# Fields identifying a case; results with equal keys are compared
+CASE_KEYS = ("source", "rows", "engine", "chunk_size", "codec", "input_compression")
+
+# Metric -> whether higher is better, for baseline comparison
+COMPARED_METRICS = {
+    "rows_per_sec": True,
+    "mb_per_sec": True,
+    "peak_rss_mb": False,
+    "output_bytes": False,
+    "upload_mb_per_sec": True,
+    "load_rows_per_sec": True,
+}
+
+STAGES = ("upload", "load")
+
+_MB = 1024 * 1024
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB (ru_maxrss is KiB on Linux)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (_MB if sys.platform == "darwin" else 1024), 1)
+
+
+def _output_files(output: str) -> List[str]:
+    """List the Parquet files of a conversion output"""
+    path = Path(output)
+    return [str(file) for file in sorted(path.rglob("*.parquet"))] if path.is_dir() else [output]
+
+
+def case_id(case: Dict) -> str:
+    """
+    Build a readable identifier of a case
+
+    Args:
+        case: Dict with the CASE_KEYS fields
+
+    Returns:
+        Identifier such as "yellow_taxi-pyarrow-100000-snappy-plain"
+    """
+    return "-".join([
+        case["source"].replace(" ", "_").lower(), case["engine"], str(case["chunk_size"]),
+        case["codec"], case["input_compression"] or "plain",
+    ])
+
+
+def run_case(case: Dict, path: str, work_dir: str, stages: Sequence[str] = STAGES) -> Dict:
+    """
+    Run one benchmark case; meant to run in its own process
+
+    Config.CHUNK_SIZE and Config.COMPRESSION are set for the case in the
+    calling process.
+
+    Args:
+        case: Dict with the CASE_KEYS fields
+        path: Raw file of the case's source
+        work_dir: Directory for the case's output and local bucket
+        stages: Stages to run after extraction, a subset of STAGES
+
+    Returns:
+        The case fields followed by the measured metrics
+    """
+    Config.CHUNK_SIZE = case["chunk_size"]
+    Config.COMPRESSION = case["codec"]
+    output_dir = Path(work_dir) / "output" / case_id(case)
+    shutil.rmtree(output_dir, ignore_errors=True)
+
+    result = convert_file(case["source"], path, str(output_dir), case["engine"])
+    if result["status"] != "success":
+        raise RuntimeError(f"{case_id(case)} failed: {result['error']}")
+    peak_rss_mb = _peak_rss_mb()
+    files = _output_files(result["output"])
+    input_bytes = os.path.getsize(path)
+    output_bytes = sum(os.path.getsize(file) for file in files)
+    seconds = max(result["seconds"], 1e-6)
+    record = {
+        **{key: case[key] for key in CASE_KEYS},
+        "seconds": result["seconds"],
+        "rows_per_sec": round(result["rows"] / seconds),
+        "mb_per_sec": round(input_bytes / _MB / seconds, 2),
+        "peak_rss_mb": peak_rss_mb,
+        "input_bytes": input_bytes,
+        "output_bytes": output_bytes,
+    }
+
+    if "upload" in stages:
+        bucket_root = Path(work_dir) / "bucket"
+        shutil.rmtree(bucket_root / case_id(case), ignore_errors=True)
+        uploader = GCSUploader(case_id(case), client=LocalStorageClient(str(bucket_root)),
+                               skip_unchanged=False)
+        start = time.perf_counter()
+        uploader.upload_many([(file, f"raw_data/{Path(file).name}") for file in files])
+        upload_seconds = max(time.perf_counter() - start, 1e-6)
+        record["upload_mb_per_sec"] = round(output_bytes / _MB / upload_seconds, 2)
+
+    if "load" in stages:
+        start = time.perf_counter()
+        rows = load_parquet(files)
+        record["load_rows_per_sec"] = round(rows / max(time.perf_counter() - start, 1e-6))
+    return record
+
+
+def run_suite(
+    rows: int,
+    engines: Sequence[str] = ENGINES,
+    chunk_sizes: Sequence[int] = (100_000,),
+    codecs: Sequence[str] = ("snappy",),
+    input_compressions: Sequence[Optional[str]] = (None,),
+    sources: Sequence[str] = ("Yellow Taxi",),
+    work_dir: str = None,
+    stages: Sequence[str] = STAGES,
+    seed: int = 42
+) -> Dict:
+    """
+    Generate the synthetic inputs and run every combination of the parameters
+
+    Args:
+        rows: Yellow trips (green files get a tenth)
+        engines: CSV parsing engines
+        chunk_sizes: Rows per chunk (Config.CHUNK_SIZE)
+        codecs: Parquet compression codecs (Config.COMPRESSION)
+        input_compressions: Compression of the raw files (None for plain CSV)
+        sources: Source names to convert
+        work_dir: Directory for generated inputs, outputs and the local bucket
+            (defaults to benchmarks/data/)
+        stages: Stages to run after extraction, a subset of STAGES
+        seed: Generator seed
+
+    Returns:
+        Dict with "meta" (environment and parameters) and "results" (one
+        record per case, see run_case)
+    """
+    work_dir = Path(work_dir or DEFAULT_WORK_DIR)
+    spawn = multiprocessing.get_context("spawn")
+    results = []
+
+    for input_compression in input_compressions:
+        paths = generate_dataset(
+            str(work_dir / "raw" / f"{rows}-{seed}"), rows, seed=seed, compression=input_compression
+        )
+        for source, engine, chunk_size, codec in itertools.product(
+            sources, engines, chunk_sizes, codecs
+        ):
+            case = {"source": source, "rows": rows, "engine": engine, "chunk_size": chunk_size,
+                    "codec": codec, "input_compression": input_compression}
+            # A fresh process per case keeps ru_maxrss specific to the case
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn, initializer=logging.disable,
+                                     initargs=(logging.INFO,)) as executor:
+                record = executor.submit(
+                    run_case, case, paths[source], str(work_dir), stages
+                ).result()
+            logger.info(
+                f"{case_id(case)}: {record['rows_per_sec']} rows/s, {record['mb_per_sec']} MB/s, "
+                f"peak {record['peak_rss_mb']} MiB, {record['output_bytes']} bytes out"
+            )
+            results.append(record)
+
+    meta = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pyarrow": pa.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float = 0.1) -> List[Dict]:
+    """
+    Find metrics that got worse than the baseline by more than the tolerance
+
+    Args:
+        results: Output of run_suite
+        baseline: Earlier output of run_suite
+        tolerance: Allowed relative change (0.1 = 10%)
+
+    Returns:
+        One dict per regression with case, metric, baseline, current and
+        change (relative, signed so that negative is worse)
+    """
+    def key(record: Dict) -> tuple:
+        return tuple(record[field] for field in CASE_KEYS)
+
+    previous = {key(record): record for record in baseline["results"]}
+    regressions = []
+    for record in results["results"]:
+        before = previous.get(key(record))
+        if before is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if not before.get(metric) or metric not in record:
+                continue
+            change = (record[metric] - before[metric]) / before[metric]
+            if not higher_is_better:
+                change = -change
+            if change < -tolerance:
+                regressions.append({"case": case_id(record), "metric": metric,
+                                     "baseline": before[metric], "current": record[metric],
+                                     "change": round(change, 3)})
+    return regressions
+
+
+def _csv_list(value: str) -> List[str]:
+    """Parse a comma-separated command line value"""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Run the benchmark suite from the command line
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv)
+
+    Returns:
+        Exit code: 1 if a baseline comparison found regressions, 0 otherwise
+    """
+    parser = argparse.ArgumentParser(description="Benchmark extraction and load on synthetic data")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Yellow trips to generate")
+    parser.add_argument("--engines", type=_csv_list, default=list(ENGINES))
+    parser.add_argument("--chunk-sizes", type=lambda v: [int(i) for i in _csv_list(v)],
+                        default=[50_000, 100_000, 500_000])
+    parser.add_argument("--codecs", type=_csv_list, default=["snappy", "zstd", "gzip"],
+                        help="Parquet compression codecs")
+    parser.add_argument("--input-compressions", type=_csv_list, default=["none"],
+                        help=f"Raw file compression: none or {', '.join(c for c in INPUT_SUFFIXES if c)}")
+    parser.add_argument("--sources", type=_csv_list, default=["Yellow Taxi"])
+    parser.add_argument("--skip", type=_csv_list, default=[], help=f"Stages to skip: {STAGES}")
+    parser.add_argument("--work-dir", default=str(DEFAULT_WORK_DIR))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Results JSON (default: <work-dir>/results.json)")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"Also write the results to {DEFAULT_BASELINE}")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Relative change tolerated before a metric counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        args.rows,
+        engines=args.engines,
+        chunk_sizes=args.chunk_sizes,
+        codecs=args.codecs,
+        input_compressions=[None if c == "none" else c for c in args.input_compressions],
+        sources=args.sources,
+        work_dir=args.work_dir,
+        stages=[stage for stage in STAGES if stage not in args.skip],
+        seed=args.seed,
+    )
+    output = Path(args.output or Path(args.work_dir) / "results.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    logger.info(f"Results written to {output}")
+    if args.save_baseline:
+        DEFAULT_BASELINE.write_text(json.dumps(results, indent=2))
+        logger.info(f"Baseline saved to {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for regression in regressions:
+            logger.warning(
+                f"Regression in {regression['case']}: {regression['metric']} "
+                f"{regression['baseline']} -> {regression['current']} ({regression['change']:+.1%})"
+            )
+        if regressions:
+            return 1
+        logger.info(f"No regression beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Local stand-ins for GCS and BigQuery so the load stage can be benchmarked offline
+"""
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional
+
+import pyarrow.parquet as pq
+
+from src.load.load_to_gcp import local_crc32c
+
+_COPY_BLOCK_BYTES = 8 * 1024 * 1024
+
+
+class LocalBlob:
+    """Object of a LocalBucket, stored as a file under the bucket directory"""
+
+    def __init__(self, bucket: "LocalBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+        self.path = bucket.root / name
+
+    @property
+    def crc32c(self) -> str:
+        """Base64 CRC32C of the stored object, as GCS reports it"""
+        return local_crc32c(str(self.path))
+
+    def upload_from_filename(self, filename: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(filename, self.path)
+
+    def upload_from_file(self, file_obj, size: int) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as f:
+            remaining = size
+            while remaining:
+                block = file_obj.read(min(remaining, _COPY_BLOCK_BYTES))
+                if not block:
+                    break
+                f.write(block)
+                remaining -= len(block)
+
+    def compose(self, sources: List["LocalBlob"]) -> None:
+        with open(self.path, "wb") as f:
+            for source in sources:
+                with open(source.path, "rb") as part:
+                    shutil.copyfileobj(part, f)
+
+    def delete(self) -> None:
+        os.remove(self.path)
+
+
+class LocalBucket:
+    """Bucket backed by a local directory"""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def blob(self, name: str, chunk_size: int = None) -> LocalBlob:
+        return LocalBlob(self, name)
+
+    def get_blob(self, name: str) -> Optional[LocalBlob]:
+        blob = LocalBlob(self, name)
+        return blob if blob.path.exists() else None
+
+
+class LocalStorageClient:
+    """
+    Stand-in for google.cloud.storage.Client covering what GCSUploader calls
+
+    Each bucket is a directory under root, so uploads cost a local copy
+    instead of network transfer; the uploader's own work (threading,
+    composite splitting, checksums) is what gets measured.
+    """
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Directory holding one subdirectory per bucket
+        """
+        self.root = Path(root)
+
+    def bucket(self, name: str) -> LocalBucket:
+        return LocalBucket(self.root / name)
+
+
+def load_parquet(paths: List[str], batch_size: int = 65536) -> int:
+    """
+    Stand-in for a BigQuery load job: stream Parquet files back as Arrow batches
+
+    Files are decoded batch by batch, as a load job reads them, without
+    holding a whole table in memory.
+
+    Args:
+        paths: Parquet files
+        batch_size: Rows per decoded batch
+
+    Returns:
+        Number of rows read
+    """
+    rows = 0
+    for path in paths:
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            rows += batch.num_rows
+    return rows
@@ -0,0 +1,11 @@
+{#-
+    First trip_date rebuilt by an incremental run of a trip_date-partitioned
+    insert_overwrite model: the newest partition already built, minus
+    var('trip_lookback_days') days (3 by default, like dbt_project.yml) so
+    late-arriving trips are picked up.
+    _dbt_max_partition is declared by the insert_overwrite strategy and, being
+    a script variable, still lets BigQuery prune partitions of the source.
+-#}
+{% macro trip_lookback_start() -%}
+    DATE_SUB(_dbt_max_partition, INTERVAL {{ var('trip_lookback_days', 3) }} DAY)
+{%- endmacro %}
@@ -1,4 +1,14 @@
-{{ config(materialized='view') }}
+-- Built once per run as a table so the marts read the casts, zone joins and
+-- UNION ALL from storage instead of recomputing the view chain each
+{{ config(
+    materialized='table',
+    partition_by={
+        'field': 'pickup_datetime',
+        'data_type': 'timestamp',
+        'granularity': 'day'
+    },
+    cluster_by=['taxi_color', 'pickup_location_id']
+) }}
 
 -- Union of Green and Yellow taxi trips
 SELECT
@@ -2,6 +2,16 @@
 
 {{ config(materialized='view') }}
 
+{% if var('zones_enriched_at_extract', false) %}
+
+-- Zone columns were added at extraction time, so no lookup join is needed
+SELECT
+    t.*,
+    NULL AS trip_type_code
+FROM {{ ref('stg_yellow_taxi') }} t
+
+{% else %}
+
 SELECT
     t.*,
     COALESCE(pu.zone, 'UNKNOWN') AS pickup_zone,
@@ -16,3 +26,5 @@ LEFT JOIN {{ ref('stg_taxi_zones') }} pu
     ON t.pickup_location_id = pu.location_id
 LEFT JOIN {{ ref('stg_taxi_zones') }} do
     ON t.dropoff_location_id = do.location_id
+
+{% endif %}
@@ -1,4 +1,38 @@
-{{ config(materialized="table") }}
+-- Incremental: each run replaces only the trip_date partitions from the
+-- lookback window onwards. Rebuild everything with dbt run --full-refresh.
+{{
+    config(
+        materialized="incremental",
+        incremental_strategy="insert_overwrite",
+        partition_by={
+            "field": "trip_date",
+            "data_type": "date",
+            "granularity": "day",
+        },
+        cluster_by=["taxi_color", "trip_hour"],
+    )
+}}
+
+{% if var("use_extract_aggregates", false) %}
+
+-- Rolled up from the partial aggregates built during extraction
+-- (EXTRACT_AGGREGATES=true), so int_all_trips is not scanned
+select
+    trip_date,
+    trip_hour,
+    taxi_color,
+    total_trips,
+    total_amount_usd,
+    total_fare_amount_usd,
+    total_tip_amount_usd,
+    avg_trip_distance_miles,
+    avg_passenger_count
+from {{ source('new_york_analytic', 'agg_revenue_breakdown_hourly') }}
+{% if is_incremental() %}
+where trip_date >= {{ trip_lookback_start() }}
+{% endif %}
+
+{% else %}
 
 with
     fact_table_per_hour as (
@@ -19,10 +53,18 @@ with
             round(avg(passenger_count), 2) as avg_passenger_count
         from {{ ref("int_all_trips") }}
 
-        where trip_distance_miles > 0
+        where
+            trip_distance_miles > 0
+            {% if is_incremental() %}
+                -- On the partition column of int_all_trips so only the window
+                -- is scanned
+                and pickup_datetime >= timestamp({{ trip_lookback_start() }})
+            {% endif %}
 
         group by trip_date, trip_hour, taxi_color
     )
 
 select *
 from fact_table_per_hour
+
+{% endif %}
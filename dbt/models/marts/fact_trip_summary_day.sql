@@ -1,4 +1,35 @@
-{{ config(materialized='table') }}
+-- Incremental: each run replaces only the trip_date partitions from the
+-- lookback window onwards, so cost follows the new data, not all history.
+-- Rebuild everything with dbt run --full-refresh.
+{{ config(
+    materialized='incremental',
+    incremental_strategy='insert_overwrite',
+    partition_by={
+        'field': 'trip_date',
+        'data_type': 'date',
+        'granularity': 'day'
+    },
+    cluster_by=['taxi_color']
+) }}
+
+{% if var('use_extract_aggregates', false) %}
+
+-- Rolled up from the partial aggregates built during extraction
+-- (EXTRACT_AGGREGATES=true), so int_all_trips is not scanned
+SELECT
+    trip_date,
+    taxi_color,
+    total_trips,
+    total_fare_amount,
+    total_tip_amount,
+    avg_trip_distance,
+    avg_passenger_count
+FROM {{ source('new_york_analytic', 'agg_trip_summary_day') }}
+{% if is_incremental() %}
+WHERE trip_date >= {{ trip_lookback_start() }}
+{% endif %}
+
+{% else %}
 
 WITH fact_table_perday AS (
     SELECT 
@@ -11,9 +42,14 @@ WITH fact_table_perday AS (
         ROUND (AVG(passenger_count),2) AS avg_passenger_count
     FROM {{ ref('int_all_trips') }}
     WHERE trip_distance_miles > 0  -- optional filter to remove zero-distance trips
+    {% if is_incremental() %}
+        -- On the partition column of int_all_trips so only the window is scanned
+        AND pickup_datetime >= TIMESTAMP({{ trip_lookback_start() }})
+    {% endif %}
     GROUP BY trip_date, taxi_color
 )
 
 SELECT *
 FROM fact_table_perday
-ORDER BY trip_date, taxi_color
+
+{% endif %}
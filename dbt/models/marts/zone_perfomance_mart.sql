@@ -1,17 +1,61 @@
-{{ config(materialized='table') }}
+-- Daily partial aggregates per zone pair: sums and non-null counts instead of
+-- averages, so any date range can be rolled up exactly, e.g.
+--   SUM(total_trip_distance) / SUM(trip_distance_count) AS avg_trip_distance
+-- Incremental like the fact marts; rebuild with dbt run --full-refresh.
+{{ config(
+    materialized='incremental',
+    incremental_strategy='insert_overwrite',
+    partition_by={
+        'field': 'trip_date',
+        'data_type': 'date',
+        'granularity': 'day'
+    },
+    cluster_by=['taxi_color', 'pickup_zone', 'dropoff_zone']
+) }}
+
+{% if var('use_extract_aggregates', false) %}
+
+-- Rolled up from the partial aggregates built during extraction
+-- (EXTRACT_AGGREGATES=true), so int_all_trips is not scanned
+SELECT
+    trip_date,
+    total_trips,
+    pickup_zone,
+    dropoff_zone,
+    total_fare_amount,
+    total_tip_amount,
+    total_trip_distance,
+    trip_distance_count,
+    total_passenger_count,
+    passenger_count_count,
+    taxi_color
+FROM {{ source('new_york_analytic', 'agg_zone_performance') }}
+{% if is_incremental() %}
+WHERE trip_date >= {{ trip_lookback_start() }}
+{% endif %}
+
+{% else %}
 
 WITH popular_zone AS (
     SELECT 
+        DATE(pickup_datetime) AS trip_date,
         COUNT(*) AS total_trips,
         pickup_zone,
         dropoff_zone,
         ROUND(SUM(fare_amount_usd), 2) AS total_fare_amount,
         ROUND(SUM(tip_amount_usd), 2) AS total_tip_amount,
-        ROUND(AVG(trip_distance_miles), 2) AS avg_trip_distance,
-        ROUND(AVG(passenger_count), 2) AS avg_passenger_count,
+        SUM(trip_distance_miles) AS total_trip_distance,
+        COUNT(trip_distance_miles) AS trip_distance_count,
+        SUM(passenger_count) AS total_passenger_count,
+        COUNT(passenger_count) AS passenger_count_count,
         taxi_color
     FROM {{ ref('int_all_trips') }}
-    GROUP BY pickup_zone, dropoff_zone, taxi_color
+    {% if is_incremental() %}
+    WHERE pickup_datetime >= TIMESTAMP({{ trip_lookback_start() }})
+    {% endif %}
+    GROUP BY trip_date, pickup_zone, dropoff_zone, taxi_color
 )
 
 SELECT * FROM popular_zone
+
+{% endif %}
@@ -7,7 +7,7 @@
 
 WITH raw_green_data AS (
     SELECT * 
-    FROM `taxi-transport-analytics.new_york_analytic.green_taxi`
+    FROM {{ source('new_york_analytic', 'green_taxi') }}
 ),
 
 final_green_stg AS (
@@ -32,6 +32,15 @@ final_green_stg AS (
         CAST(payment_type AS INT64) AS payment_type_code,
         CAST(trip_type AS INT64) AS trip_type_code,
         CAST(congestion_surcharge AS FLOAT64) AS congestion_surcharge_usd
+        {%- if var('zones_enriched_at_extract', false) %},
+        -- Added during extraction from the taxi zone lookup (ENRICH_ZONES=true)
+        pickup_zone,
+        pickup_borough,
+        pickup_service_zone,
+        dropoff_zone,
+        dropoff_borough,
+        dropoff_service_zone
+        {%- endif %}
     FROM raw_green_data
 )
 
@@ -7,7 +7,7 @@
 WITH raw_taxi_data AS( 
 
     SELECT * 
-    FROM `taxi-transport-analytics.new_york_analytic.taxi_zone`
+    FROM {{ source('new_york_analytic', 'taxi_zone') }}
 )
 ,
 final_taxizone  AS (
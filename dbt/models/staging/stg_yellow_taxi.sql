@@ -7,7 +7,7 @@
 
 WITH raw_yellow_data AS (
     SELECT * 
-    FROM `taxi-transport-analytics.new_york_analytic.yellow_taxi`
+    FROM {{ source('new_york_analytic', 'yellow_taxi') }}
 ),
 
 final_yellow_stg AS (
@@ -30,6 +30,15 @@ final_yellow_stg AS (
         CAST(total_amount AS FLOAT64) AS total_amount_usd,
         CAST(payment_type AS INT64) AS payment_type_code,
         CAST(congestion_surcharge AS FLOAT64) AS congestion_surcharge_usd
+        {%- if var('zones_enriched_at_extract', false) %},
+        -- Added during extraction from the taxi zone lookup (ENRICH_ZONES=true)
+        pickup_zone,
+        pickup_borough,
+        pickup_service_zone,
+        dropoff_zone,
+        dropoff_borough,
+        dropoff_service_zone
+        {%- endif %}
     FROM raw_yellow_data
 )
 
@@ -2,10 +2,11 @@
 Transport ELT Pipeline DAG
 Runs every Sunday to extract, load, and transform taxi data
 """
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from airflow import DAG
+from airflow.decorators import task, task_group
 from airflow.operators.python import PythonOperator
-from airflow.operators.bash import BashOperator
 from airflow.utils.dates import days_ago
 import sys
 import os
@@ -15,8 +16,21 @@ PROJECT_ROOT = '/workspaces/transport_elt'
 sys.path.insert(0, PROJECT_ROOT)
 
 # Import from new src structure
+from src.extract.aggregates import write_aggregates
 from src.extract.extract_parquet import run_extraction
-from src.load.load_to_gcp import run_load
+from src.extract.sources import discover_sources
+from src.load.load_to_gcp import UploadQueue, run_load
+from src.transform.dbt_build import run_dbt_build
+from src.utils import metrics
+from src.utils.config import Config
+
+RAW_DATA_DIR = f"{PROJECT_ROOT}/dbt/raw_data"
+OUTPUT_DIR = f"{PROJECT_ROOT}/raw_parquet"
+CREDENTIALS_PATH = f"{PROJECT_ROOT}/config/credentials/taxi-transport-analytics-fbfa6653d305.json"
+
+# Caps the per-file extract and upload tasks running at once across the
+# deployment; created by airflow-init in orchestration/docker-compose.yml
+SOURCE_POOL = 'transport_elt_sources'
 
 # Default arguments for the DAG
 default_args = {
@@ -40,72 +54,131 @@ dag = DAG(
 )
 
 
-def extract_to_parquet():
-    """Extract CSV files and convert to Parquet format using src module"""
-    # Use backward compatible paths
-    raw_data_dir = f"{PROJECT_ROOT}/dbt/raw_data"
-    output_dir = f"{PROJECT_ROOT}/raw_parquet"
-
-    run_extraction(
-        base_path=PROJECT_ROOT,
-        raw_data_dir=raw_data_dir,
-        output_dir=output_dir
+@contextmanager
+def task_metrics(name, run_id, ti):
+    """Record the task's stage metrics under the DAG run, write them to METRICS_DIR and push them to XCom"""
+    with metrics.recording(metrics.MetricsRecorder(run_id=run_id)) as recorder:
+        try:
+            yield recorder
+        finally:
+            recorder.write_summary(name)
+            if ti is not None:
+                ti.xcom_push(key='metrics', value=recorder.summary())
+
+
+def extract_source(output, run_id=None, ti=None):
+    """Extract one source CSV (e.g. yellow_taxi_2019-12) to Parquet and return its output name"""
+    with task_metrics(f"extract_{output}", run_id, ti):
+        # Raises ExtractionError on failure, so a retry only converts this file
+        if not Config.STREAM_UPLOADS:
+            run_extraction(
+                base_path=PROJECT_ROOT,
+                raw_data_dir=RAW_DATA_DIR,
+                output_dir=OUTPUT_DIR,
+                outputs=[output]
+            )
+            return output
+
+        # Upload each finished Parquet file while extraction continues; the upload
+        # task then skips the already uploaded files
+        Config.set_gcp_credentials(CREDENTIALS_PATH)
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        with UploadQueue(OUTPUT_DIR) as uploads:
+            run_extraction(
+                base_path=PROJECT_ROOT,
+                raw_data_dir=RAW_DATA_DIR,
+                output_dir=OUTPUT_DIR,
+                on_output=uploads.submit,
+                outputs=[output]
+            )
+        return output
+
+
+def upload_output(output, run_id=None, ti=None):
+    """Upload one Parquet output to GCS; load_tables loads it once every file is uploaded"""
+    with task_metrics(f"upload_{output}", run_id, ti):
+        run_load(
+            base_path=PROJECT_ROOT,
+            credentials_path=CREDENTIALS_PATH,
+            data_dir=OUTPUT_DIR,
+            outputs=[output],
+            load=False
+        )
+
+
+def load_tables(run_id=None, ti=None):
+    """Load each raw table once from all of its uploaded months"""
+    # One task instead of one per month: each table load replaces the table
+    # from every month uploaded, so concurrent month loads would race
+    with task_metrics("load_tables", run_id, ti):
+        run_load(
+            base_path=PROJECT_ROOT,
+            credentials_path=CREDENTIALS_PATH,
+            data_dir=OUTPUT_DIR,
+            outputs=list(Config.BQ_TABLES),
+            upload=False
+        )
+
+
+def load_aggregates(run_id=None, ti=None):
+    """Merge the per-source partial aggregates and load them (EXTRACT_AGGREGATES=true)"""
+    if not Config.EXTRACT_AGGREGATES:
+        return
+    write_aggregates(OUTPUT_DIR, f"{RAW_DATA_DIR}/{Config.TAXI_ZONE_CSV}")
+    with task_metrics(f"load_{Config.AGGREGATES_DIR}", run_id, ti):
+        run_load(
+            base_path=PROJECT_ROOT,
+            credentials_path=CREDENTIALS_PATH,
+            data_dir=OUTPUT_DIR,
+            outputs=[Config.AGGREGATES_DIR]
+        )
+
+
+def dbt_build(run_id=None, ti=None):
+    """Build and test the dbt models changed or fed by fresher sources since the last build"""
+    # Per-model timings and bytes billed go to XCom
+    with task_metrics("dbt_build", run_id, ti):
+        return run_dbt_build(
+            project_dir=f"{PROJECT_ROOT}/dbt",
+            profiles_dir=f"{PROJECT_ROOT}/config/dbt",
+            state_dir=f"{PROJECT_ROOT}/dbt/state"
+        )
+
+
+with dag:
+    # Task 1: List the raw files present, one work item per source month
+    @task
+    def discover():
+        return [item["output"] for item in discover_sources(RAW_DATA_DIR)]
+
+    # Task 2: Extract and upload each raw file in its own mapped task group.
+    # Within a group instance, the upload waits only for the extract of the
+    # same file, and a failure retries only that file's task.
+    @task_group(group_id='source')
+    def process_source(output):
+        extract = task(extract_source, task_id='extract_csv_to_parquet', pool=SOURCE_POOL)
+        upload = task(upload_output, task_id='upload_to_gcs', pool=SOURCE_POOL)
+        return upload(extract(output))
+
+    sources = process_source.expand(output=discover())
+
+    # Task 3: Load each raw table once every file is uploaded
+    load_tables_task = PythonOperator(
+        task_id='load_to_bigquery',
+        python_callable=load_tables,
     )
 
-
-def load_to_gcp():
-    """Load Parquet files to GCS and BigQuery using src module"""
-    credentials_path = f"{PROJECT_ROOT}/config/credentials/taxi-transport-analytics-fbfa6653d305.json"
-    data_dir = f"{PROJECT_ROOT}/raw_parquet"
-
-    run_load(
-        base_path=PROJECT_ROOT,
-        credentials_path=credentials_path,
-        data_dir=data_dir
+    # Task 4: Merge and load extraction-time aggregates once every file is done
+    aggregates_task = PythonOperator(
+        task_id='load_aggregates',
+        python_callable=load_aggregates,
     )
 
+    # Task 5: Build and test the dbt models in one dbt invocation
+    dbt_build_task = PythonOperator(
+        task_id='dbt_build',
+        python_callable=dbt_build,
+    )
 
-# Task 1: Extract CSV to Parquet
-extract_task = PythonOperator(
-    task_id='extract_csv_to_parquet',
-    python_callable=extract_to_parquet,
-    dag=dag,
-)
-
-# Task 2: Load to GCS and BigQuery
-load_task = PythonOperator(
-    task_id='load_to_gcp',
-    python_callable=load_to_gcp,
-    dag=dag,
-)
-
-# Task 3: Run dbt models (staging layer)
-dbt_staging = BashOperator(
-    task_id='dbt_run_staging',
-    bash_command=f'cd {PROJECT_ROOT} && dbt run --models staging --profiles-dir {PROJECT_ROOT}/config/dbt --project-dir {PROJECT_ROOT}/dbt',
-    dag=dag,
-)
-
-# Task 4: Run dbt models (intermediate layer)
-dbt_intermediate = BashOperator(
-    task_id='dbt_run_intermediate',
-    bash_command=f'cd {PROJECT_ROOT} && dbt run --models intermediate --profiles-dir {PROJECT_ROOT}/config/dbt --project-dir {PROJECT_ROOT}/dbt',
-    dag=dag,
-)
-
-# Task 5: Run dbt models (marts layer)
-dbt_marts = BashOperator(
-    task_id='dbt_run_marts',
-    bash_command=f'cd {PROJECT_ROOT} && dbt run --models marts --profiles-dir {PROJECT_ROOT}/config/dbt --project-dir {PROJECT_ROOT}/dbt',
-    dag=dag,
-)
-
-# Task 6: Run dbt tests
-dbt_test = BashOperator(
-    task_id='dbt_test',
-    bash_command=f'cd {PROJECT_ROOT} && dbt test --profiles-dir {PROJECT_ROOT}/config/dbt --project-dir {PROJECT_ROOT}/dbt',
-    dag=dag,
-)
-
-# Define task dependencies (pipeline flow)
-extract_task >> load_task >> dbt_staging >> dbt_intermediate >> dbt_marts >> dbt_test
+    # Define task dependencies (pipeline flow)
+    sources >> [load_tables_task, aggregates_task] >> dbt_build_task
@@ -2,6 +2,25 @@
 Extract module for data extraction and transformation to Parquet format
 """
 
-from .extract_parquet import run_extraction, returnBatches, return_parquet
+from .extract_parquet import (
+    run_extraction,
+    returnBatches,
+    return_parquet,
+    convert_file,
+    ExtractionError,
+)
+from .sources import discover_sources, output_name
+from .aggregates import write_aggregates
+from .schemas import get_schema
 
-__all__ = ["run_extraction", "returnBatches", "return_parquet"]
+__all__ = [
+    "run_extraction",
+    "returnBatches",
+    "return_parquet",
+    "convert_file",
+    "discover_sources",
+    "output_name",
+    "write_aggregates",
+    "ExtractionError",
+    "get_schema",
+]
@@ -0,0 +1,325 @@
+"""
+Partial trip aggregates built during extraction for the daily, hourly and zone marts
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from ..utils.config import Config
+from ..utils.logger import setup_logger
+from .zones import ZoneEnricher
+
+logger = setup_logger(__name__)
+
+# Source name -> taxi_color value used by int_all_trips
+TAXI_COLORS: Dict[str, str] = {
+    "Yellow Taxi": "yellow",
+    "Green Taxi": "green",
+}
+
+# Finest grain kept; every mart is a roll-up of it. has_distance mirrors the
+# marts' trip_distance_miles > 0 filter so filtered and unfiltered roll-ups
+# can both be derived.
+GROUP_KEYS = [
+    "trip_date", "trip_hour", "taxi_color",
+    "pickup_location_id", "dropoff_location_id", "has_distance",
+]
+
+# Mergeable measures: sums, non-null counts (for averages) and the trip count
+MEASURES = [
+    "trips",
+    "fare_amount_sum", "tip_amount_sum", "total_amount_sum",
+    "trip_distance_sum", "trip_distance_count",
+    "passenger_count_sum", "passenger_count_count",
+]
+
+# Columns of zone_perfomance_mart, in its order: daily sums and non-null
+# counts per zone pair, so any date range rolls up exactly
+ZONE_PERFORMANCE_COLUMNS = [
+    "trip_date", "total_trips", "pickup_zone", "dropoff_zone",
+    "total_fare_amount", "total_tip_amount",
+    "total_trip_distance", "trip_distance_count",
+    "total_passenger_count", "passenger_count_count",
+    "taxi_color",
+]
+
+PARTIALS_DIR = "partials"
+
+# Compact the buffered partials once they hold this many groups
+_COMPACT_ROWS = 1_000_000
+
+
+def _renamed(table: pa.Table, names: Dict[str, str]) -> pa.Table:
+    """Rename group-by output columns and order them as GROUP_KEYS + MEASURES"""
+    table = table.rename_columns([names.get(name, name) for name in table.column_names])
+    return table.select(GROUP_KEYS + MEASURES)
+
+
+def _merge(partials: List[pa.Table]) -> pa.Table:
+    """Sum the measures of partial aggregates sharing the same group keys"""
+    merged = pa.concat_tables(partials).group_by(GROUP_KEYS).aggregate(
+        [(measure, "sum") for measure in MEASURES]
+    )
+    return _renamed(merged, {f"{measure}_sum": measure for measure in MEASURES})
+
+
+class TripAggregator:
+    """
+    Extraction stage that accumulates partial aggregates of trip chunks
+
+    Called with each Arrow table on its way to the Parquet writer and returns
+    it unchanged. Each chunk is reduced with a vectorized Arrow group-by to
+    one row per (date, hour, zone pair, has_distance); buffered partials are
+    summed together whenever they grow past a threshold, so memory follows the
+    number of groups rather than the number of trips.
+    """
+
+    def __init__(self, color: str, pickup_column: str):
+        """
+        Args:
+            color: taxi_color of the source ("yellow" or "green")
+            pickup_column: Pickup timestamp column of the source
+        """
+        self.color = color
+        self.pickup_column = pickup_column
+        # Source columns read by update
+        self.columns = [
+            pickup_column, "PULocationID", "DOLocationID", "trip_distance",
+            "passenger_count", "fare_amount", "tip_amount", "total_amount",
+        ]
+        self._partials: List[pa.Table] = []
+        self._buffered_rows = 0
+
+    def __call__(self, table: pa.Table) -> pa.Table:
+        self.update(table)
+        return table
+
+    def update(self, table: pa.Table) -> None:
+        """
+        Add the partial aggregate of one chunk
+
+        Args:
+            table: Trip chunk with the declared source columns
+        """
+        pickup = table[self.pickup_column]
+        distance = pc.cast(table["trip_distance"], pa.float64())
+        keyed = pa.table({
+            "trip_date": pc.cast(pickup, pa.date32()),
+            "trip_hour": pc.cast(pc.hour(pickup), pa.int8()),
+            "taxi_color": pa.repeat(pa.scalar(self.color), table.num_rows),
+            "pickup_location_id": table["PULocationID"],
+            "dropoff_location_id": table["DOLocationID"],
+            "has_distance": pc.fill_null(pc.greater(distance, 0), False),
+            "fare_amount": table["fare_amount"],
+            "tip_amount": table["tip_amount"],
+            "total_amount": table["total_amount"],
+            "trip_distance": distance,
+            "passenger_count": pc.cast(table["passenger_count"], pa.int64()),
+        })
+        partial = keyed.group_by(GROUP_KEYS).aggregate([
+            ([], "count_all"),
+            ("fare_amount", "sum"),
+            ("tip_amount", "sum"),
+            ("total_amount", "sum"),
+            ("trip_distance", "sum"),
+            ("trip_distance", "count"),
+            ("passenger_count", "sum"),
+            ("passenger_count", "count"),
+        ])
+        self._partials.append(_renamed(partial, {"count_all": "trips"}))
+        self._buffered_rows += self._partials[-1].num_rows
+        if self._buffered_rows > _COMPACT_ROWS:
+            self._partials = [_merge(self._partials)]
+            self._buffered_rows = self._partials[0].num_rows
+
+    def result(self) -> Optional[pa.Table]:
+        """
+        Merge the buffered partials
+
+        Returns:
+            Aggregate table, or None if no chunk was seen
+        """
+        if not self._partials:
+            return None
+        return _merge(self._partials)
+
+    def write(self, path: Path) -> int:
+        """
+        Write the merged aggregate of the source
+
+        Args:
+            path: Output Parquet file
+
+        Returns:
+            Number of groups written
+        """
+        table = self.result()
+        if table is None:
+            return 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(table, path, compression=Config.COMPRESSION)
+        logger.info(f"Partial aggregates written: {path} ({table.num_rows} groups)")
+        return table.num_rows
+
+
+def partial_path(output_dir: Path, stem: str) -> Path:
+    """
+    Get the location of a source's partial aggregate
+
+    Args:
+        output_dir: Processed data directory
+        stem: Output name of the source (e.g. "yellow_taxi")
+
+    Returns:
+        Path of <output_dir>/aggregates/partials/<stem>.parquet
+    """
+    return Path(output_dir) / Config.AGGREGATES_DIR / PARTIALS_DIR / f"{stem}.parquet"
+
+
+def _round(values: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Round to cents the way BigQuery's ROUND(x, 2) does"""
+    return pc.round(values, 2, round_mode="half_towards_infinity")
+
+
+def _average(total: pa.ChunkedArray, count: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Average from a sum and a non-null count, null where nothing was counted like AVG"""
+    count = pc.cast(count, pa.float64())
+    return _round(pc.if_else(
+        pc.greater(count, 0), pc.divide(pc.cast(total, pa.float64()), count), None
+    ))
+
+
+def _roll_up(trips: pa.Table, keys: List[str], names: Dict[str, str]) -> pa.Table:
+    """
+    Roll the fine-grained aggregate up to mart grain
+
+    Args:
+        trips: Merged aggregate (GROUP_KEYS + MEASURES)
+        keys: Mart group keys
+        names: Mart column name for each of total_trips, total_amount,
+            total_fare, total_tip, avg_distance and avg_passengers (omitted
+            entries are not output)
+
+    Returns:
+        Table with the keys followed by the named mart columns
+    """
+    grouped = trips.group_by(keys).aggregate([(measure, "sum") for measure in MEASURES])
+    sums = {measure: grouped[f"{measure}_sum"] for measure in MEASURES}
+    columns = {
+        "total_trips": sums["trips"],
+        "total_amount": _round(sums["total_amount_sum"]),
+        "total_fare": _round(sums["fare_amount_sum"]),
+        "total_tip": _round(sums["tip_amount_sum"]),
+        "avg_distance": _average(sums["trip_distance_sum"], sums["trip_distance_count"]),
+        "avg_passengers": _average(sums["passenger_count_sum"], sums["passenger_count_count"]),
+    }
+    table = grouped.select(keys)
+    for measure, name in names.items():
+        table = table.append_column(name, columns[measure])
+    return table.sort_by([(key, "ascending") for key in keys])
+
+
+def _zone_roll_up(trips: pa.Table, zones: ZoneEnricher) -> pa.Table:
+    """
+    Roll the fine-grained aggregate up to zone_perfomance_mart grain
+
+    Location IDs are mapped to zone names first, null and unknown IDs to
+    UNKNOWN like the intermediate models, so pairs of IDs sharing a zone
+    name end up in one group as they do in the mart.
+
+    Args:
+        trips: Merged aggregate (GROUP_KEYS + MEASURES)
+        zones: Enricher built from the taxi zone lookup
+
+    Returns:
+        Table with the ZONE_PERFORMANCE_COLUMNS
+    """
+    keys = ["trip_date", "pickup_zone", "dropoff_zone", "taxi_color"]
+    named = trips.select(["trip_date", "taxi_color"] + MEASURES)
+    for column, location_column in (("pickup_zone", "pickup_location_id"),
+                                    ("dropoff_zone", "dropoff_location_id")):
+        named = named.append_column(
+            column, pc.cast(zones.lookup(trips[location_column]), pa.string())
+        )
+    grouped = named.group_by(keys).aggregate([(measure, "sum") for measure in MEASURES])
+    sums = {measure: grouped[f"{measure}_sum"] for measure in MEASURES}
+    columns = {
+        "total_trips": sums["trips"],
+        "total_fare_amount": _round(sums["fare_amount_sum"]),
+        "total_tip_amount": _round(sums["tip_amount_sum"]),
+        "total_trip_distance": sums["trip_distance_sum"],
+        "trip_distance_count": sums["trip_distance_count"],
+        "total_passenger_count": sums["passenger_count_sum"],
+        "passenger_count_count": sums["passenger_count_count"],
+    }
+    table = pa.table({
+        name: grouped[name] if name in keys else columns[name]
+        for name in ZONE_PERFORMANCE_COLUMNS
+    })
+    return table.sort_by([(key, "ascending") for key in keys])
+
+
+def write_aggregates(output_dir: Path, zone_lookup: str = None) -> Dict[str, int]:
+    """
+    Merge the per-source partials into small mart-shaped Parquet outputs
+
+    Writes to <output_dir>/aggregates/:
+        trip_aggregates.parquet: all sources at the finest grain (mergeable)
+        trip_summary_day.parquet: columns of fact_trip_summary_day
+        revenue_breakdown_hourly.parquet: columns of fact_revenue_breakdown_hourly
+        zone_performance.parquet: columns of zone_perfomance_mart (only
+            with a taxi zone lookup, to name the zones)
+
+    Args:
+        output_dir: Processed data directory
+        zone_lookup: Path to the taxi zone lookup CSV (defaults to the one in
+            Config.RAW_DATA_DIR)
+
+    Returns:
+        Mapping of output name to rows written
+    """
+    aggregates_dir = Path(output_dir) / Config.AGGREGATES_DIR
+    partials = [
+        pq.read_table(path) for path in sorted((aggregates_dir / PARTIALS_DIR).glob("*.parquet"))
+    ]
+    if not partials:
+        logger.warning(f"No partial aggregates in {aggregates_dir}")
+        return {}
+
+    trips = _merge(partials)
+    with_distance = trips.filter(trips["has_distance"])
+    outputs = {
+        "trip_aggregates": trips,
+        "trip_summary_day": _roll_up(with_distance, ["trip_date", "taxi_color"], {
+            "total_trips": "total_trips",
+            "total_fare": "total_fare_amount",
+            "total_tip": "total_tip_amount",
+            "avg_distance": "avg_trip_distance",
+            "avg_passengers": "avg_passenger_count",
+        }),
+        "revenue_breakdown_hourly": _roll_up(
+            with_distance, ["trip_date", "trip_hour", "taxi_color"], {
+                "total_trips": "total_trips",
+                "total_amount": "total_amount_usd",
+                "total_fare": "total_fare_amount_usd",
+                "total_tip": "total_tip_amount_usd",
+                "avg_distance": "avg_trip_distance_miles",
+                "avg_passengers": "avg_passenger_count",
+            }
+        ),
+    }
+    zone_lookup = Path(zone_lookup or Config.get_raw_data_path(Config.TAXI_ZONE_CSV))
+    if zone_lookup.exists():
+        outputs["zone_performance"] = _zone_roll_up(trips, ZoneEnricher.from_csv(str(zone_lookup)))
+    else:
+        logger.warning(f"Taxi zone lookup not found at {zone_lookup}, zone_performance not written")
+
+    rows = {}
+    for name, table in outputs.items():
+        pq.write_table(table, aggregates_dir / f"{name}.parquet", compression=Config.COMPRESSION)
+        rows[name] = table.num_rows
+    logger.info(f"Aggregates written to {aggregates_dir}: {rows}")
+    return rows
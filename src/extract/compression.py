@@ -0,0 +1,64 @@
+"""
+Detection and streaming decompression of compressed raw inputs
+"""
+import lzma
+from typing import BinaryIO, Optional, Union
+
+import pyarrow as pa
+
+from ..utils.config import Config
+
+# Leading bytes of each supported format -> codec name
+MAGIC_BYTES = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\x28\xb5\x2f\xfd": "zstd",
+    b"\xfd7zXZ\x00": "xz",
+}
+
+# Codecs decompressed by Arrow's native streams; xz goes through lzma
+_ARROW_CODECS = ("gzip", "bz2", "zstd")
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """
+    Detect the compression of a raw file from its magic bytes
+
+    The file name is not looked at, so a compressed file without a
+    compression suffix (or a plain file with one) is still read correctly.
+
+    Args:
+        path: Path to the raw file
+
+    Returns:
+        "gzip", "bz2", "zstd" or "xz", or None for an uncompressed file
+    """
+    with open(path, "rb") as f:
+        head = f.read(max(len(magic) for magic in MAGIC_BYTES))
+    for magic, codec in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def open_input(path: str) -> Union[pa.NativeFile, BinaryIO]:
+    """
+    Open a raw file as a stream of its decompressed bytes
+
+    Nothing is decompressed to disk. gzip, bz2 and zstd are inflated by
+    Arrow's native codecs and xz by lzma, which both release the GIL, so the
+    decompression runs alongside the CSV reader's parsing threads. Concatenated
+    members (as written by pigz or pbzip2) are read through.
+
+    Args:
+        path: Path to the raw file
+
+    Returns:
+        Readable binary stream, to be closed by the caller
+    """
+    codec = detect_compression(path)
+    if codec == "xz":
+        return lzma.open(path, "rb")
+    if codec in _ARROW_CODECS and not pa.Codec.is_available(codec):
+        raise ValueError(f"{path} is {codec}-compressed but pyarrow was built without {codec}")
+    return pa.input_stream(path, compression=codec, buffer_size=Config.INPUT_BUFFER_BYTES)
@@ -1,74 +1,1178 @@
 """
 Extract module for converting CSV files to Parquet format
 """
+import io
+import itertools
+import multiprocessing
 import os
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Iterator, Dict
+from typing import Callable, Iterator, Dict, List, Tuple, Union
 import pandas as pd
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
 import pyarrow.parquet as pq
 
+from ..utils import metrics, profiling
 from ..utils.config import Config
-from ..utils.logger import setup_logger
+from ..utils.logger import setup_logger, log_context
+from .compression import detect_compression, open_input
+from .aggregates import TAXI_COLORS, TripAggregator, partial_path, write_aggregates
+from .gcs_output import is_gcs_path, parquet_sink
+from .manifest import Manifest
+from .memory import MemoryBudget
+from .sources import discover_sources, output_name
+from .validation import TripValidator, quarantine_path, select_rules
+from .zones import ZoneEnricher
+from .schemas import (
+    get_schema,
+    get_pickup_column,
+    arrow_column_types,
+    pandas_read_options,
+    apply_schema,
+)
 
 logger = setup_logger(__name__)
 
 
-def returnBatches(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+ENGINES = ("pyarrow", "pandas")
+OUTPUT_MODES = ("single", "parts", "partitioned")
+
+# Number of leading bytes sampled to estimate the average CSV line length
+_SAMPLE_BYTES = 1024 * 1024
+
+# Called with each Arrow chunk before it is written; returns the table to write
+Stage = Callable[[pa.Table], pa.Table]
+
+
+def _estimate_block_size(path: str, chunk_size: int) -> int:
     """
-    Return an iterator that yields CSV chunks
+    Estimate the Arrow block size (in bytes) that yields roughly chunk_size rows
+
+    Compressed inputs are sampled after decompression, since blocks are cut
+    from the decompressed stream.
 
     Args:
         path: Path to CSV file
-        chunk_size: Number of rows per chunk
+        chunk_size: Desired number of rows per batch
+
+    Returns:
+        Block size in bytes
+    """
+    with open_input(path) as f:
+        sample = f.read(_SAMPLE_BYTES)
+
+    lines = sample.count(b"\n")
+    avg_line_bytes = len(sample) / lines if lines else len(sample) or 1
+    return max(int(avg_line_bytes * chunk_size), 64 * 1024)
+
+
+def _pandas_options(columns: List[str], schema: pa.Schema) -> Dict:
+    """read_csv dtype and parse_dates arguments for the declared columns present in a file"""
+    dtypes, parse_dates = pandas_read_options(schema)
+    return {
+        "dtype": {col: dtype for col, dtype in dtypes.items() if col in columns},
+        "parse_dates": [col for col in parse_dates if col in columns],
+    }
+
+
+def _pandas_bytes(chunk: Union[pd.DataFrame, pa.RecordBatch]) -> int:
+    """Memory held by a pandas chunk, strings included (0 for Arrow chunks)"""
+    if isinstance(chunk, pd.DataFrame):
+        return int(chunk.memory_usage(index=False, deep=True).sum())
+    return 0
+
+
+def _sample_budget(
+    path: str,
+    engine: str,
+    budget_bytes: int,
+    schema: pa.Schema = None,
+    row_group_rows: int = None,
+    open_files: int = 1
+) -> MemoryBudget:
+    """
+    Size the chunks of a conversion from a parsed sample of its input
+
+    Args:
+        path: Path to CSV file, optionally compressed
+        engine: CSV parsing engine, "pyarrow" or "pandas"
+        budget_bytes: Target peak memory of the process
+        schema: Optional declared schema the file is parsed with
+        row_group_rows: Requested rows per Parquet row group (None for one per chunk)
+        open_files: Files written at once (see MemoryBudget)
+
+    Returns:
+        MemoryBudget starting from the sample's bytes per row
+    """
+    with open_input(path) as f:
+        sample = f.read(_SAMPLE_BYTES)
+    # Whole lines only, header excluded from the line length
+    sample = sample[:sample.rfind(b"\n") + 1] or sample
+    lines = max(sample.count(b"\n") - 1, 1)
+    header_bytes = sample.find(b"\n") + 1
+    raw_row_bytes = (len(sample) - header_bytes) / lines if len(sample) > header_bytes else 1.0
+
+    table = pv.read_csv(
+        pa.BufferReader(sample),
+        convert_options=pv.ConvertOptions(
+            column_types=arrow_column_types(schema) if schema else None,
+            strings_can_be_null=True
+        )
+    )
+    rows = max(table.num_rows, 1)
+    pandas_row_bytes, parse_row_bytes = 0.0, 0.0
+    if engine == "pandas":
+        options = _pandas_options(table.column_names, schema) if schema else {}
+        # The parser's intermediate strings and arrays are gone once it
+        # returns, so its peak is traced rather than read from the DataFrame
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        try:
+            df = pd.read_csv(io.BytesIO(sample), **options)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+        pandas_row_bytes = _pandas_bytes(df) / rows
+        parse_row_bytes = (peak - before) / rows
+    return MemoryBudget(budget_bytes, engine, raw_row_bytes, table.nbytes / rows,
+                        pandas_row_bytes, parse_row_bytes, table.num_columns,
+                        row_group_rows=row_group_rows, open_files=open_files)
+
+
+def _arrow_batches(
+    path: str,
+    chunk_size: int,
+    schema: pa.Schema = None,
+    budget: MemoryBudget = None
+) -> Iterator[pa.RecordBatch]:
+    """
+    Stream a CSV file as Arrow RecordBatches using the multi-threaded CSV reader
+
+    Args:
+        path: Path to CSV file, optionally gzip, bz2, zstd or xz-compressed
+        chunk_size: Approximate number of rows per batch
+        schema: Optional declared schema applied while parsing
+        budget: Optional memory budget sizing the reader's blocks; batches
+            are sliced to its current chunk size as it adapts
+
+    Returns:
+        Iterator of pyarrow RecordBatches
+    """
+    read_options = pv.ReadOptions(
+        block_size=budget.block_size if budget else _estimate_block_size(path, chunk_size),
+        use_threads=True
+    )
+    convert_options = pv.ConvertOptions(
+        column_types=arrow_column_types(schema) if schema else None,
+        strings_can_be_null=True
+    )
+    with open_input(path) as source, pv.open_csv(
+        source, read_options=read_options, convert_options=convert_options
+    ) as reader:
+        for batch in reader:
+            if budget is None:
+                yield batch
+                continue
+            offset = 0
+            while offset < batch.num_rows:
+                rows = budget.chunk_rows
+                yield batch.slice(offset, rows)
+                offset += rows
+
+
+def _pandas_chunks(
+    path: str,
+    chunk_size: int,
+    budget: MemoryBudget = None,
+    **read_options
+) -> Iterator[pd.DataFrame]:
+    """Stream a CSV file, optionally compressed, as pandas DataFrame chunks"""
+    with open_input(path) as source:
+        if budget is None:
+            yield from pd.read_csv(source, chunksize=chunk_size, **read_options)
+            return
+        # Each chunk takes the budget's current chunk size
+        with pd.read_csv(source, chunksize=budget.chunk_rows, **read_options) as reader:
+            while True:
+                try:
+                    yield reader.get_chunk(budget.chunk_rows)
+                except StopIteration:
+                    return
+
+
+def returnBatches(
+    path: str,
+    chunk_size: int,
+    engine: str = "pandas",
+    schema: pa.Schema = None,
+    budget: MemoryBudget = None
+) -> Iterator[Union[pd.DataFrame, pa.RecordBatch]]:
+    """
+    Return an iterator that yields CSV chunks
+
+    Compressed inputs (detected from their magic bytes) are decompressed on
+    the fly by either engine, without an uncompressed copy on disk.
+
+    Args:
+        path: Path to CSV file, optionally gzip, bz2, zstd or xz-compressed
+        chunk_size: Number of rows per chunk (approximate for the pyarrow engine)
+        engine: "pandas" to yield DataFrames, "pyarrow" to yield RecordBatches
+        schema: Optional declared schema applied while parsing
+        budget: Optional memory budget; chunks then follow its chunk size,
+            measured again by the writer on every chunk, and chunk_size is ignored
+
+    Returns:
+        Iterator of pandas DataFrames or pyarrow RecordBatches
+    """
+    if engine == "pyarrow":
+        return _arrow_batches(path, chunk_size, schema, budget)
+    if engine == "pandas":
+        if not schema:
+            return _pandas_chunks(path, chunk_size, budget)
+
+        with open_input(path) as source:
+            columns = set(pd.read_csv(source, nrows=0).columns)
+        return _pandas_chunks(path, chunk_size, budget, **_pandas_options(columns, schema))
+    raise ValueError(f"Unknown extraction engine '{engine}', expected one of {ENGINES}")
+
+
+def _to_table(
+    chunk: Union[pd.DataFrame, pa.RecordBatch],
+    schema: pa.Schema = None
+) -> pa.Table:
+    """Convert a pandas or Arrow chunk to a pyarrow Table"""
+    if isinstance(chunk, pa.RecordBatch):
+        table = pa.Table.from_batches([chunk])
+    else:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+
+    if schema is not None:
+        table = apply_schema(table, schema)
+    return table
+
+
+def _apply_stages(table: pa.Table, stages: List[Stage] = None) -> pa.Table:
+    """Pass a chunk through each extraction stage in order"""
+    for stage in stages or ():
+        table = stage(table)
+    return table
+
+
+class _RowGroupWriter:
+    """ParquetWriter writing row groups of a fixed size whatever the chunk sizes"""
+
+    def __init__(self, sink: Union[str, object], schema: pa.Schema, row_group_rows: int):
+        self.row_group_rows = row_group_rows
+        self._writer = pq.ParquetWriter(sink, schema, compression=Config.COMPRESSION)
+        self._pending: List[pa.Table] = []
+        self._pending_rows = 0
+
+    def _flush(self, rows: int) -> None:
+        # concat_tables only references the pending chunks, nothing is copied
+        pending = pa.concat_tables(self._pending)
+        self._writer.write_table(pending.slice(0, rows), row_group_size=rows)
+        rest = pending.slice(rows)
+        self._pending = [rest] if rest.num_rows else []
+        self._pending_rows = rest.num_rows
+
+    def write_table(self, table: pa.Table) -> None:
+        self._pending.append(table)
+        self._pending_rows += table.num_rows
+        while self._pending_rows >= self.row_group_rows:
+            self._flush(self.row_group_rows)
+
+    def close(self) -> None:
+        if self._pending_rows:
+            self._flush(self._pending_rows)
+        self._writer.close()
+
+
+def _parquet_writer(
+    sink: Union[str, object],
+    schema: pa.Schema,
+    row_group_rows: int = None
+) -> Union[pq.ParquetWriter, _RowGroupWriter]:
+    """Open a Parquet writer with one row group per chunk, or row groups of row_group_rows rows"""
+    if row_group_rows:
+        return _RowGroupWriter(sink, schema, row_group_rows)
+    return pq.ParquetWriter(sink, schema, compression=Config.COMPRESSION)
+
+
+def _close_after_error(parquet_writer: Union[pq.ParquetWriter, _RowGroupWriter, None]) -> None:
+    """
+    Close the writer of a failed output while its sink still takes the footer
+
+    Left to the garbage collector, the footer would be written after
+    parquet_sink abandoned a GCS upload. Errors are ignored, the one that
+    failed the output is re-raised by the caller.
+    """
+    if parquet_writer is None:
+        return
+    try:
+        parquet_writer.close()
+    except Exception:
+        pass
+
+
+def _row_group_rows(budget: MemoryBudget = None) -> int:
+    """Rows per row group from the budget or Config.ROW_GROUP_ROWS (None for one per chunk)"""
+    return budget.row_group_rows if budget else Config.ROW_GROUP_ROWS or None
+
+
+def _sink_size(sink: Union[str, object]) -> int:
+    """Bytes written to a Parquet sink from parquet_sink (a local path or GCS writer)"""
+    return sink.tell() if hasattr(sink, "tell") else _file_bytes([sink])
+
+
+def _file_bytes(paths: List[str]) -> int:
+    """Total size of the files that exist among paths"""
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+
+def _write_partitioned(
+    df_iter: Iterator[Union[pd.DataFrame, pa.RecordBatch]],
+    base_dir: str,
+    partition_column: str,
+    schema: pa.Schema = None,
+    stages: List[Stage] = None,
+    basename: str = None,
+    budget: MemoryBudget = None
+) -> int:
+    """
+    Write CSV chunks as a hive-partitioned dataset (pickup_date=YYYY-MM-DD/)
+
+    Partitions touched by this write are replaced, others are left as they are,
+    so a rerun rewrites only the days present in the input.
+
+    With a basename, files are named <basename>-part-N.parquet and only the
+    files of that basename are replaced, so several inputs (e.g. the monthly
+    files of one source, whose stray trips can fall on the same days) can
+    share one dataset.
+
+    Args:
+        df_iter: Iterator of pandas DataFrames or pyarrow RecordBatches
+        base_dir: Output dataset directory
+        partition_column: Timestamp column the partition date is derived from
+        schema: Optional declared schema
+        stages: Optional extraction stages applied to each chunk (see return_parquet)
+        basename: Optional prefix of the file names written
+        budget: Optional memory budget measuring each chunk (see return_parquet)
 
     Returns:
-        Iterator of pandas DataFrames
+        Number of rows written
     """
-    return pd.read_csv(path, chunksize=chunk_size)
+    with metrics.stage("parse") as parse, metrics.stage("write") as write:
+        chunks = parse.timed(df_iter)
+        first = next(chunks, None)
+        if first is None:
+            logger.warning(f"No rows to write to {base_dir}")
+            return 0
 
+        source_schema = _to_table(first, schema=schema).schema.remove_metadata()
 
-def return_parquet(df_iter: Iterator[pd.DataFrame], parquet_file: str) -> None:
+        def convert(chunk: Union[pd.DataFrame, pa.RecordBatch]) -> pa.Table:
+            table = _to_table(chunk, schema=source_schema).replace_schema_metadata(None)
+            if budget:
+                budget.observe(table.num_rows, table.nbytes, _pandas_bytes(chunk))
+            return _apply_stages(table, stages)
+
+        tables = (convert(chunk) for chunk in itertools.chain([first], chunks))
+        first_table = next(tables)
+        table_schema = first_table.schema
+        date_field = pa.field(Config.PARTITION_FIELD, pa.date32())
+        rows = 0
+
+        def batches() -> Iterator[pa.RecordBatch]:
+            nonlocal rows
+            for i, table in enumerate(itertools.chain([first_table], tables)):
+                logger.info(f"Processing chunk {i}")
+                table = table.append_column(
+                    date_field, pc.cast(table[partition_column], pa.date32())
+                )
+                rows += table.num_rows
+                parse.add(rows=table.num_rows, output_bytes=table.nbytes)
+                write.add(rows=table.num_rows, input_bytes=table.nbytes)
+                yield from table.to_batches()
+
+        if basename:
+            for previous in Path(base_dir).glob(f"{Config.PARTITION_FIELD}=*/{basename}-part-*.parquet"):
+                previous.unlink()
+
+        start, parsed_before = time.perf_counter(), parse.busy_seconds
+        ds.write_dataset(
+            batches(),
+            base_dir,
+            schema=table_schema.append(date_field),
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([date_field]), flavor="hive"),
+            file_options=ds.ParquetFileFormat().make_write_options(
+                compression=Config.COMPRESSION
+            ),
+            basename_template=f"{basename}-part-{{i}}.parquet" if basename else "part-{i}.parquet",
+            max_open_files=Config.MAX_OPEN_PARTITIONS,
+            max_partitions=Config.MAX_PARTITIONS,
+            max_rows_per_group=_row_group_rows(budget),
+            existing_data_behavior="overwrite_or_ignore" if basename else "delete_matching",
+        )
+        # The dataset writer pulls chunks as it goes, so only its total time is
+        # known: what the write took beyond parsing
+        parsed = parse.busy_seconds - parsed_before
+        write.add_time(max(time.perf_counter() - start - parsed, 0.0), chunk=False)
+        written = Path(base_dir).glob(f"{Config.PARTITION_FIELD}=*/{basename or 'part'}-*.parquet")
+        write.add(output_bytes=sum(file.stat().st_size for file in written))
+
+        logger.info(f"Partitioned dataset written: {base_dir} ({rows} rows)")
+        return rows
+
+
+def return_parquet(
+    df_iter: Iterator[Union[pd.DataFrame, pa.RecordBatch]],
+    parquet_file: str,
+    schema: pa.Schema = None,
+    partition_column: str = None,
+    stages: List[Stage] = None,
+    basename: str = None,
+    budget: MemoryBudget = None
+) -> int:
     """
     Write CSV chunks to a Parquet file
 
     Args:
-        df_iter: Iterator of pandas DataFrames
-        parquet_file: Output parquet file path
+        df_iter: Iterator of pandas DataFrames or pyarrow RecordBatches
+        parquet_file: Output parquet file path or gs://bucket/object URI (streamed
+            without a local copy), or dataset directory when partitioning
+        schema: Optional declared schema; undeclared columns keep the type
+            inferred from the first chunk
+        partition_column: Optional timestamp column; when set, a dataset
+            partitioned by Config.PARTITION_FIELD is written instead of one file
+        stages: Optional extraction stages; each is called with every Arrow
+            table in order before it is written and returns the table to write
+            (e.g. aggregates.TripAggregator)
+        basename: Optional output name prefixed to the partition file names
+            (see _write_partitioned)
+        budget: Optional memory budget the chunks were read with; each chunk
+            is measured so the next ones are sized from it, and row groups
+            take its row_group_rows (Config.ROW_GROUP_ROWS without a budget)
+
+    Returns:
+        Number of rows written
     """
+    if partition_column:
+        return _write_partitioned(
+            df_iter, parquet_file, partition_column, schema=schema, stages=stages,
+            basename=basename, budget=budget
+        )
+
     parquet_writer = None
+    rows = 0
 
-    for i, chunk in enumerate(df_iter):
-        logger.info(f"Processing chunk {i}")
+    with parquet_sink(parquet_file) as sink, \
+            metrics.stage("parse") as parse, metrics.stage("write") as write:
+        try:
+            for i, chunk in enumerate(parse.timed(df_iter)):
+                logger.info(f"Processing chunk {i}")
 
-        if i == 0:
-            # Guess schema from first chunk
-            parquet_schema = pa.Table.from_pandas(chunk).schema
-            parquet_writer = pq.ParquetWriter(
-                parquet_file, parquet_schema, compression=Config.COMPRESSION
-            )
+                if i == 0:
+                    # Declared types win, remaining columns are inferred from the first chunk
+                    parquet_schema = _to_table(chunk, schema=schema).schema
 
-        # Convert chunk to table and write
-        table = pa.Table.from_pandas(chunk, schema=parquet_schema)
-        parquet_writer.write_table(table)
+                # Convert chunk to table and write
+                table = _to_table(chunk, schema=parquet_schema)
+                if budget:
+                    budget.observe(table.num_rows, table.nbytes, _pandas_bytes(chunk))
+                table = _apply_stages(table, stages)
+                parse.add(rows=table.num_rows, output_bytes=table.nbytes)
+                if parquet_writer is None:
+                    parquet_writer = _parquet_writer(sink, table.schema, _row_group_rows(budget))
+                with write.chunk():
+                    parquet_writer.write_table(table)
+                write.add(rows=table.num_rows, input_bytes=table.nbytes)
+                rows += table.num_rows
+        except BaseException:
+            _close_after_error(parquet_writer)
+            raise
+
+        if parquet_writer:
+            with write.chunk():
+                parquet_writer.close()
+            write.add(output_bytes=_sink_size(sink))
+            logger.info(f"Parquet file written: {parquet_file} ({rows} rows)")
+
+    return rows
 
-    if parquet_writer:
-        parquet_writer.close()
-        logger.info(f"Parquet file written: {parquet_file}")
+
+def split_byte_ranges(path: str, range_bytes: int) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Split a CSV file into newline-aligned byte ranges
+
+    Ranges start after the header line and each one ends just after a newline,
+    so every range holds whole records. Quoted fields containing newlines are
+    not supported (the TLC trip files never contain them).
+
+    Args:
+        path: Path to CSV file
+        range_bytes: Target size of each range in bytes
+
+    Returns:
+        Tuple of (column names from the header, list of (start, end) offsets)
+    """
+    size = os.path.getsize(path)
+    ranges = []
+
+    with open(path, "rb") as f:
+        header = f.readline()
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + range_bytes, size))
+            f.readline()
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+
+    column_names = pv.read_csv(pa.BufferReader(header)).column_names
+    return column_names, ranges
+
+
+def _parse_bytes(
+    data: bytes,
+    column_names: List[str],
+    column_types: Dict[str, pa.DataType]
+) -> pa.Table:
+    """Parse headerless CSV bytes with fixed column names and types"""
+    return pv.read_csv(
+        pa.BufferReader(data),
+        read_options=pv.ReadOptions(column_names=column_names),
+        convert_options=pv.ConvertOptions(
+            column_types=column_types, strings_can_be_null=True
+        )
+    )
+
+
+def _parse_range(
+    path: str,
+    start: int,
+    end: int,
+    column_names: List[str],
+    column_types: Dict[str, pa.DataType]
+) -> pa.Table:
+    """Parse one newline-aligned byte range of a CSV file into a table"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    return _parse_bytes(data, column_names, column_types)
+
+
+def _write_range_part(
+    path: str,
+    start: int,
+    end: int,
+    column_names: List[str],
+    column_types: Dict[str, pa.DataType],
+    part_file: str,
+    stages: List[Stage] = None,
+    row_group_rows: int = None
+) -> int:
+    """Parse one byte range and write it to its own Parquet part file"""
+    table = _apply_stages(_parse_range(path, start, end, column_names, column_types), stages)
+    pq.write_table(table, part_file, compression=Config.COMPRESSION, row_group_size=row_group_rows)
+    return table.num_rows
+
+
+def _resolve_column_types(
+    path: str,
+    column_names: List[str],
+    first_range: Tuple[int, int],
+    schema: pa.Schema = None
+) -> Dict[str, pa.DataType]:
+    """
+    Fix the type of every column so all ranges parse under one shared schema
+
+    Declared columns use the declared type; the others are inferred from the
+    start of the first range, with all-null columns widened to string.
+    """
+    start, end = first_range
+    with open(path, "rb") as f:
+        f.seek(start)
+        sample = f.read(min(end - start, _SAMPLE_BYTES))
+    if len(sample) < end - start:
+        # Cut the sample back to the last complete line
+        sample = sample[:sample.rfind(b"\n") + 1]
+
+    table = _parse_bytes(sample, column_names, arrow_column_types(schema) if schema else {})
+    return {
+        field.name: pa.string() if pa.types.is_null(field.type) else field.type
+        for field in table.schema
+    }
+
+
+class _InlineExecutor:
+    """Executor that runs submitted calls immediately in the calling process"""
+
+    def __enter__(self) -> "_InlineExecutor":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def submit(self, fn: Callable, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def _parse_window(workers: int) -> int:
+    """Byte ranges in flight when parsing one file with workers processes"""
+    return workers * 2
+
+
+def _ordered_map(executor, fn: Callable, arg_tuples: Iterator[Tuple], window: int) -> Iterator:
+    """Yield fn(*args) results in input order with at most window calls in flight"""
+    arg_tuples = iter(arg_tuples)
+    pending = deque(
+        executor.submit(fn, *args) for args in itertools.islice(arg_tuples, window)
+    )
+    while pending:
+        result = pending.popleft().result()
+        for args in itertools.islice(arg_tuples, 1):
+            pending.append(executor.submit(fn, *args))
+        yield result
+
+
+def return_parquet_parallel(
+    path: str,
+    parquet_file: str,
+    schema: pa.Schema = None,
+    workers: int = None,
+    range_bytes: int = None,
+    output_mode: str = "single",
+    start_index: int = 0,
+    on_part: Callable[[int, int], None] = None,
+    stages: List[Stage] = None,
+    row_group_rows: int = None
+) -> int:
+    """
+    Convert one large CSV to Parquet by parsing byte ranges on separate cores
+
+    Args:
+        path: Path to CSV file
+        parquet_file: Output Parquet file or gs:// URI ("single"), or directory of
+            part files ("parts")
+        schema: Optional declared schema shared by all ranges
+        workers: Number of parsing processes (defaults to Config.PARSE_WORKERS)
+        range_bytes: Target byte range size (defaults to Config.SPLIT_SIZE_BYTES)
+        output_mode: "single" writes ranges as ordered row groups of one file,
+            "parts" writes numbered part-NNNNN.parquet files
+        start_index: First range to convert ("parts" only); earlier parts are
+            kept as already committed
+        on_part: Called with (range index, rows) after each part is committed
+            ("parts" only), in range order
+        stages: Optional extraction stages (see return_parquet); in "single"
+            mode they run in this process in range order, in "parts" mode the
+            parsing workers run them, so they must be picklable and stateless
+        row_group_rows: Rows per Parquet row group (defaults to
+            Config.ROW_GROUP_ROWS; one row group per range if 0)
+
+    Returns:
+        Number of rows written by this call
+    """
+    if output_mode not in ("single", "parts"):
+        raise ValueError(f"Unsupported output mode '{output_mode}' for byte-range parsing")
+
+    workers = workers or Config.PARSE_WORKERS
+    range_bytes = range_bytes or Config.SPLIT_SIZE_BYTES
+    row_group_rows = row_group_rows or Config.ROW_GROUP_ROWS or None
+    column_names, ranges = split_byte_ranges(path, range_bytes)
+    if not ranges:
+        logger.warning(f"No data rows in {path}")
+        return 0
+
+    column_types = _resolve_column_types(path, column_names, ranges[0], schema)
+    logger.info(
+        f"Parsing {len(ranges) - start_index} of {len(ranges)} byte ranges of {path} "
+        f"with {workers} worker(s)"
+    )
+
+    rows = 0
+    if workers > 1:
+        # spawn avoids forking a parent whose Arrow thread pools are already running
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    else:
+        executor = _InlineExecutor()
+
+    with executor:
+        if output_mode == "parts":
+            out_dir = Path(parquet_file)
+            out_dir.mkdir(parents=True, exist_ok=True)
+            # Drop leftovers of an interrupted or earlier run past the resume point
+            for stale in out_dir.glob("part-*.parquet*"):
+                if stale.suffix == ".tmp" or int(stale.name[5:10]) >= start_index:
+                    stale.unlink()
+
+            indexes = range(start_index, len(ranges))
+            # Workers write to .tmp names; parts are committed by rename in range order
+            part_rows = _ordered_map(executor, _write_range_part, (
+                (path, *ranges[i], column_names, column_types,
+                 str(out_dir / f"part-{i:05d}.parquet.tmp"), stages, row_group_rows)
+                for i in indexes
+            ), window=_parse_window(workers))
+            # Workers parse and write each range, so a part's chunk latency
+            # is the wait for it to be ready
+            with metrics.stage("write", workers=workers) as write:
+                for i, n in zip(indexes, write.timed(part_rows)):
+                    part_file = out_dir / f"part-{i:05d}.parquet"
+                    os.replace(f"{part_file}.tmp", part_file)
+                    rows += n
+                    write.add(rows=n, output_bytes=part_file.stat().st_size)
+                    logger.info(f"Committed part {i} ({n} rows)")
+                    if on_part:
+                        on_part(i, n)
+        else:
+            with parquet_sink(parquet_file) as sink, \
+                    metrics.stage("parse", workers=workers) as parse, metrics.stage("write") as write:
+                parquet_writer = None
+                tables = _ordered_map(executor, _parse_range, (
+                    (path, start, end, column_names, column_types) for start, end in ranges
+                ), window=_parse_window(workers))
+                # With several workers, a range's parse latency is the wait for it
+                try:
+                    for i, table in enumerate(parse.timed(tables)):
+                        logger.info(f"Processing range {i}")
+                        table = _apply_stages(table, stages)
+                        parse.add(rows=table.num_rows, output_bytes=table.nbytes)
+                        if parquet_writer is None:
+                            parquet_writer = _parquet_writer(sink, table.schema, row_group_rows)
+                        with write.chunk():
+                            parquet_writer.write_table(table)
+                        write.add(rows=table.num_rows, input_bytes=table.nbytes)
+                        rows += table.num_rows
+                except BaseException:
+                    _close_after_error(parquet_writer)
+                    raise
+
+                with write.chunk():
+                    parquet_writer.close()
+                write.add(output_bytes=_sink_size(sink))
+
+    logger.info(f"Parquet output written: {parquet_file} ({rows} rows)")
+    return rows
+
+
+class ExtractionError(RuntimeError):
+    """Raised when one or more source files fail to convert"""
+
+    def __init__(self, message: str, results: List[Dict]):
+        super().__init__(message)
+        self.results = results
+
+
+def _begin_manifest_entry(
+    manifest: Manifest,
+    stem: str,
+    path: str,
+    output: Path,
+    output_mode: str,
+    resumable: bool,
+    range_bytes: int
+) -> Tuple[Dict, int]:
+    """
+    Start (or resume) the manifest record of a conversion
+
+    A conversion resumes only from byte ranges of the same size (range_bytes).
+
+    Returns:
+        Tuple of (record, index of the first byte range still to convert)
+    """
+    stat = os.stat(path)
+    sha256 = manifest.file_hash(path)
+    previous = manifest.get(stem)
+
+    if (
+        resumable
+        and previous
+        and previous["status"] == "in_progress"
+        and previous["sha256"] == sha256
+        and previous["output_mode"] == output_mode
+        and previous["range_bytes"] == range_bytes
+        and output.exists()
+    ):
+        logger.info(
+            f"Resuming after chunk {previous['last_chunk']} "
+            f"({previous['rows_written']} rows already committed)"
+        )
+        return previous, previous["last_chunk"] + 1
+
+    entry = {
+        "source": str(path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "sha256": sha256,
+        "output": str(output),
+        "output_mode": output_mode,
+        "range_bytes": range_bytes,
+        "rows_written": 0,
+        "last_chunk": -1,
+        "status": "in_progress",
+    }
+    manifest.save(stem, entry)
+    return entry, 0
+
+
+def convert_file(
+    name: str,
+    path: str,
+    output_dir: str,
+    engine: str,
+    parse_workers: int = 1,
+    output_mode: str = "single",
+    incremental: bool = False,
+    on_output: Callable[[str], None] = None,
+    aggregate: bool = False,
+    zone_lookup: str = None,
+    month: str = None,
+    profile_dir: str = None,
+    memory_budget: int = 0,
+    validate: bool = False,
+    location_lookup: str = None
+) -> Dict:
+    """
+    Convert a single source CSV to Parquet
+
+    Runs in the calling process or in a worker process of run_extraction's pool,
+    so failures are captured in the result instead of being raised.
+
+    Args:
+        name: Source name (e.g. "Yellow Taxi")
+        path: Path to the source CSV file
+        output_dir: Directory for the output Parquet file, or a gs://bucket/prefix
+            the file is streamed to ("single" mode without incremental only)
+        engine: CSV parsing engine, "pyarrow" or "pandas"
+        parse_workers: Processes parsing byte ranges of one large file (pyarrow only)
+        output_mode: "single" for <name>.parquet, "parts" for a <name>/ directory
+            of numbered part files (pyarrow only), "partitioned" for a <name>/
+            dataset partitioned by pickup date (trip sources only)
+        incremental: Skip the file if the manifest shows it unchanged since its
+            last complete conversion; in "parts" mode, resume an interrupted
+            conversion from the last committed part
+        on_output: Called with the path of each part file as soon as it is
+            committed ("parts" only); only usable when running in-process
+        aggregate: Build partial aggregates of a trip source in the same pass
+            and write them to <output_dir>/aggregates/partials/<stem>.parquet
+        zone_lookup: Path to the taxi zone lookup CSV; when set, trip sources
+            get pickup/dropoff zone, borough and service_zone columns
+        month: Month of a monthly trip file (YYYY-MM). Its output is tagged
+            with the month and kept in the source's directory next to the
+            other months: <stem>/<stem>_<month>.parquet, the part files of
+            <stem>/<stem>_<month>/, or <stem>_<month>-part-N.parquet files in
+            the shared <stem>/pickup_date=*/ partitions
+        profile_dir: Directory to write the conversion's CPU and allocation
+            profile to as <stem>.* (see utils/profiling.py); None to not profile
+        memory_budget: Target peak memory in bytes of this process; chunk,
+            reader block, byte range and row group sizes are then derived
+            from the measured bytes per row (see memory.py) instead of
+            Config.CHUNK_SIZE and Config.SPLIT_SIZE_BYTES. 0 for fixed sizes
+        validate: Check the rows of a trip source against the data-quality
+            rules and move failing rows to
+            <output_dir>/quarantine/<stem>.parquet, with per-rule counts in
+            <stem>.json next to it (see validation.py). "parts" conversions
+            are validated with one parse worker only (failed otherwise) and
+            never resumed
+        location_lookup: Path to the taxi zone lookup CSV the
+            unknown_pickup_location rule checks PULocationID against
+
+    Returns:
+        Result dict with name, month, output_name, status ("success",
+        "unchanged" or "failed"), output, rows, quarantined (rows moved to
+        the quarantine), seconds, error and metrics (the parse, write,
+        validate and convert stage records, see utils/metrics.py)
+    """
+    stem = output_name(name, month)
+    partition_column = get_pickup_column(name) if output_mode == "partitioned" else None
+    # Compressed inputs can only be read as one stream, never split into byte ranges
+    split = engine == "pyarrow" and not partition_column and (
+        output_mode == "parts"
+        or (parse_workers > 1 and os.path.getsize(path) > Config.SPLIT_SIZE_BYTES)
+    ) and not detect_compression(path)
+    # Months of a source share its directory, so one load picks them all up
+    if is_gcs_path(output_dir):
+        source_dir = f"{output_dir.rstrip('/')}/{output_name(name)}" if month else output_dir.rstrip('/')
+        parquet_file = f"{source_dir}/{stem}.parquet"
+    else:
+        source_dir = Path(output_dir) / output_name(name) if month else Path(output_dir)
+        if partition_column:
+            parquet_file = Path(output_dir) / output_name(name)
+        elif split and output_mode == "parts":
+            parquet_file = source_dir / stem
+        else:
+            parquet_file = source_dir / f"{stem}.parquet"
+    result = {"name": name, "month": month, "output_name": stem, "status": "success",
+              "output": str(parquet_file), "rows": 0, "quarantined": 0, "seconds": 0.0,
+              "error": None}
+    start = time.perf_counter()
+    validator = None
+
+    with log_context(name), profiling.profiled(stem, profile_dir), \
+            metrics.recording(source=stem) as recorder, recorder.stage("convert") as convert:
+        # Filled as the stages end; the convert record is added on exit
+        result["metrics"] = recorder.records
+        logger.info(f"=== Converting {name} to Parquet ===")
+        try:
+            schema = get_schema(name)
+            manifest = Manifest(output_dir) if incremental else None
+            entry, start_index = None, 0
+            aggregator, enricher = None, None
+            if aggregate and name in TAXI_COLORS:
+                aggregator = TripAggregator(TAXI_COLORS[name], get_pickup_column(name))
+            if zone_lookup and get_pickup_column(name):
+                enricher = ZoneEnricher.from_csv(zone_lookup)
+            stages = [stage for stage in (enricher, aggregator) if stage]
+            validating = bool(validate and get_pickup_column(name))
+            if validating and split and output_mode == "parts" and parse_workers > 1:
+                # The validator writes its quarantine itself, so it can only run
+                # in this process: with one parse worker the parts are written inline
+                raise ValueError("Validation of the 'parts' output mode requires parse_workers=1")
+            budget, range_bytes = None, Config.SPLIT_SIZE_BYTES
+            if memory_budget:
+                budget = _sample_budget(
+                    str(path), engine, memory_budget, schema, Config.ROW_GROUP_ROWS,
+                    open_files=Config.MAX_OPEN_PARTITIONS if partition_column else 1
+                )
+                if split:
+                    range_bytes = min(range_bytes, budget.range_bytes(
+                        parse_workers, _parse_window(parse_workers)))
+                    logger.info(f"Parsing byte ranges of {range_bytes / 1024 / 1024:.0f} MiB")
+
+            if (
+                manifest
+                and manifest.is_unchanged(stem, path, output_mode)
+                and (aggregator is None or partial_path(output_dir, stem).exists())
+                and (not validating or quarantine_path(output_dir, stem).with_suffix(".json").exists())
+            ):
+                logger.info(f"{name} unchanged since the last conversion, skipping")
+                result["status"] = "unchanged"
+                result["rows"] = manifest.get(stem)["rows_written"]
+                return result
+
+            if validating:
+                # Failing rows are left out of aggregates and enrichment
+                validator = TripValidator.for_source(
+                    name, quarantine_path(output_dir, stem), month, location_lookup
+                )
+                stages.insert(0, validator)
+
+            if manifest:
+                entry, start_index = _begin_manifest_entry(
+                    manifest, stem, path, parquet_file, output_mode,
+                    # A resumed conversion would leave the committed parts'
+                    # rows out of the quarantine and its counts
+                    resumable=split and output_mode == "parts" and not validating,
+                    range_bytes=range_bytes
+                )
+
+            def on_part(index: int, rows: int) -> None:
+                if entry:
+                    entry["last_chunk"] = index
+                    entry["rows_written"] += rows
+                    manifest.save(stem, entry)
+                if on_output:
+                    on_output(str(parquet_file / f"part-{index:05d}.parquet"))
+
+            if not is_gcs_path(output_dir):
+                source_dir.mkdir(parents=True, exist_ok=True)
+            if split:
+                rows = return_parquet_parallel(
+                    str(path), str(parquet_file), schema=schema,
+                    workers=parse_workers, range_bytes=range_bytes, output_mode=output_mode,
+                    start_index=start_index, on_part=on_part,
+                    row_group_rows=_row_group_rows(budget),
+                    # Parsing workers can only run the stateless enricher; the
+                    # validator only runs with one parse worker, in this process
+                    stages=(
+                        [stage for stage in (validator, enricher) if stage] or None
+                    ) if output_mode == "parts" else stages
+                )
+                if aggregator and output_mode == "parts":
+                    # Parts are written by the parsing workers, so aggregate the
+                    # committed parts (including resumed ones) from here
+                    for part in sorted(parquet_file.glob("part-*.parquet")):
+                        aggregator.update(pq.read_table(part, columns=aggregator.columns))
+            else:
+                df_iter = returnBatches(str(path), Config.CHUNK_SIZE, engine=engine, schema=schema,
+                                        budget=budget)
+                rows = return_parquet(
+                    df_iter, str(parquet_file), schema=schema,
+                    partition_column=partition_column,
+                    stages=stages,
+                    basename=stem if month else None,
+                    budget=budget
+                )
+            if aggregator:
+                aggregator.write(partial_path(output_dir, stem))
+            if validator:
+                result["quarantined"] = validator.close()["rows_quarantined"]
+
+            if entry:
+                # Part commits already counted their rows, including resumed ones
+                if not (split and output_mode == "parts"):
+                    entry["rows_written"] = rows
+                entry["status"] = "complete"
+                manifest.save(stem, entry)
+                rows = entry["rows_written"]
+            result["rows"] = rows
+        except Exception as e:
+            logger.exception(f"Failed to convert {name}: {e}")
+            result["status"] = "failed"
+            result["error"] = f"{type(e).__name__}: {e}"
+            if validator:
+                validator.close("failed")
+
+        finally:
+            result["seconds"] = round(time.perf_counter() - start, 3)
+            convert.status = result["status"]
+            convert.add(rows=result["rows"], input_bytes=_file_bytes([path]),
+                        output_bytes=_file_bytes(_output_files(result)))
+
+    return result
+
+
+def _output_files(result: Dict) -> List[str]:
+    """List the local Parquet files of a successful or unchanged conversion"""
+    if result["status"] not in ("success", "unchanged") or is_gcs_path(result["output"]):
+        return []
+    output = Path(result["output"])
+    if not output.is_dir():
+        return [str(output)]
+    files = sorted(output.rglob("*.parquet"))
+    if output.name != result["output_name"]:
+        # Partitioned dataset shared by the months of a source
+        files = [file for file in files if file.name.startswith(f"{result['output_name']}-part-")]
+    return [str(file) for file in files]
+
+
+def _convert_in_pool(items: List[Dict], output_dir: Path, workers: int,
+                     on_result: Callable[[Dict], None] = None, **options) -> Dict[str, Dict]:
+    """
+    Convert independent source files concurrently in a process pool
+
+    At most `workers` files are converted at once however many are queued.
+    on_result is called in this process as each file finishes; if it raises,
+    conversions that have not started yet are cancelled and the error propagates.
+
+    Returns:
+        Result dicts keyed by output name
+    """
+    results = {}
+    # Largest files first so the longest conversion starts immediately
+    items = sorted(items, key=lambda item: os.path.getsize(item["path"]), reverse=True)
+
+    # spawn avoids forking a parent whose Arrow thread pools are already running
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = {
+            executor.submit(convert_file, item["name"], item["path"], str(output_dir),
+                            month=item["month"], **options): item
+            for item in items
+        }
+        for future in as_completed(futures):
+            item = futures[future]
+            output = item["output"]
+            try:
+                results[output] = future.result()
+            except Exception as e:
+                # Worker died (e.g. OOM-killed) before it could report a result
+                logger.error(f"[{output}] Worker failed: {e}")
+                results[output] = {"name": item["name"], "month": item["month"],
+                                   "output_name": output, "status": "failed", "output": None,
+                                   "rows": 0, "quarantined": 0, "seconds": 0.0,
+                                   "error": f"{type(e).__name__}: {e}"}
+            if on_result:
+                try:
+                    on_result(results[output])
+                except BaseException:
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    raise
+
+    return results
 
 
 def run_extraction(
     base_path: str = None,
     raw_data_dir: str = None,
-    output_dir: str = None
-) -> None:
+    output_dir: str = None,
+    engine: str = None,
+    workers: int = None,
+    parse_workers: int = None,
+    output_mode: str = None,
+    incremental: bool = None,
+    on_output: Callable[[str], None] = None,
+    aggregate: bool = None,
+    enrich_zones: bool = None,
+    outputs: List[str] = None,
+    profile: bool = None,
+    memory_budget: int = None,
+    validate: bool = None
+) -> List[Dict]:
     """
     Main function to run the extraction process
 
     Args:
         base_path: Base project path (defaults to Config.PROJECT_ROOT)
         raw_data_dir: Directory containing raw CSV files
-        output_dir: Directory for output Parquet files
+        output_dir: Directory for output Parquet files, or a gs://bucket/prefix to
+            stream "single" outputs to without writing them locally
+        engine: CSV parsing engine, "pyarrow" or "pandas" (defaults to Config.EXTRACT_ENGINE)
+        workers: Number of files converted concurrently (defaults to Config.EXTRACT_WORKERS)
+        parse_workers: Processes splitting one large file into byte ranges
+            (defaults to Config.PARSE_WORKERS)
+        output_mode: "single", "parts" or "partitioned" (defaults to Config.OUTPUT_MODE)
+        incremental: Skip unchanged inputs and resume interrupted "parts"
+            conversions using the manifest (defaults to Config.INCREMENTAL)
+        on_output: Called once with the path of every finished Parquet file while
+            extraction continues (e.g. load_to_gcp.UploadQueue.submit). Part
+            files are handed over as they are committed when files are converted
+            in-process, otherwise each output once its file is done. An
+            exception raised by the callback stops the extraction.
+        aggregate: Build trip aggregates during conversion and merge them into
+            <output_dir>/aggregates/ (defaults to Config.EXTRACT_AGGREGATES)
+        enrich_zones: Add pickup/dropoff zone columns to trip outputs from the
+            taxi zone lookup (defaults to Config.ENRICH_ZONES)
+        outputs: Output names of the work items to convert, e.g.
+            ["yellow_taxi_2019-12"] (defaults to every file found, see
+            sources.discover_sources). Partial aggregates are only merged when
+            everything is converted; otherwise call write_aggregates once
+            every item is done.
+        profile: Write a CPU and allocation profile of each conversion to
+            <PROFILES_DIR>/<run_id>/ (defaults to Config.PROFILE)
+        memory_budget: Target peak memory in bytes of the extraction, shared
+            evenly by the files converted at once; chunk sizes adapt to it
+            (defaults to Config.MEMORY_BUDGET_BYTES, 0 for fixed chunk sizes)
+        validate: Quarantine trip rows failing the Config.VALIDATION_RULES
+            data-quality rules to <output_dir>/quarantine/ instead of
+            writing them (defaults to Config.VALIDATE_TRIPS)
+
+    Returns:
+        One result dict per work item (see convert_file), trip months first,
+        plus a "skipped" result for each missing non-trip source
+
+    Raises:
+        ExtractionError: If any file failed; the other files are still converted
+            and all results are available on the exception
     """
     logger.info("Starting data extraction process")
 
@@ -85,38 +1189,138 @@ def run_extraction(
 
     if not output_dir:
         output_dir = Config.PROCESSED_DATA_DIR
-    else:
+    elif not is_gcs_path(output_dir):
         output_dir = Path(output_dir)
 
-    # Ensure directories exist
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    # Define file paths
-    paths: Dict[str, Path] = {
-        "Yellow Taxi": raw_data_dir / Config.YELLOW_TAXI_CSV,
-        "Green Taxi": raw_data_dir / Config.GREEN_TAXI_CSV,
-        "Taxi Zone": raw_data_dir / Config.TAXI_ZONE_CSV
+    engine = engine or Config.EXTRACT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown extraction engine '{engine}', expected one of {ENGINES}")
+    output_mode = output_mode or Config.OUTPUT_MODE
+    if output_mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode '{output_mode}', expected one of {OUTPUT_MODES}")
+    workers = workers or Config.EXTRACT_WORKERS
+    logger.info(f"Using '{engine}' extraction engine with {workers} worker(s)")
+    options = {
+        "engine": engine,
+        "parse_workers": parse_workers or Config.PARSE_WORKERS,
+        "output_mode": output_mode,
+        "incremental": Config.INCREMENTAL if incremental is None else incremental,
+        "aggregate": Config.EXTRACT_AGGREGATES if aggregate is None else aggregate,
+        "validate": Config.VALIDATE_TRIPS if validate is None else validate,
     }
+    if options["validate"]:
+        # Unknown rule names fail the run before any file is converted
+        logger.info(f"Validating trips with rules: {', '.join(select_rules())}")
+        if output_mode == "parts" and options["parse_workers"] > 1:
+            raise ValueError(
+                "Validation of the 'parts' output mode requires parse_workers=1"
+            )
+    if Config.PROFILE if profile is None else profile:
+        options["profile_dir"] = str(profiling.run_directory(metrics.current().run_id))
+
+    if is_gcs_path(output_dir):
+        # The manifest, part files, partitioned datasets, aggregates and
+        # quarantines all live on local disk
+        if (output_mode != "single" or options["incremental"] or options["aggregate"]
+                or options["validate"]):
+            raise ValueError(
+                "Streaming to GCS supports only the 'single' output mode without "
+                "incremental extraction, aggregates or validation"
+            )
+    else:
+        # Ensure directories exist
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Discover work items: every month of the trip sources plus the fixed files
+    items = discover_sources(raw_data_dir)
+    if outputs is not None:
+        unknown = set(outputs) - {item["output"] for item in items}
+        if unknown:
+            raise ValueError(f"No raw file found for outputs {sorted(unknown)} in {raw_data_dir}")
+        items = [item for item in items if item["output"] in outputs]
 
-    # Check files exist
-    for name, path in paths.items():
-        if path.exists():
-            logger.info(f"[OK] {name} file found at: {path}")
+    zone_lookup = raw_data_dir / Config.DATA_FILES["Taxi Zone"]
+    if Config.ENRICH_ZONES if enrich_zones is None else enrich_zones:
+        if zone_lookup.exists():
+            options["zone_lookup"] = str(zone_lookup)
         else:
-            logger.warning(f"[MISSING] {name} file NOT found at: {path}")
+            logger.warning("Taxi zone lookup not found, trips will not be enriched")
+    if options["validate"] and zone_lookup.exists():
+        options["location_lookup"] = str(zone_lookup)
 
-    # Convert each CSV to Parquet
-    for name, path in paths.items():
-        if not path.exists():
-            logger.warning(f"Skipping {name} - file not found")
+    # Report missing sources
+    results: Dict[str, Dict] = {}
+    for item in items:
+        logger.info(f"[OK] {item['name']} file found at: {item['path']}")
+    found = {item["name"] for item in items}
+    missing = [] if outputs is not None else [name for name in Config.DATA_FILES if name not in found]
+    for name in missing:
+        if name in Config.TRIP_SOURCES.values():
+            logger.warning(f"[MISSING] No {name} files matching {Config.TRIP_FILE_PATTERN}")
             continue
+        logger.warning(f"[MISSING] {name} file NOT found at: {raw_data_dir / Config.DATA_FILES[name]}")
+        logger.warning(f"Skipping {name} - file not found")
+        stem = output_name(name)
+        results[stem] = {"name": name, "month": None, "output_name": stem,
+                         "status": "skipped", "output": None,
+                         "rows": 0, "quarantined": 0, "seconds": 0.0, "error": "file not found"}
+
+    emitted = set()
+
+    def emit(output: str) -> None:
+        if output not in emitted:
+            emitted.add(output)
+            on_output(output)
+
+    def emit_result(result: Dict) -> None:
+        for output in _output_files(result):
+            emit(output)
+
+    budget = Config.MEMORY_BUDGET_BYTES if memory_budget is None else memory_budget
+    if budget:
+        # Each conversion running at once gets an even share
+        options["memory_budget"] = budget // max(min(workers, len(items)), 1)
+        logger.info(f"Memory budget of {options['memory_budget'] / 1024 / 1024:.0f} MiB per conversion")
+
+    # Convert each CSV to Parquet
+    logger.info(f"Converting {len(items)} file(s)")
+    if workers > 1 and len(items) > 1:
+        results.update(_convert_in_pool(
+            items, output_dir, min(workers, len(items)),
+            on_result=emit_result if on_output else None, **options
+        ))
+    else:
+        for item in items:
+            results[item["output"]] = convert_file(
+                item["name"], item["path"], str(output_dir), month=item["month"],
+                on_output=emit if on_output else None, **options
+            )
+            if on_output:
+                emit_result(results[item["output"]])
+
+    ordered = [results[item["output"]] for item in items] + [
+        result for result in results.values() if result["status"] == "skipped"
+    ]
+    # Stage records of each conversion, made in-process or by a pool worker
+    recorder = metrics.current()
+    for result in ordered:
+        recorder.extend(result.get("metrics", []))
+    for result in ordered:
+        quarantined = f", {result['quarantined']} quarantined" if result.get("quarantined") else ""
+        logger.info(
+            f"{result['name']}: {result['status']} "
+            f"({result['rows']} rows in {result['seconds']}s{quarantined})"
+        )
+
+    failed = [result["output_name"] for result in ordered if result["status"] == "failed"]
+    if failed:
+        raise ExtractionError(f"Extraction failed for: {', '.join(failed)}", ordered)
 
-        logger.info(f"\n=== Converting {name} to Parquet ===")
-        df_iter = returnBatches(str(path), Config.CHUNK_SIZE)
-        parquet_file = output_dir / f"{name.replace(' ', '_').lower()}.parquet"
-        return_parquet(df_iter, str(parquet_file))
+    if options["aggregate"] and outputs is None:
+        write_aggregates(output_dir, zone_lookup)
 
     logger.info("Extraction completed successfully!")
+    return ordered
 
 
 if __name__ == "__main__":
@@ -134,3 +1338,4 @@ if __name__ == "__main__":
         raw_data_dir=str(legacy_raw_data),
         output_dir=str(legacy_output)
     )
+    metrics.current().write_summary("extract")
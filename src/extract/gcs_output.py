@@ -0,0 +1,136 @@
+"""
+Streaming Parquet output to Google Cloud Storage
+"""
+from contextlib import contextmanager
+from typing import Iterator, Tuple, Union
+
+from google.cloud import storage
+from google.cloud.storage.fileio import BlobWriter
+
+from ..utils.config import Config
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+GCS_SCHEME = "gs://"
+
+
+def is_gcs_path(path: str) -> bool:
+    """
+    Check whether an output path is a gs://bucket/object URI
+
+    Args:
+        path: Output path
+
+    Returns:
+        True for GCS URIs
+    """
+    return str(path).startswith(GCS_SCHEME)
+
+
+def split_gcs_path(gcs_uri: str) -> Tuple[str, str]:
+    """
+    Split a gs://bucket/object URI
+
+    Args:
+        gcs_uri: GCS URI
+
+    Returns:
+        Tuple of (bucket name, object name)
+    """
+    bucket_name, _, blob_name = gcs_uri[len(GCS_SCHEME):].partition("/")
+    if not bucket_name or not blob_name:
+        raise ValueError(f"Expected gs://bucket/object, got '{gcs_uri}'")
+    return bucket_name, blob_name
+
+
+def open_gcs_writer(
+    gcs_uri: str,
+    chunk_size: int = None,
+    client: storage.Client = None
+) -> BlobWriter:
+    """
+    Open a resumable upload to a GCS object as a writable file
+
+    Written bytes are buffered and sent one chunk at a time, so memory use is
+    bounded by the chunk size whatever the object size. The object only
+    appears once the writer is closed.
+
+    Args:
+        gcs_uri: Destination gs://bucket/object URI
+        chunk_size: Upload chunk size in bytes, a multiple of 256 KiB
+            (defaults to Config.GCS_STREAM_CHUNK_BYTES)
+        client: Existing storage client to reuse (a new one is created otherwise)
+
+    Returns:
+        Writable file object
+    """
+    bucket_name, blob_name = split_gcs_path(gcs_uri)
+    client = client or storage.Client()
+    blob = client.bucket(bucket_name).blob(
+        blob_name, chunk_size=chunk_size or Config.GCS_STREAM_CHUNK_BYTES
+    )
+    # ParquetWriter flushes its sink; a resumable upload can only flush on close
+    return blob.open("wb", ignore_flush=True, content_type="application/octet-stream")
+
+
+def abandon_upload(writer: BlobWriter) -> None:
+    """
+    Drop a streaming upload without publishing the object
+
+    A BlobWriter finalizes its upload when closed, including by the garbage
+    collector, as long as its buffer is open; closing the buffer first makes
+    any later close a no-op. A resumable session already started is then
+    cancelled (an unfinished session never creates an object and expires on
+    its own, so a failed cancel is only logged).
+
+    Args:
+        writer: Writer from open_gcs_writer
+    """
+    writer._buffer.close()
+    if writer._upload_and_transport is None:
+        return
+    upload, transport = writer._upload_and_transport
+    try:
+        transport.request("DELETE", upload.resumable_url)
+    except Exception as e:
+        logger.warning(f"Could not cancel the resumable upload session: {e}")
+
+
+@contextmanager
+def parquet_sink(
+    path: str,
+    client: storage.Client = None
+) -> Iterator[Union[str, BlobWriter]]:
+    """
+    Resolve an output path to something pq.ParquetWriter can write to
+
+    Local paths are passed through. For gs:// URIs a streaming writer is
+    yielded and finalized when the block exits cleanly; if it raises, the
+    upload is abandoned (see abandon_upload) so no truncated object is
+    published. Nothing is created if nothing was written.
+
+    Args:
+        path: Local path or gs://bucket/object URI
+        client: Existing storage client to reuse
+
+    Yields:
+        Local path or writable file object
+    """
+    if not is_gcs_path(path):
+        yield path
+        return
+
+    writer = open_gcs_writer(path, client=client)
+    try:
+        yield writer
+    except BaseException:
+        abandon_upload(writer)
+        logger.warning(f"Abandoned the upload of {path}")
+        raise
+    size = writer.tell()
+    if size:
+        writer.close()
+        logger.info(f"Finalized {path} ({size} bytes)")
+    else:
+        abandon_upload(writer)
@@ -0,0 +1,134 @@
+"""
+Conversion manifest for incremental, resumable extraction
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Directory inside the processed data directory holding one record per source
+MANIFEST_DIR = ".manifest"
+
+_HASH_BLOCK_BYTES = 8 * 1024 * 1024
+
+
+def file_hash(path: str) -> str:
+    """
+    Compute the SHA-256 of a file without loading it into memory
+
+    Args:
+        path: Path to file
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Per-source conversion records stored as <output_dir>/.manifest/<stem>.json
+
+    Each record holds the source path, size, mtime and content hash, the output
+    it was converted to, rows written, the last committed chunk and a status of
+    "in_progress" or "complete". One file per source keeps concurrent workers
+    from overwriting each other's records.
+    """
+
+    def __init__(self, output_dir: str):
+        self.directory = Path(output_dir) / MANIFEST_DIR
+        # (path, size, mtime_ns) -> SHA-256, so a source is read once per run
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+
+    def file_hash(self, path: str) -> str:
+        """
+        Get the SHA-256 of a source, computed once per size and mtime
+
+        The unchanged check and the new record of a changed source both need
+        it; caching it keeps multi-GB inputs from being read twice.
+
+        Args:
+            path: Path to the source file
+
+        Returns:
+            Hex digest
+        """
+        stat = os.stat(path)
+        key = (str(path), stat.st_size, stat.st_mtime_ns)
+        if key not in self._hashes:
+            self._hashes[key] = file_hash(path)
+        return self._hashes[key]
+
+    def _path(self, stem: str) -> Path:
+        return self.directory / f"{stem}.json"
+
+    def get(self, stem: str) -> Optional[Dict]:
+        """
+        Get the record for a source
+
+        Args:
+            stem: Output name of the source (e.g. "yellow_taxi")
+
+        Returns:
+            Record dict, or None if the source was never converted
+        """
+        path = self._path(stem)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    def save(self, stem: str, entry: Dict) -> None:
+        """
+        Atomically write the record for a source
+
+        Args:
+            stem: Output name of the source
+            entry: Record dict
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry["updated_at"] = datetime.now(timezone.utc).isoformat()
+        tmp_path = self._path(stem).with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(entry, indent=2))
+        os.replace(tmp_path, self._path(stem))
+
+    def is_unchanged(self, stem: str, path: str, output_mode: str) -> bool:
+        """
+        Check whether a source was fully converted and has not changed since
+
+        Size and mtime are compared first; the content hash is only computed
+        when the mtime moved but the size did not (e.g. a re-download).
+
+        Args:
+            stem: Output name of the source
+            path: Path to the source file
+            output_mode: Output mode of the current run
+
+        Returns:
+            True if the existing output can be reused
+        """
+        entry = self.get(stem)
+        if (
+            not entry
+            or entry["status"] != "complete"
+            or entry["output_mode"] != output_mode
+            or not Path(entry["output"]).exists()
+        ):
+            return False
+
+        stat = os.stat(path)
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime == entry["mtime"]:
+            return True
+
+        if self.file_hash(path) == entry["sha256"]:
+            entry["mtime"] = stat.st_mtime
+            self.save(stem, entry)
+            return True
+        return False
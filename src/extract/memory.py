@@ -0,0 +1,213 @@
+"""
+Memory-budgeted chunk, block and row group sizing for extraction
+
+With a budget, chunk sizes follow the bytes a row takes in memory instead of
+a fixed row count, so wide and narrow files convert within the same peak
+memory. The row size is first estimated from a parsed sample of the file,
+then measured again on every chunk; later chunks follow the largest row size
+of the last few chunks. The pyarrow reader's block size is fixed when the
+file is opened, so its batches are sliced to the current chunk size instead.
+"""
+from collections import deque
+from typing import Optional
+
+import pyarrow as pa
+
+from ..utils.logger import setup_logger
+from ..utils.metrics import current_rss_bytes
+
+logger = setup_logger(__name__)
+
+# Copies of a chunk's Arrow data alive at once: the converted table, the
+# output of the extraction stages, the Parquet encoder's column buffers and
+# the previous chunk, still referenced while the next one is read
+ARROW_COPIES = 4
+
+# Dictionary and data page buffers the Parquet writer keeps per column
+WRITER_COLUMN_BYTES = 1024 * 1024
+
+# Page buffers per column of each open partition file of a partitioned dataset
+PARTITION_COLUMN_BYTES = 64 * 1024
+
+# Buffered rows of a row group held twice: the pending chunks and their encoding
+ROW_GROUP_COPIES = 2
+
+# Share of the available memory given to buffered row groups when they are
+# larger than a chunk
+ROW_GROUP_SHARE = 0.5
+
+# Chunks measured to size the next one
+MEASURED_CHUNKS = 3
+
+MIN_CHUNK_ROWS = 1_000
+MAX_CHUNK_ROWS = 1 << 20
+
+_MIN_BLOCK_BYTES = 64 * 1024
+_MB = 1024 * 1024
+
+
+# Raw blocks the Arrow streaming CSV reader queues ahead on its I/O thread
+RAW_READAHEAD_BLOCKS = 32
+
+
+def _parsed_blocks() -> int:
+    """Blocks the multi-threaded Arrow CSV reader parses ahead, plus the one consumed"""
+    return pa.cpu_count() + 1
+
+
+class MemoryBudget:
+    """
+    Sizes the chunks, reader blocks and row groups of one conversion
+
+    A chunk in flight costs, per row, its raw CSV bytes for every block the
+    pyarrow reader reads or parses ahead and its Arrow bytes for every block
+    parsed (or, with pandas, the parser's peak allocations plus the
+    DataFrame), plus ARROW_COPIES times its Arrow bytes while it is
+    converted, staged and encoded. Buffered row groups cost ROW_GROUP_COPIES
+    times their Arrow bytes, and the Parquet writer WRITER_COLUMN_BYTES per
+    column. Whatever the process already uses when the conversion starts is
+    taken off the budget first.
+
+    A partitioned dataset keeps a Parquet writer per open partition file,
+    whose buffers only hold the small share of each chunk that falls on its
+    partition; each open file is budgeted PARTITION_COLUMN_BYTES per column.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        engine: str,
+        raw_row_bytes: float,
+        arrow_row_bytes: float,
+        pandas_row_bytes: float = 0.0,
+        parse_row_bytes: float = 0.0,
+        columns: int = 0,
+        row_group_rows: int = None,
+        baseline_bytes: int = None,
+        open_files: int = 1
+    ):
+        """
+        Args:
+            budget_bytes: Target peak memory of the process
+            engine: CSV parsing engine, "pyarrow" or "pandas"
+            raw_row_bytes: Average CSV line length in bytes
+            arrow_row_bytes: Estimated Arrow bytes per row
+            pandas_row_bytes: Estimated pandas DataFrame bytes per row (pandas engine)
+            parse_row_bytes: Peak bytes per row allocated by the pandas parser
+                while it tokenizes and converts a chunk (pandas engine)
+            columns: Number of columns written
+            row_group_rows: Requested rows per Parquet row group (None for one
+                row group per chunk); reduced if the budget cannot hold them
+            baseline_bytes: Memory already in use (defaults to the current RSS)
+            open_files: Files written at once (the open partition files of
+                a partitioned dataset)
+        """
+        if baseline_bytes is None:
+            baseline_bytes = current_rss_bytes() or 0
+        self.budget_bytes = budget_bytes
+        self.engine = engine
+        self.raw_row_bytes = raw_row_bytes
+        self.parse_row_bytes = parse_row_bytes
+        open_files = max(open_files, 1)
+        writer_bytes = columns * (WRITER_COLUMN_BYTES if open_files == 1
+                                  else open_files * PARTITION_COLUMN_BYTES)
+        self.available = budget_bytes - baseline_bytes - writer_bytes
+        self.requested_row_group_rows = row_group_rows or None
+        self._measured = deque([(arrow_row_bytes, pandas_row_bytes)], maxlen=MEASURED_CHUNKS)
+        self._logged_rows = self.chunk_rows
+
+        if self.available < MIN_CHUNK_ROWS * self.row_cost:
+            logger.warning(
+                f"Memory budget of {budget_bytes / _MB:.0f} MiB leaves "
+                f"{max(self.available, 0) / _MB:.0f} MiB for chunks above the "
+                f"{baseline_bytes / _MB:.0f} MiB already in use and the Parquet writer's buffers; "
+                f"converting in the minimum chunks of {MIN_CHUNK_ROWS} rows"
+            )
+        logger.info(
+            f"Memory budget {budget_bytes / _MB:.0f} MiB ({self.available / _MB:.0f} MiB available): "
+            f"{raw_row_bytes:.0f} raw and {self.arrow_row_bytes:.0f} Arrow bytes per row; "
+            f"chunks of {self.chunk_rows} rows ({self.block_size / _MB:.1f} MiB blocks), "
+            + (f"row groups of {self.row_group_rows} rows" if self.row_group_rows
+               else "one row group per chunk")
+        )
+
+    @property
+    def arrow_row_bytes(self) -> float:
+        """Largest Arrow bytes per row of the last chunks measured"""
+        return max(arrow for arrow, _ in self._measured)
+
+    @property
+    def pandas_row_bytes(self) -> float:
+        """Largest pandas bytes per row of the last chunks measured"""
+        return max(pandas for _, pandas in self._measured)
+
+    @property
+    def row_cost(self) -> float:
+        """Memory held per row of a chunk in flight"""
+        copies = self.arrow_row_bytes * ARROW_COPIES
+        if self.engine == "pandas":
+            return self.parse_row_bytes + self.pandas_row_bytes + copies
+        parsed = _parsed_blocks()
+        return (self.raw_row_bytes * (RAW_READAHEAD_BLOCKS + parsed)
+                + self.arrow_row_bytes * parsed + copies)
+
+    @property
+    def row_group_rows(self) -> Optional[int]:
+        """Rows per Parquet row group, or None for one row group per chunk"""
+        if not self.requested_row_group_rows:
+            return None
+        affordable = self.available * ROW_GROUP_SHARE / (self.arrow_row_bytes * ROW_GROUP_COPIES)
+        return max(min(self.requested_row_group_rows, int(affordable)), MIN_CHUNK_ROWS)
+
+    @property
+    def chunk_rows(self) -> int:
+        """Rows per parse chunk"""
+        buffered = (self.row_group_rows or 0) * self.arrow_row_bytes * ROW_GROUP_COPIES
+        rows = int((self.available - buffered) / self.row_cost)
+        return min(max(rows, MIN_CHUNK_ROWS), MAX_CHUNK_ROWS)
+
+    @property
+    def block_size(self) -> int:
+        """Block size in bytes of the pyarrow CSV reader for chunks of chunk_rows"""
+        return max(int(self.chunk_rows * self.raw_row_bytes), _MIN_BLOCK_BYTES)
+
+    def range_bytes(self, workers: int, window: int) -> int:
+        """
+        Byte range size for parsing one file in parallel processes
+
+        This process holds up to window parsed ranges and each worker one raw
+        and parsed range. The result is rounded down to a power of two, so a
+        resumed conversion usually gets the same ranges.
+
+        Args:
+            workers: Parsing processes
+            window: Ranges in flight (see extract_parquet._ordered_map)
+
+        Returns:
+            Range size in bytes
+        """
+        per_row = (self.arrow_row_bytes * (window + ARROW_COPIES)
+                   + (self.raw_row_bytes + self.arrow_row_bytes * 2) * workers)
+        rows = max(int(self.available / per_row), MIN_CHUNK_ROWS)
+        target = max(int(rows * self.raw_row_bytes), _MIN_BLOCK_BYTES)
+        return 1 << (target.bit_length() - 1)
+
+    def observe(self, rows: int, arrow_bytes: int, pandas_bytes: int = 0) -> None:
+        """
+        Measure a converted chunk and resize the next ones
+
+        Args:
+            rows: Rows of the chunk
+            arrow_bytes: Arrow bytes of the chunk as converted
+            pandas_bytes: Bytes of the pandas DataFrame it was parsed into, if any
+        """
+        if not rows:
+            return
+        self._measured.append((arrow_bytes / rows, pandas_bytes / rows))
+        chunk_rows = self.chunk_rows
+        if abs(chunk_rows - self._logged_rows) > self._logged_rows / 4:
+            logger.info(
+                f"Chunk size adapted to {chunk_rows} rows "
+                f"({self.arrow_row_bytes:.0f} Arrow bytes per row measured)"
+            )
+            self._logged_rows = chunk_rows
@@ -0,0 +1,183 @@
+"""
+Declared Arrow schemas for the raw NYC taxi source files
+"""
+from typing import Dict, List, Optional, Tuple
+
+import pyarrow as pa
+
+# Dictionary type accepted by the pyarrow CSV reader for low-cardinality strings
+DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+
+# Monetary columns and trip_distance stay float64: float32 cannot hold cent
+# precision once widened to FLOAT64 in BigQuery (12.30 would become
+# 12.300000190734863, a 1.18 mile trip 1.1799999475479126)
+_FARE_FIELDS = [
+    pa.field("fare_amount", pa.float64()),
+    pa.field("extra", pa.float64()),
+    pa.field("mta_tax", pa.float64()),
+    pa.field("tip_amount", pa.float64()),
+    pa.field("tolls_amount", pa.float64()),
+]
+
+YELLOW_TAXI_SCHEMA = pa.schema([
+    pa.field("VendorID", pa.int8()),
+    pa.field("tpep_pickup_datetime", pa.timestamp("us")),
+    pa.field("tpep_dropoff_datetime", pa.timestamp("us")),
+    pa.field("passenger_count", pa.int8()),
+    pa.field("trip_distance", pa.float64()),
+    pa.field("RatecodeID", pa.int8()),
+    pa.field("store_and_fwd_flag", DICT_STRING),
+    pa.field("PULocationID", pa.int16()),
+    pa.field("DOLocationID", pa.int16()),
+    pa.field("payment_type", pa.int8()),
+    *_FARE_FIELDS,
+    pa.field("improvement_surcharge", pa.float64()),
+    pa.field("total_amount", pa.float64()),
+    pa.field("congestion_surcharge", pa.float64()),
+])
+
+GREEN_TAXI_SCHEMA = pa.schema([
+    pa.field("VendorID", pa.int8()),
+    pa.field("lpep_pickup_datetime", pa.timestamp("us")),
+    pa.field("lpep_dropoff_datetime", pa.timestamp("us")),
+    pa.field("store_and_fwd_flag", DICT_STRING),
+    pa.field("RatecodeID", pa.int8()),
+    pa.field("PULocationID", pa.int16()),
+    pa.field("DOLocationID", pa.int16()),
+    pa.field("passenger_count", pa.int8()),
+    pa.field("trip_distance", pa.float64()),
+    *_FARE_FIELDS,
+    pa.field("ehail_fee", pa.float64()),
+    pa.field("improvement_surcharge", pa.float64()),
+    pa.field("total_amount", pa.float64()),
+    pa.field("payment_type", pa.int8()),
+    pa.field("trip_type", pa.int8()),
+    pa.field("congestion_surcharge", pa.float64()),
+])
+
+TAXI_ZONE_SCHEMA = pa.schema([
+    pa.field("LocationID", pa.int16()),
+    pa.field("Borough", DICT_STRING),
+    pa.field("Zone", DICT_STRING),
+    pa.field("service_zone", DICT_STRING),
+])
+
+# Keyed by the source names in Config.DATA_FILES
+SCHEMAS: Dict[str, pa.Schema] = {
+    "Yellow Taxi": YELLOW_TAXI_SCHEMA,
+    "Green Taxi": GREEN_TAXI_SCHEMA,
+    "Taxi Zone": TAXI_ZONE_SCHEMA,
+}
+
+
+# Timestamp column each trip source is partitioned on
+PICKUP_COLUMNS: Dict[str, str] = {
+    "Yellow Taxi": "tpep_pickup_datetime",
+    "Green Taxi": "lpep_pickup_datetime",
+}
+
+
+# Dropoff timestamp column of each trip source
+DROPOFF_COLUMNS: Dict[str, str] = {
+    "Yellow Taxi": "tpep_dropoff_datetime",
+    "Green Taxi": "lpep_dropoff_datetime",
+}
+
+
+def get_schema(name: str) -> Optional[pa.Schema]:
+    """
+    Get the declared schema for a source
+
+    Args:
+        name: Source name (e.g. "Yellow Taxi")
+
+    Returns:
+        Declared Arrow schema, or None if the source has no declared schema
+    """
+    return SCHEMAS.get(name)
+
+
+def get_pickup_column(name: str) -> Optional[str]:
+    """
+    Get the pickup timestamp column of a trip source
+
+    Args:
+        name: Source name (e.g. "Yellow Taxi")
+
+    Returns:
+        Column name, or None for sources without pickup times (e.g. "Taxi Zone")
+    """
+    return PICKUP_COLUMNS.get(name)
+
+
+def get_dropoff_column(name: str) -> Optional[str]:
+    """
+    Get the dropoff timestamp column of a trip source
+
+    Args:
+        name: Source name (e.g. "Yellow Taxi")
+
+    Returns:
+        Column name, or None for sources without dropoff times (e.g. "Taxi Zone")
+    """
+    return DROPOFF_COLUMNS.get(name)
+
+
+def arrow_column_types(schema: pa.Schema) -> Dict[str, pa.DataType]:
+    """
+    Build the column_types mapping for pyarrow.csv.ConvertOptions
+
+    Args:
+        schema: Declared Arrow schema
+
+    Returns:
+        Mapping of column name to Arrow type
+    """
+    return {field.name: field.type for field in schema}
+
+
+def pandas_read_options(schema: pa.Schema) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Translate a declared schema into pandas read_csv dtype and parse_dates arguments
+
+    Args:
+        schema: Declared Arrow schema
+
+    Returns:
+        Tuple of (dtype mapping, list of datetime columns)
+    """
+    dtypes = {}
+    parse_dates = []
+
+    for field in schema:
+        if pa.types.is_timestamp(field.type):
+            parse_dates.append(field.name)
+        elif pa.types.is_dictionary(field.type):
+            dtypes[field.name] = "category"
+        elif pa.types.is_integer(field.type):
+            # Nullable extension dtype so NaNs don't force a float64 column
+            dtypes[field.name] = str(field.type).capitalize()
+        else:
+            dtypes[field.name] = field.type.to_pandas_dtype()
+
+    return dtypes, parse_dates
+
+
+def apply_schema(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """
+    Cast the declared columns of a table, leaving undeclared columns untouched
+
+    Args:
+        table: Arrow table parsed from a CSV chunk
+        schema: Declared Arrow schema
+
+    Returns:
+        Table whose declared columns match the schema types
+    """
+    target = pa.schema([
+        schema.field(field.name) if field.name in schema.names else field
+        for field in table.schema
+    ])
+    if table.schema.equals(target):
+        return table
+    return table.cast(target)
@@ -0,0 +1,90 @@
+"""
+Discovery of raw source files as month-tagged work items
+"""
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..utils.config import Config
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Month tag appended to the output name of a monthly trip file
+_MONTH_SUFFIX = re.compile(r"_\d{4}-\d{2}$")
+
+
+def output_name(name: str, month: Optional[str] = None) -> str:
+    """
+    Get the output name of a source, tagged with its month for trip files
+
+    Args:
+        name: Source name (e.g. "Yellow Taxi")
+        month: Month of the raw file (YYYY-MM), if any
+
+    Returns:
+        Output name, e.g. "yellow_taxi_2019-12" or "taxi_zone"
+    """
+    stem = name.replace(' ', '_').lower()
+    return f"{stem}_{month}" if month else stem
+
+
+def base_output(output: str) -> str:
+    """
+    Strip the month tag from an output name
+
+    Args:
+        output: Output name (e.g. "yellow_taxi_2019-12")
+
+    Returns:
+        Output name shared by all months of the source (e.g. "yellow_taxi"),
+        which is also its key in Config.BQ_TABLES
+    """
+    return _MONTH_SUFFIX.sub("", output)
+
+
+def discover_sources(raw_data_dir: str = None) -> List[Dict]:
+    """
+    List the raw files to convert as work items
+
+    Trip files are matched by Config.TRIP_FILE_PATTERN, so every month present
+    is picked up without configuration; other sources (the zone lookup) use
+    their fixed Config.DATA_FILES name.
+
+    Args:
+        raw_data_dir: Directory containing raw CSV files (defaults to Config.RAW_DATA_DIR)
+
+    Returns:
+        Work items, trip files by month then color followed by the other
+        sources, each a dict with name, color and month (None for non-trip
+        sources), path and output
+    """
+    raw_data_dir = Path(raw_data_dir) if raw_data_dir else Config.RAW_DATA_DIR
+    colors = list(Config.TRIP_SOURCES)
+    pattern = re.compile(Config.TRIP_FILE_PATTERN)
+
+    trips = {}
+    for path in sorted(raw_data_dir.glob("*_tripdata_*")):
+        match = pattern.match(path.name)
+        if not match:
+            continue
+        color, month = match.group("color"), match.group("month")
+        if color not in Config.TRIP_SOURCES:
+            logger.debug(f"Ignoring {path.name}: no source for '{color}' trips")
+            continue
+        name = Config.TRIP_SOURCES[color]
+        output = output_name(name, month)
+        if output in trips:
+            # Both <file>.csv and a compressed copy: keep the uncompressed one
+            logger.warning(f"Duplicate raw files for {output}, using {trips[output]['path']}")
+            continue
+        trips[output] = {"name": name, "color": color, "month": month,
+                         "path": str(path), "output": output}
+
+    items = sorted(trips.values(), key=lambda item: (item["month"], colors.index(item["color"])))
+    for name, filename in Config.DATA_FILES.items():
+        path = raw_data_dir / filename
+        if name not in Config.TRIP_SOURCES.values() and path.exists():
+            items.append({"name": name, "color": None, "month": None,
+                          "path": str(path), "output": output_name(name)})
+    return items
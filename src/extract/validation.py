@@ -0,0 +1,274 @@
+"""
+Vectorized data-quality checks of trip chunks with a quarantine output
+"""
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from ..utils import metrics
+from ..utils.config import Config
+from ..utils.logger import setup_logger
+from .schemas import get_dropoff_column, get_pickup_column
+
+logger = setup_logger(__name__)
+
+# Rule name (the reason code of quarantined rows) -> description, in the
+# order reasons are assigned
+RULES: Dict[str, str] = {
+    "negative_fare": "fare_amount below 0",
+    "dropoff_before_pickup": "dropoff time before the pickup time",
+    "pickup_outside_month": "pickup time outside the month of the trip file",
+    "unknown_pickup_location": "PULocationID null or not in the taxi zone lookup",
+    "zero_distance": "trip_distance null or not above 0",
+}
+
+# Column added to quarantined rows
+REASON_COLUMN = "quarantine_reason"
+
+
+def select_rules(names: List[str] = None) -> List[str]:
+    """
+    Resolve the rules to check
+
+    Args:
+        names: Rule names (defaults to Config.VALIDATION_RULES, or every rule
+            if that is empty)
+
+    Returns:
+        Rule names in RULES order
+
+    Raises:
+        ValueError: If a name is not in RULES
+    """
+    names = names or Config.VALIDATION_RULES or list(RULES)
+    unknown = set(names) - set(RULES)
+    if unknown:
+        raise ValueError(f"Unknown validation rules {sorted(unknown)}, expected some of {list(RULES)}")
+    return [rule for rule in RULES if rule in names]
+
+
+def quarantine_path(output_dir: Path, stem: str) -> Path:
+    """
+    Get the location of a source's quarantined rows
+
+    The per-rule summary is written next to it as <stem>.json.
+
+    Args:
+        output_dir: Processed data directory
+        stem: Output name of the source (e.g. "yellow_taxi_2019-12")
+
+    Returns:
+        Path of <output_dir>/quarantine/<stem>.parquet
+    """
+    return Path(output_dir) / Config.QUARANTINE_DIR / f"{stem}.parquet"
+
+
+def _month_bounds(month: str) -> Tuple[datetime, datetime]:
+    """First instant of a YYYY-MM month and of the month after it"""
+    start = datetime.strptime(month, "%Y-%m")
+    end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    return start, end
+
+
+def _mask(condition: pa.ChunkedArray) -> np.ndarray:
+    """Boolean NumPy mask of a condition, rows where it is null not flagged"""
+    return pc.fill_null(condition, False).to_numpy(zero_copy_only=False)
+
+
+class TripValidator:
+    """
+    Extraction stage quarantining trip rows that fail data-quality rules
+
+    Each rule is a vectorized Arrow comparison over the whole chunk, turned
+    into a NumPy mask; the chunk is then filtered once. Rows passing every
+    rule are returned on their way to the Parquet writer, the others are
+    streamed to the quarantine file with the first rule they failed as their
+    reason code. Per-rule counts include every rule a row failed, so a row
+    can count towards several. Rules that need context the conversion lacks
+    (the file's month, the zone lookup) are left out with a warning.
+
+    Runs in the converting process: it writes the quarantine file itself, so
+    it cannot be handed to the parsing workers of "parts" conversions.
+    """
+
+    def __init__(
+        self,
+        pickup_column: str,
+        dropoff_column: str,
+        path: Path,
+        month: str = None,
+        location_ids: pa.Array = None,
+        rules: List[str] = None
+    ):
+        """
+        Args:
+            pickup_column: Pickup timestamp column of the source
+            dropoff_column: Dropoff timestamp column of the source
+            path: Quarantine Parquet file (see quarantine_path)
+            month: Month of the trip file (YYYY-MM) for pickup_outside_month
+            location_ids: Known LocationIDs for unknown_pickup_location
+            rules: Rules to check (see select_rules)
+        """
+        self.pickup_column = pickup_column
+        self.dropoff_column = dropoff_column
+        self.path = Path(path)
+        self.summary_path = self.path.with_suffix(".json")
+        self.month = month
+        self.location_ids = location_ids
+        self.rules = select_rules(rules)
+        missing = {
+            "pickup_outside_month": None if month else "the file has no month",
+            "unknown_pickup_location": None if location_ids is not None else "no taxi zone lookup",
+        }
+        for rule in [rule for rule in self.rules if missing.get(rule)]:
+            logger.warning(f"Validation rule {rule} skipped: {missing[rule]}")
+            self.rules.remove(rule)
+        self.counts: Dict[str, int] = dict.fromkeys(self.rules, 0)
+        self.rows_checked = 0
+        self.rows_quarantined = 0
+        self._reasons = pa.array(self.rules, pa.string())
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._recorder = metrics.current()
+        self._stage = self._recorder.start("validate", rules=",".join(self.rules))
+
+        # Quarantine and summary of a previous conversion of the same file,
+        # so a failed conversion leaves neither behind
+        self.path.unlink(missing_ok=True)
+        self.summary_path.unlink(missing_ok=True)
+
+    @classmethod
+    def for_source(
+        cls,
+        name: str,
+        path: Path,
+        month: str = None,
+        location_lookup: str = None,
+        rules: List[str] = None
+    ) -> "TripValidator":
+        """
+        Build a validator for a trip source
+
+        Args:
+            name: Trip source name (e.g. "Yellow Taxi")
+            path: Quarantine Parquet file (see quarantine_path)
+            month: Month of the trip file (YYYY-MM), if known
+            location_lookup: Path to the taxi zone lookup CSV, if any
+            rules: Rules to check (see select_rules)
+
+        Returns:
+            TripValidator
+        """
+        location_ids = None
+        if location_lookup:
+            location_ids = pv.read_csv(location_lookup, convert_options=pv.ConvertOptions(
+                include_columns=["LocationID"], column_types={"LocationID": pa.int32()}
+            ))["LocationID"].combine_chunks().drop_null()
+        return cls(get_pickup_column(name), get_dropoff_column(name), path, month,
+                   location_ids, rules)
+
+    def _failed(self, table: pa.Table, rule: str) -> np.ndarray:
+        """Mask of the rows of a chunk failing one rule"""
+        if rule == "negative_fare":
+            return _mask(pc.less(table["fare_amount"], 0))
+        if rule == "dropoff_before_pickup":
+            return _mask(pc.less(table[self.dropoff_column], table[self.pickup_column]))
+        if rule == "pickup_outside_month":
+            pickup = table[self.pickup_column]
+            start, end = (pa.scalar(bound, pickup.type) for bound in _month_bounds(self.month))
+            return _mask(pc.or_(pc.less(pickup, start), pc.greater_equal(pickup, end)))
+        if rule == "unknown_pickup_location":
+            location = pc.cast(table["PULocationID"], pa.int32())
+            # Null IDs are not in the value set, so they fail too
+            return ~pc.is_in(location, value_set=self.location_ids).to_numpy(zero_copy_only=False)
+        if rule == "zero_distance":
+            return ~_mask(pc.greater(table["trip_distance"], 0))
+        raise ValueError(f"Unknown validation rule '{rule}'")
+
+    def __call__(self, table: pa.Table) -> pa.Table:
+        with self._stage.chunk():
+            # Index of the first failed rule of each row, -1 for valid rows
+            reasons = np.full(table.num_rows, -1, dtype=np.int8)
+            for index, rule in enumerate(self.rules):
+                failed = self._failed(table, rule)
+                self.counts[rule] += int(failed.sum())
+                reasons[(reasons < 0) & failed] = index
+            invalid = reasons >= 0
+            quarantined = int(invalid.sum())
+            self.rows_checked += table.num_rows
+            self._stage.add(rows=table.num_rows, input_bytes=table.nbytes)
+            if not quarantined:
+                return table
+
+            rejected = table.filter(pa.array(invalid)).append_column(
+                REASON_COLUMN,
+                pa.DictionaryArray.from_arrays(pa.array(reasons[invalid]), self._reasons)
+            )
+            if self._writer is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._writer = pq.ParquetWriter(self.path, rejected.schema,
+                                                compression=Config.COMPRESSION)
+            self._writer.write_table(rejected)
+            self.rows_quarantined += quarantined
+            return table.filter(pa.array(~invalid))
+
+    def summary(self) -> Dict:
+        """
+        Per-rule counts of the rows checked so far
+
+        Returns:
+            Dict with rows_checked, rows_quarantined, the rule counts and the
+            quarantine file (None if no row failed)
+        """
+        return {
+            "rows_checked": self.rows_checked,
+            "rows_quarantined": self.rows_quarantined,
+            "rules": dict(self.counts),
+            "quarantine": str(self.path) if self.rows_quarantined else None,
+        }
+
+    def close(self, status: str = "success") -> Dict:
+        """
+        Close the quarantine file and write the summary next to it
+
+        Args:
+            status: Status of the validate stage record ("failed" if the
+                conversion failed; the partial quarantine is then removed
+                and no summary is written)
+
+        Returns:
+            Summary (see summary())
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        summary = self.summary()
+        if status == "success":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Written once the quarantine is closed, and renamed into place
+            # so it never describes a partial quarantine
+            temp_path = self.summary_path.with_suffix(".json.tmp")
+            temp_path.write_text(json.dumps(summary, indent=2))
+            os.replace(temp_path, self.summary_path)
+            if self.rows_quarantined:
+                logger.warning(
+                    f"Quarantined {self.rows_quarantined} of {self.rows_checked} rows to "
+                    f"{self.path}: {self.counts}"
+                )
+            else:
+                logger.info(f"All {self.rows_checked} rows passed validation")
+        else:
+            self.path.unlink(missing_ok=True)
+        if self._stage is not None:
+            self._stage.details = {"rows_quarantined": self.rows_quarantined, "rules": dict(self.counts)}
+            self._stage.add(output_bytes=self.path.stat().st_size if self.path.exists() else 0)
+            self._recorder.add(self._stage.finish(status))
+            self._stage = None
+        return summary
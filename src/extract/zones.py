@@ -0,0 +1,115 @@
+"""
+Taxi zone enrichment of trip chunks through dense LocationID-indexed arrays
+"""
+from typing import Dict
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+
+from ..utils.logger import setup_logger
+from .schemas import TAXI_ZONE_SCHEMA, arrow_column_types
+
+logger = setup_logger(__name__)
+
+# Same fallback the intermediate models used for unmatched location IDs
+UNKNOWN = "UNKNOWN"
+
+# Lookup column -> suffix of the enriched trip columns
+ZONE_ATTRIBUTES = {
+    "Zone": "zone",
+    "Borough": "borough",
+    "service_zone": "service_zone",
+}
+
+# Trip location column -> prefix of its enriched columns
+LOCATION_COLUMNS = {
+    "PULocationID": "pickup",
+    "DOLocationID": "dropoff",
+}
+
+
+class ZoneEnricher:
+    """
+    Extraction stage adding pickup/dropoff zone, borough and service_zone
+
+    The zone lookup is read once into one dense array per attribute, indexed
+    by LocationID, holding codes into a small dictionary whose first entry is
+    UNKNOWN. Each chunk is then enriched with a vectorized take per column,
+    without a join; the new columns are dictionary-encoded, so they add one
+    small integer per row. Null, missing and out-of-range location IDs map to
+    UNKNOWN. The enricher keeps no per-chunk state and can be pickled to the
+    parsing workers.
+    """
+
+    def __init__(self, lookup: pa.Table):
+        """
+        Args:
+            lookup: Taxi zone lookup with LocationID and the ZONE_ATTRIBUTES columns
+        """
+        location_ids = lookup["LocationID"].to_numpy(zero_copy_only=False)
+        self.size = int(location_ids.max()) + 1 if len(location_ids) else 1
+        self._codes: Dict[str, np.ndarray] = {}
+        self._dictionaries: Dict[str, pa.Array] = {}
+
+        for column in ZONE_ATTRIBUTES:
+            values = pc.fill_null(pc.cast(lookup[column], pa.string()), UNKNOWN)
+            dictionary = pc.unique(pa.concat_arrays([
+                pa.array([UNKNOWN]), values.combine_chunks()
+            ]))
+            codes = np.zeros(self.size, dtype=np.int32)
+            codes[location_ids] = pc.index_in(values, value_set=dictionary).to_numpy(
+                zero_copy_only=False
+            )
+            self._codes[column] = codes
+            self._dictionaries[column] = dictionary
+
+        logger.info(f"Loaded {len(location_ids)} taxi zones")
+
+    @classmethod
+    def from_csv(cls, path: str) -> "ZoneEnricher":
+        """
+        Build an enricher from the taxi zone lookup CSV
+
+        Args:
+            path: Path to the taxi zone lookup file
+
+        Returns:
+            ZoneEnricher
+        """
+        column_types = arrow_column_types(TAXI_ZONE_SCHEMA)
+        # Plain strings here; the dictionaries are built by the enricher itself
+        column_types.update({column: pa.string() for column in ZONE_ATTRIBUTES})
+        lookup = pv.read_csv(path, convert_options=pv.ConvertOptions(
+            column_types=column_types, strings_can_be_null=True
+        ))
+        return cls(lookup)
+
+    def _slots(self, location_ids: pa.ChunkedArray) -> np.ndarray:
+        """Map location IDs to array slots, sending nulls and unknown IDs to slot 0"""
+        ids = pc.fill_null(pc.cast(location_ids, pa.int32()), 0).to_numpy()
+        return np.where((ids > 0) & (ids < self.size), ids, 0)
+
+    def lookup(self, location_ids: pa.ChunkedArray, column: str = "Zone") -> pa.DictionaryArray:
+        """
+        Look up one zone attribute of each location ID
+
+        Args:
+            location_ids: Location IDs (e.g. a trip's PULocationID column)
+            column: Lookup column, one of ZONE_ATTRIBUTES
+
+        Returns:
+            Dictionary-encoded values, UNKNOWN for null and unknown IDs
+        """
+        return pa.DictionaryArray.from_arrays(
+            pa.array(self._codes[column].take(self._slots(location_ids))), self._dictionaries[column]
+        )
+
+    def __call__(self, table: pa.Table) -> pa.Table:
+        for location_column, prefix in LOCATION_COLUMNS.items():
+            for column, suffix in ZONE_ATTRIBUTES.items():
+                table = table.append_column(
+                    f"{prefix}_{suffix}", self.lookup(table[location_column], column)
+                )
+        return table
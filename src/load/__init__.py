@@ -2,6 +2,24 @@
 Load module for uploading data to Google Cloud Platform
 """
 
-from .load_to_gcp import run_load, upload_to_gcs, load_to_bq
+from .load_to_gcp import (
+    run_load,
+    upload_to_gcs,
+    load_to_bq,
+    load_many_to_bq,
+    GCSUploader,
+    UploadQueue,
+    UploadError,
+    LoadError,
+)
 
-__all__ = ["run_load", "upload_to_gcs", "load_to_bq"]
+__all__ = [
+    "run_load",
+    "upload_to_gcs",
+    "load_to_bq",
+    "load_many_to_bq",
+    "GCSUploader",
+    "UploadQueue",
+    "UploadError",
+    "LoadError",
+]
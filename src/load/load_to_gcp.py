@@ -1,18 +1,87 @@
 """
 Load module for uploading data to Google Cloud Platform (GCS and BigQuery)
 """
+import base64
+import hashlib
+import json
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+import google_crc32c
+from google.api_core.exceptions import NotFound
 from google.cloud import storage, bigquery
 
+from ..extract.manifest import Manifest
+from ..extract.sources import base_output, output_name
+from ..utils import metrics, profiling
 from ..utils.config import Config
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# GCS compose accepts at most 32 source objects per request
+MAX_COMPOSE_SOURCES = 32
 
-def upload_to_gcs(local_path: str, gcs_path: str, bucket_name: str = None) -> None:
+_CHECKSUM_BLOCK_BYTES = 8 * 1024 * 1024
+
+LOAD_MODES = ("truncate", "partitions")
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent saves are not serialized
+    fcntl = None
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on <path>.lock across processes"""
+    if fcntl is None:
+        yield
+        return
+    with open(path.with_suffix(path.suffix + ".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _save_merged(path: Path, merge: Callable[[Dict], Dict], **dump_options) -> Dict:
+    """
+    Merge changes into a JSON file shared with concurrent processes
+
+    The file is re-read under a lock, so entries written by other processes
+    since it was first loaded are kept.
+
+    Args:
+        path: JSON file
+        merge: Applies this process's changes to the current contents
+        dump_options: json.dumps options
+
+    Returns:
+        Merged contents
+    """
+    with _locked(path):
+        current = json.loads(path.read_text()) if path.exists() else {}
+        merged = merge(current)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(merged, indent=2, **dump_options))
+        os.replace(tmp_path, path)
+    return merged
+
+
+def upload_to_gcs(
+    local_path: str,
+    gcs_path: str,
+    bucket_name: str = None,
+    client: storage.Client = None
+) -> None:
     """
     Upload a file to Google Cloud Storage
 
@@ -20,10 +89,11 @@ def upload_to_gcs(local_path: str, gcs_path: str, bucket_name: str = None) -> No
         local_path: Local file path
         gcs_path: Destination path in GCS
         bucket_name: GCS bucket name (defaults to Config.GCS_BUCKET)
+        client: Existing storage client to reuse (a new one is created otherwise)
     """
     bucket_name = bucket_name or Config.GCS_BUCKET
 
-    client = storage.Client()
+    client = client or storage.Client()
     bucket = client.bucket(bucket_name)
     blob = bucket.blob(gcs_path)
     blob.upload_from_filename(local_path)
@@ -31,6 +101,450 @@ def upload_to_gcs(local_path: str, gcs_path: str, bucket_name: str = None) -> No
     logger.info(f"Uploaded {local_path} to gs://{bucket_name}/{gcs_path}")
 
 
+def local_crc32c(path: str) -> str:
+    """
+    Compute a file's CRC32C in the base64 form GCS reports, streaming the file
+
+    Args:
+        path: Local file path
+
+    Returns:
+        Base64-encoded big-endian CRC32C
+    """
+    checksum = google_crc32c.Checksum()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_CHECKSUM_BLOCK_BYTES), b""):
+            checksum.update(block)
+    return base64.b64encode(checksum.digest()).decode("ascii")
+
+
+class ChecksumCache:
+    """
+    Local CRC32C checksums keyed on (path, size, mtime) and persisted as JSON
+
+    A file is only rehashed when its size or mtime changed since it was cached.
+    """
+
+    def __init__(self, cache_path: Path = None):
+        """
+        Args:
+            cache_path: JSON file to persist to; the cache is in-memory only if None
+        """
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict]] = None
+        # Keys computed by this instance, merged into the file on save
+        self._changed: Set[str] = set()
+
+    def _load(self) -> Dict[str, Dict]:
+        """Read the backing file on first use (call with the lock held)"""
+        if self._entries is None:
+            self._entries = {}
+            if self.cache_path and self.cache_path.exists():
+                self._entries = json.loads(self.cache_path.read_text())
+        return self._entries
+
+    def crc32c(self, path: str) -> str:
+        """
+        Get the CRC32C of a file, computing it only if the cached value is stale
+
+        Args:
+            path: Local file path
+
+        Returns:
+            Base64-encoded CRC32C
+        """
+        stat = os.stat(path)
+        key = str(Path(path).resolve())
+        with self._lock:
+            entry = self._load().get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["crc32c"]
+
+        crc32c = local_crc32c(path)
+        with self._lock:
+            self._load()[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                                  "crc32c": crc32c}
+            self._changed.add(key)
+        return crc32c
+
+    def save(self) -> None:
+        """Persist the cache if it has a backing file, keeping other processes' entries"""
+        if not self.cache_path or self._entries is None:
+            return
+        with self._lock:
+            changed = {key: self._entries[key] for key in self._changed}
+
+            def merge(current: Dict) -> Dict:
+                current.update(changed)
+                return current
+
+            self._entries = _save_merged(self.cache_path, merge)
+            self._changed.clear()
+
+
+class UploadError(RuntimeError):
+    """Raised when one or more files fail to upload"""
+
+    def __init__(self, message: str, results: List[Dict]):
+        super().__init__(message)
+        self.results = results
+
+
+def _record_uploads(stage: metrics.StageMetrics, results: List[Dict]) -> None:
+    """Add upload results to an upload stage: bytes sent, per-file latency and status counts"""
+    for result in results:
+        if result["status"] == "uploaded":
+            stage.add(input_bytes=result["bytes"], output_bytes=result["bytes"])
+            stage.observe(result["seconds"])
+        stage.details[result["status"]] = stage.details.get(result["status"], 0) + 1
+
+
+class GCSUploader:
+    """
+    Upload files to one GCS bucket concurrently over a shared client
+
+    Files at or above the composite threshold are split into byte ranges that
+    are uploaded in parallel as temporary objects and then composed into the
+    destination object. The client honours STORAGE_EMULATOR_HOST, so the
+    uploader can be pointed at a local fake-GCS server.
+
+    With skip_unchanged, a file whose CRC32C matches the existing object's is
+    not uploaded again (CRC32C is used because composite objects have no MD5).
+    """
+
+    def __init__(
+        self,
+        bucket_name: str = None,
+        max_workers: int = None,
+        composite_threshold: int = None,
+        composite_parts: int = None,
+        client: storage.Client = None,
+        skip_unchanged: bool = None,
+        checksum_cache: ChecksumCache = None
+    ):
+        """
+        Args:
+            bucket_name: GCS bucket name (defaults to Config.GCS_BUCKET)
+            max_workers: Files uploaded concurrently (defaults to Config.UPLOAD_WORKERS)
+            composite_threshold: Size in bytes from which a file is uploaded as a
+                parallel composite upload (defaults to Config.COMPOSITE_THRESHOLD_BYTES)
+            composite_parts: Parts per composite upload, at most 32
+                (defaults to Config.COMPOSITE_PARTS)
+            client: Existing storage client to reuse
+            skip_unchanged: Skip files whose object already has the same CRC32C
+                (defaults to Config.SKIP_UNCHANGED_UPLOADS)
+            checksum_cache: Cache of local checksums (in-memory if None)
+        """
+        self.bucket_name = bucket_name or Config.GCS_BUCKET
+        self.client = client or storage.Client()
+        self.bucket = self.client.bucket(self.bucket_name)
+        self.max_workers = max_workers or Config.UPLOAD_WORKERS
+        self.composite_threshold = composite_threshold or Config.COMPOSITE_THRESHOLD_BYTES
+        self.composite_parts = min(composite_parts or Config.COMPOSITE_PARTS, MAX_COMPOSE_SOURCES)
+        self.skip_unchanged = (
+            Config.SKIP_UNCHANGED_UPLOADS if skip_unchanged is None else skip_unchanged
+        )
+        self.checksum_cache = checksum_cache or ChecksumCache()
+
+    def _upload_range(self, local_path: str, part_path: str, start: int, length: int) -> storage.Blob:
+        """Upload one byte range of a local file as its own object"""
+        blob = self.bucket.blob(part_path)
+        with open(local_path, "rb") as f:
+            f.seek(start)
+            blob.upload_from_file(f, size=length)
+        return blob
+
+    def _upload_composite(self, local_path: str, gcs_path: str, size: int) -> None:
+        """
+        Upload byte ranges in parallel and compose them into gcs_path
+
+        Parts go under Config.COMPOSITE_TMP_PREFIX, so the load wildcards
+        never match them, and are all deleted afterwards, also when a part
+        upload or the compose fails.
+        """
+        part_size = -(-size // self.composite_parts)
+        ranges = [(start, min(part_size, size - start)) for start in range(0, size, part_size)]
+        part_paths = [
+            f"{Config.COMPOSITE_TMP_PREFIX}/{gcs_path}.part-{i:02d}" for i in range(len(ranges))
+        ]
+
+        try:
+            # Leaving the executor waits for every part, failed or not
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [
+                    executor.submit(self._upload_range, local_path, part_path, start, length)
+                    for part_path, (start, length) in zip(part_paths, ranges)
+                ]
+            parts = [future.result() for future in futures]
+            self.bucket.blob(gcs_path).compose(parts)
+        finally:
+            for part_path in part_paths:
+                try:
+                    self.bucket.blob(part_path).delete()
+                except NotFound:
+                    pass
+
+    def upload_file(self, local_path: str, gcs_path: str) -> Dict:
+        """
+        Upload a single file
+
+        Args:
+            local_path: Local file path
+            gcs_path: Destination path in GCS
+
+        Returns:
+            Result dict with local_path, gcs_path, status, bytes, seconds and error
+        """
+        start = time.perf_counter()
+        size = os.path.getsize(local_path)
+
+        if self.skip_unchanged:
+            existing = self.bucket.get_blob(gcs_path)
+            if existing is not None and existing.crc32c == self.checksum_cache.crc32c(local_path):
+                logger.info(f"Skipped {local_path}, gs://{self.bucket_name}/{gcs_path} is identical")
+                return {"local_path": local_path, "gcs_path": gcs_path, "status": "skipped",
+                        "bytes": 0, "seconds": round(time.perf_counter() - start, 3),
+                        "error": None}
+
+        if size >= self.composite_threshold and self.composite_parts > 1:
+            self._upload_composite(local_path, gcs_path, size)
+        else:
+            self.bucket.blob(gcs_path).upload_from_filename(local_path)
+
+        seconds = round(time.perf_counter() - start, 3)
+        logger.info(f"Uploaded {local_path} to gs://{self.bucket_name}/{gcs_path} in {seconds}s")
+        return {"local_path": local_path, "gcs_path": gcs_path, "status": "uploaded",
+                "bytes": size, "seconds": seconds, "error": None}
+
+    def upload_many(self, files: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Upload files concurrently
+
+        Args:
+            files: List of (local_path, gcs_path) pairs
+
+        Returns:
+            One result dict per file, in input order
+
+        Raises:
+            UploadError: If any upload failed; the others still complete and all
+                results are available on the exception
+        """
+        def upload(local_path: str, gcs_path: str) -> Dict:
+            try:
+                return self.upload_file(local_path, gcs_path)
+            except Exception as e:
+                logger.error(f"Failed to upload {local_path}: {e}")
+                return {"local_path": local_path, "gcs_path": gcs_path, "status": "failed",
+                        "bytes": 0, "seconds": 0.0, "error": f"{type(e).__name__}: {e}"}
+
+        with metrics.stage("upload", bucket=self.bucket_name) as stage:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(lambda pair: upload(*pair), files))
+            self.checksum_cache.save()
+            _record_uploads(stage, results)
+
+            uploaded = [result for result in results if result["status"] == "uploaded"]
+            skipped = sum(1 for result in results if result["status"] == "skipped")
+            logger.info(
+                f"Uploaded {len(uploaded)} file(s), {sum(r['bytes'] for r in uploaded)} bytes; "
+                f"skipped {skipped} unchanged"
+            )
+
+            failed = [result["local_path"] for result in results if result["status"] == "failed"]
+            if failed:
+                raise UploadError(f"Upload failed for: {', '.join(failed)}", results)
+        return results
+
+
+class UploadQueue:
+    """
+    Upload files on background threads as a producer hands them over
+
+    Overlaps extraction with uploading: pass submit as run_extraction's
+    on_output callback and each finished Parquet file is uploaded while later
+    files are still being parsed. The queue is bounded, so a producer that
+    outpaces the network blocks instead of piling up outputs that are not yet
+    uploaded. After the first failed upload, submit raises UploadError so the
+    producer stops.
+
+    Use as a context manager: a clean exit waits for every upload, an exception
+    cancels the uploads that have not started.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        uploader: GCSUploader = None,
+        max_pending: int = None,
+        prefix: str = "raw_data"
+    ):
+        """
+        Args:
+            data_dir: Processed data directory; GCS paths keep the layout below it
+            uploader: Uploader to use (defaults to one caching checksums in data_dir)
+            max_pending: Files queued before submit blocks (defaults to Config.UPLOAD_QUEUE_DEPTH)
+            prefix: GCS path prefix
+        """
+        self.data_dir = Path(data_dir)
+        self.prefix = prefix
+        self.uploader = uploader or GCSUploader(
+            checksum_cache=ChecksumCache(self.data_dir / Config.CHECKSUM_CACHE_FILE)
+        )
+        self.results: List[Dict] = []
+        self._queue = queue.Queue(maxsize=max_pending or Config.UPLOAD_QUEUE_DEPTH)
+        self._lock = threading.Lock()
+        self._failed = threading.Event()
+        self._cancelled = threading.Event()
+        self._closed = False
+        self._recorder = metrics.current()
+        self._stage = self._recorder.start("upload", bucket=self.uploader.bucket_name,
+                                           mode="stream")
+        self._threads = [
+            threading.Thread(target=self._work, name=f"upload-{i}", daemon=True)
+            for i in range(self.uploader.max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self) -> None:
+        """Upload queued files until a None sentinel is received"""
+        while True:
+            local_path = self._queue.get()
+            try:
+                if local_path is None:
+                    return
+                if self._cancelled.is_set():
+                    continue
+                gcs_path = f"{self.prefix}/{Path(local_path).relative_to(self.data_dir).as_posix()}"
+                try:
+                    result = self.uploader.upload_file(local_path, gcs_path)
+                except Exception as e:
+                    logger.error(f"Failed to upload {local_path}: {e}")
+                    result = {"local_path": local_path, "gcs_path": gcs_path, "status": "failed",
+                              "bytes": 0, "seconds": 0.0, "error": f"{type(e).__name__}: {e}"}
+                    self._failed.set()
+                with self._lock:
+                    self.results.append(result)
+            finally:
+                self._queue.task_done()
+
+    def submit(self, local_path: str) -> None:
+        """
+        Queue a finished file for upload, blocking while the queue is full
+
+        Args:
+            local_path: Path of a Parquet file inside data_dir
+
+        Raises:
+            UploadError: If an earlier upload failed
+        """
+        if self._failed.is_set():
+            raise UploadError("An earlier upload failed, stopping", self.results)
+        self._queue.put(str(local_path))
+
+    def _stop(self) -> None:
+        """Stop the worker threads once the queue is drained"""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self.uploader.checksum_cache.save()
+
+    def _record_stage(self, status: str) -> None:
+        """Add the upload stage record covering the queue's lifetime"""
+        if self._stage is None:
+            return
+        _record_uploads(self._stage, self.results)
+        self._recorder.add(self._stage.finish(status))
+        self._stage = None
+
+    def close(self) -> List[Dict]:
+        """
+        Wait for every queued upload to finish
+
+        Returns:
+            One result dict per file (see GCSUploader.upload_file), in completion order
+
+        Raises:
+            UploadError: If any upload failed
+        """
+        self._stop()
+        uploaded = [result for result in self.results if result["status"] == "uploaded"]
+        logger.info(
+            f"Streamed {len(uploaded)} file(s), {sum(r['bytes'] for r in uploaded)} bytes; "
+            f"skipped {sum(1 for r in self.results if r['status'] == 'skipped')} unchanged"
+        )
+        failed = [result["local_path"] for result in self.results if result["status"] == "failed"]
+        self._record_stage("failed" if failed else "success")
+        if failed:
+            raise UploadError(f"Upload failed for: {', '.join(failed)}", self.results)
+        return self.results
+
+    def cancel(self) -> None:
+        """Drop queued uploads and wait only for the ones already running"""
+        self._cancelled.set()
+        self._stop()
+        self._record_stage("failed")
+        logger.warning(f"Upload queue cancelled after {len(self.results)} file(s)")
+
+    def __enter__(self) -> "UploadQueue":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is None:
+            self.close()
+        else:
+            self.cancel()
+        return False
+
+
+def _in_output(relative_path: Path, output: str) -> bool:
+    """Check whether a file under the processed data directory belongs to an output"""
+    names = list(relative_path.parent.parts) + [relative_path.stem]
+    return any(name == output or name.startswith(f"{output}-part-") for name in names)
+
+
+def collect_uploads(
+    data_dir: Path,
+    prefix: str = "raw_data",
+    outputs: List[str] = None
+) -> List[Tuple[str, str]]:
+    """
+    List the Parquet outputs of a processed data directory with their GCS paths
+
+    Single files map to <prefix>/<name>.parquet; part files, hive-partitioned
+    datasets and the month-tagged outputs of a source keep their relative
+    layout under <prefix>/<name>/.
+
+    Args:
+        data_dir: Processed data directory
+        prefix: GCS path prefix
+        outputs: Output names to include (e.g. ["yellow_taxi_2019-12"] for
+            one month, ["yellow_taxi"] for every month); all if None
+
+    Returns:
+        List of (local_path, gcs_path) pairs
+    """
+    files = []
+    for file in data_dir.iterdir():
+        if file.suffix == ".parquet":
+            candidates = [file]
+        elif file.is_dir():
+            candidates = sorted(file.rglob("*.parquet"))
+        else:
+            continue
+        for candidate in candidates:
+            relative_path = candidate.relative_to(data_dir)
+            if outputs is None or any(_in_output(relative_path, output) for output in outputs):
+                files.append((str(candidate), f"{prefix}/{relative_path.as_posix()}"))
+    return files
+
+
 def upload_folder(folder_path: str, prefix: str, bucket_name: str = None) -> None:
     """
     Upload all parquet files from a folder to GCS
@@ -42,39 +556,48 @@ def upload_folder(folder_path: str, prefix: str, bucket_name: str = None) -> Non
     """
     folder_path = Path(folder_path)
 
-    for file in folder_path.iterdir():
-        if file.suffix in ['.csv', '.parquet'] or file.name.endswith('.csv.gz'):
-            local_file = str(file)
-            gcs_file = f"{prefix}/{file.name}"
-            upload_to_gcs(local_file, gcs_file, bucket_name)
+    files = [
+        (str(file), f"{prefix}/{file.name}")
+        for file in folder_path.iterdir()
+        if file.suffix in ['.csv', '.parquet'] or file.name.endswith(('.csv.gz', '.csv.bz2', '.csv.zst', '.csv.xz'))
+    ]
+    GCSUploader(bucket_name).upload_many(files)
 
 
-def load_to_bq(
+def _start_load_job(
+    client: bigquery.Client,
     gcs_path: str,
     table_name: str,
-    source_format: str = "PARQUET",
-    project_id: str = None,
-    dataset: str = None,
-    bucket_name: str = None
-) -> None:
+    source_format: str,
+    dataset: str,
+    bucket_name: str,
+    partition_field: Optional[str] = None,
+    partition: Optional[str] = None,
+    clustering_fields: Optional[List[str]] = None
+) -> bigquery.LoadJob:
     """
-    Load data from GCS to BigQuery
+    Submit a load job without waiting for it to finish
 
     Args:
-        gcs_path: Path to file in GCS (without gs://bucket prefix)
+        client: BigQuery client
+        gcs_path: Path in GCS (without gs://bucket prefix)
         table_name: Target BigQuery table name
         source_format: Source file format (PARQUET or CSV)
-        project_id: GCP project ID (defaults to Config.PROJECT_ID)
-        dataset: BigQuery dataset name (defaults to Config.BQ_DATASET)
-        bucket_name: GCS bucket name (defaults to Config.GCS_BUCKET)
-    """
-    project_id = project_id or Config.PROJECT_ID
-    dataset = dataset or Config.BQ_DATASET
-    bucket_name = bucket_name or Config.GCS_BUCKET
+        dataset: BigQuery dataset name
+        bucket_name: GCS bucket name
+        partition_field: Hive partition key, see load_to_bq
+        partition: Single partition date (YYYY-MM-DD) to replace through the
+            table$YYYYMMDD decorator; requires partition_field
+        clustering_fields: Columns the table is clustered on
 
-    client = bigquery.Client(project=project_id)
+    Returns:
+        Running load job
+    """
     dataset_ref = client.dataset(dataset)
-    table_ref = dataset_ref.table(table_name)
+    if partition:
+        table_ref = dataset_ref.table(f"{table_name}${partition.replace('-', '')}")
+    else:
+        table_ref = dataset_ref.table(table_name)
 
     if source_format == "CSV":
         job_config = bigquery.LoadJobConfig(
@@ -90,16 +613,336 @@ def load_to_bq(
         )
 
     uri = f"gs://{bucket_name}/{gcs_path}"
-    load_job = client.load_table_from_uri(uri, table_ref, job_config=job_config)
+    if partition_field:
+        hive_partitioning = bigquery.HivePartitioningOptions()
+        hive_partitioning.mode = "CUSTOM"
+        hive_partitioning.source_uri_prefix = f"{uri}/{{{partition_field}:DATE}}"
+        job_config.hive_partitioning = hive_partitioning
+        job_config.time_partitioning = bigquery.TimePartitioning(
+            type_=bigquery.TimePartitioningType.DAY, field=partition_field
+        )
+        uri = f"{uri}/{partition_field}={partition}/*" if partition else f"{uri}/*"
+    if clustering_fields:
+        job_config.clustering_fields = clustering_fields
+
+    return client.load_table_from_uri(uri, table_ref, job_config=job_config)
+
+
+def load_to_bq(
+    gcs_path: str,
+    table_name: str,
+    source_format: str = "PARQUET",
+    project_id: str = None,
+    dataset: str = None,
+    bucket_name: str = None,
+    partition_field: str = None
+) -> None:
+    """
+    Load data from GCS to BigQuery
+
+    Args:
+        gcs_path: Path to file in GCS (without gs://bucket prefix), or the root
+            of a hive-partitioned dataset when partition_field is set
+        table_name: Target BigQuery table name
+        source_format: Source file format (PARQUET or CSV)
+        project_id: GCP project ID (defaults to Config.PROJECT_ID)
+        dataset: BigQuery dataset name (defaults to Config.BQ_DATASET)
+        bucket_name: GCS bucket name (defaults to Config.GCS_BUCKET)
+        partition_field: Hive partition key (e.g. pickup_date); the table is
+            created day-partitioned on it
+    """
+    project_id = project_id or Config.PROJECT_ID
+    dataset = dataset or Config.BQ_DATASET
+    bucket_name = bucket_name or Config.GCS_BUCKET
+
+    client = bigquery.Client(project=project_id)
+    load_job = _start_load_job(
+        client, gcs_path, table_name, source_format, dataset, bucket_name, partition_field
+    )
     load_job.result()
 
     logger.info(f"Loaded {gcs_path} into {dataset}.{table_name}")
 
 
+class LoadError(RuntimeError):
+    """Raised when one or more BigQuery load jobs fail or time out"""
+
+    def __init__(self, message: str, results: List[Dict]):
+        super().__init__(message)
+        self.results = results
+
+
+def _load_job_stats(job: bigquery.LoadJob) -> Dict:
+    """
+    Read the statistics of a finished load job
+
+    Args:
+        job: Finished load job
+
+    Returns:
+        Dict with job_id, bytes (input file bytes), rows, slot_ms and seconds
+    """
+    statistics = job._properties.get("statistics", {})
+    seconds = None
+    if job.started and job.ended:
+        seconds = round((job.ended - job.started).total_seconds(), 3)
+    return {
+        "job_id": job.job_id,
+        "bytes": job.input_file_bytes,
+        "rows": job.output_rows,
+        "slot_ms": int(statistics["totalSlotMs"]) if "totalSlotMs" in statistics else None,
+        "seconds": seconds,
+    }
+
+
+def load_many_to_bq(
+    specs: List[Dict],
+    project_id: str = None,
+    dataset: str = None,
+    bucket_name: str = None,
+    client: bigquery.Client = None,
+    timeout: float = None
+) -> List[Dict]:
+    """
+    Run several load jobs concurrently from one client
+
+    All jobs are submitted before any is waited on, so BigQuery runs them in
+    parallel and the batch takes roughly as long as its slowest load. Jobs still
+    running when the timeout expires are cancelled.
+
+    Args:
+        specs: Load specs, each a dict with gcs_path and table_name and
+            optionally source_format (default PARQUET), partition_field,
+            partition and clustering_fields (see _start_load_job)
+        project_id: GCP project ID (defaults to Config.PROJECT_ID)
+        dataset: BigQuery dataset name (defaults to Config.BQ_DATASET)
+        bucket_name: GCS bucket name (defaults to Config.GCS_BUCKET)
+        client: Existing BigQuery client to reuse (a new one is created otherwise)
+        timeout: Seconds to wait for the whole batch (defaults to Config.BQ_LOAD_TIMEOUT)
+
+    Returns:
+        One result dict per spec, in input order, with gcs_path, table_name,
+        status ("loaded" or "failed"), error and the job statistics
+
+    Raises:
+        LoadError: If any job failed, could not be submitted or timed out
+    """
+    dataset = dataset or Config.BQ_DATASET
+    bucket_name = bucket_name or Config.GCS_BUCKET
+    timeout = timeout if timeout is not None else Config.BQ_LOAD_TIMEOUT
+    client = client or bigquery.Client(project=project_id or Config.PROJECT_ID)
+
+    jobs = []
+    for spec in specs:
+        try:
+            jobs.append(_start_load_job(
+                client, spec["gcs_path"], spec["table_name"],
+                spec.get("source_format", "PARQUET"), dataset, bucket_name,
+                spec.get("partition_field"), spec.get("partition"),
+                spec.get("clustering_fields")
+            ))
+        except Exception as e:
+            logger.error(f"Failed to submit load of {spec['gcs_path']}: {e}")
+            jobs.append(e)
+
+    with metrics.stage("bq_load", dataset=dataset) as stage:
+        deadline = time.monotonic() + timeout
+        results = []
+        for spec, job in zip(specs, jobs):
+            result = {"gcs_path": spec["gcs_path"], "table_name": spec["table_name"],
+                      "partition": spec.get("partition"), "status": "failed", "error": None, "job_id": None, "bytes": None,
+                      "rows": None, "slot_ms": None, "seconds": None}
+            if isinstance(job, Exception):
+                result["error"] = f"{type(job).__name__}: {job}"
+                results.append(result)
+                continue
+
+            try:
+                job.result(timeout=max(deadline - time.monotonic(), 0))
+                result.update(_load_job_stats(job), status="loaded")
+                target = spec["table_name"]
+                if spec.get("partition"):
+                    target += f" partition {spec['partition']}"
+                logger.info(
+                    f"Loaded {spec['gcs_path']} into {dataset}.{target}: "
+                    f"{result['rows']} rows, {result['bytes']} bytes, "
+                    f"{result['slot_ms']} slot-ms in {result['seconds']}s"
+                )
+            except Exception as e:
+                if not job.done():
+                    job.cancel()
+                result["job_id"] = job.job_id
+                result["error"] = f"{type(e).__name__}: {e}"
+                logger.error(f"Failed to load {spec['gcs_path']} into {spec['table_name']}: {e}")
+            results.append(result)
+
+        for result in results:
+            if result["status"] == "loaded":
+                stage.add(rows=result["rows"] or 0, input_bytes=result["bytes"] or 0)
+                stage.observe(result["seconds"] or 0.0)
+        stage.details["slot_ms"] = sum(result["slot_ms"] or 0 for result in results)
+
+        failed = [result["table_name"] for result in results if result["status"] == "failed"]
+        if failed:
+            raise LoadError(f"Load failed for: {', '.join(failed)}", results)
+    return results
+
+
+class LoadLedger:
+    """
+    Record of the raw table partitions loaded and the files each came from
+
+    Persisted as {table_name: {"YYYY-MM-DD": entry}} JSON, where an entry holds
+    the source CSVs, the partition's GCS files, a fingerprint of their CRC32Cs,
+    the load job id, rows loaded and the load time. A partition is reloaded
+    only when its fingerprint changes.
+    """
+
+    def __init__(self, ledger_path: Path = None):
+        """
+        Args:
+            ledger_path: JSON file to persist to; the ledger is in-memory only if None
+        """
+        self.ledger_path = Path(ledger_path) if ledger_path else None
+        self._entries: Optional[Dict[str, Dict]] = None
+        # (table, partition) pairs recorded by this instance, merged into the file on save
+        self._changed: Set[Tuple[str, str]] = set()
+
+    def _load(self) -> Dict[str, Dict]:
+        """Read the backing file on first use"""
+        if self._entries is None:
+            self._entries = {}
+            if self.ledger_path and self.ledger_path.exists():
+                self._entries = json.loads(self.ledger_path.read_text())
+        return self._entries
+
+    def get(self, table_name: str, partition: str) -> Optional[Dict]:
+        """
+        Get the entry of a loaded partition
+
+        Args:
+            table_name: Raw BigQuery table name
+            partition: Partition date (YYYY-MM-DD)
+
+        Returns:
+            Ledger entry, or None if the partition was never loaded
+        """
+        return self._load().get(table_name, {}).get(partition)
+
+    def record(self, table_name: str, partition: str, entry: Dict) -> None:
+        """
+        Record a successful partition load
+
+        Args:
+            table_name: Raw BigQuery table name
+            partition: Partition date (YYYY-MM-DD)
+            entry: Ledger entry
+        """
+        entry["loaded_at"] = datetime.now(timezone.utc).isoformat()
+        self._load().setdefault(table_name, {})[partition] = entry
+        self._changed.add((table_name, partition))
+
+    def save(self) -> None:
+        """Persist the ledger if it has a backing file, keeping other processes' entries"""
+        if not self.ledger_path or self._entries is None:
+            return
+
+        def merge(current: Dict) -> Dict:
+            for table_name, partition in self._changed:
+                current.setdefault(table_name, {})[partition] = self._entries[table_name][partition]
+            return current
+
+        self._entries = _save_merged(self.ledger_path, merge, sort_keys=True)
+        self._changed.clear()
+
+
+def plan_partition_loads(
+    data_dir: Path,
+    name: str,
+    table_name: str,
+    ledger: LoadLedger,
+    checksum_cache: ChecksumCache,
+    prefix: str = "raw_data"
+) -> List[Dict]:
+    """
+    Build load specs for the changed partitions of a hive-partitioned output
+
+    Args:
+        data_dir: Processed data directory
+        name: Output name (e.g. "yellow_taxi")
+        table_name: Raw BigQuery table name
+        ledger: Ledger of partitions already loaded
+        checksum_cache: Cache used to fingerprint partition files
+        prefix: GCS path prefix the output was uploaded under
+
+    Returns:
+        Load specs for load_many_to_bq, each carrying a ledger_entry to record
+        once its job succeeds
+    """
+    manifest = Manifest(str(data_dir))
+
+    def source_of(file: Path) -> Optional[str]:
+        # <output>-part-N.parquet files come from one month's input, others from <name>
+        entry = manifest.get(file.name.split("-part-")[0] if "-part-" in file.name else name)
+        return entry["source"] if entry else None
+
+    specs = []
+    for partition_dir in sorted((data_dir / name).glob(f"{Config.PARTITION_FIELD}=*")):
+        partition = partition_dir.name.split("=", 1)[1]
+        files = sorted(partition_dir.glob("*.parquet"))
+        digest = hashlib.sha256()
+        for file in files:
+            digest.update(f"{file.name}:{checksum_cache.crc32c(str(file))};".encode())
+        fingerprint = digest.hexdigest()
+
+        previous = ledger.get(table_name, partition)
+        if previous and previous["fingerprint"] == fingerprint:
+            continue
+
+        gcs_dir = f"{prefix}/{name}/{partition_dir.name}"
+        specs.append({
+            "gcs_path": f"{prefix}/{name}",
+            "table_name": table_name,
+            "partition_field": Config.PARTITION_FIELD,
+            "partition": partition,
+            "clustering_fields": Config.BQ_CLUSTERING_FIELDS,
+            "ledger_entry": {
+                "sources": sorted({source_of(file) for file in files} - {None}),
+                "files": [f"{gcs_dir}/{file.name}" for file in files],
+                "fingerprint": fingerprint,
+            },
+        })
+
+    logger.info(f"{table_name}: {len(specs)} changed partition(s) to load")
+    return specs
+
+
+def _has_objects(prefix: str, bucket_name: str = None, client: storage.Client = None) -> bool:
+    """Check whether any GCS object exists under a prefix"""
+    client = client or storage.Client()
+    return any(True for _ in client.list_blobs(
+        bucket_name or Config.GCS_BUCKET, prefix=prefix, max_results=1
+    ))
+
+
+def _record_partition_loads(ledger: LoadLedger, specs: List[Dict], results: List[Dict]) -> None:
+    """Record the successful partition loads of a batch in the ledger and save it"""
+    for spec, result in zip(specs, results):
+        if spec.get("partition") and result["status"] == "loaded":
+            ledger.record(spec["table_name"], spec["partition"], {
+                **spec["ledger_entry"], "job_id": result["job_id"], "rows": result["rows"]
+            })
+    ledger.save()
+
+
 def run_load(
     base_path: str = None,
     credentials_path: str = None,
-    data_dir: str = None
+    data_dir: str = None,
+    outputs: List[str] = None,
+    profile: bool = None,
+    upload: bool = True,
+    load: bool = True
 ) -> None:
     """
     Main function to run the load process
@@ -108,9 +951,21 @@ def run_load(
         base_path: Base project path (defaults to Config.PROJECT_ROOT)
         credentials_path: Path to GCP credentials file
         data_dir: Directory containing parquet files to upload
+        outputs: Output names to upload and load, e.g. ["yellow_taxi_2019-12"]
+            or [Config.AGGREGATES_DIR] (defaults to all). The raw table of an
+            output is replaced from every month of its source uploaded so far,
+            so concurrent calls for months of one source race; upload the
+            months separately (load=False) and load the table once afterwards.
+        profile: Write CPU and allocation profiles of the uploads and the
+            BigQuery loads to <PROFILES_DIR>/<run_id>/ (defaults to Config.PROFILE)
+        upload: Upload the outputs' Parquet files to GCS
+        load: Load the uploaded outputs into their BigQuery tables
     """
     logger.info("Starting data load process")
 
+    if Config.BQ_LOAD_MODE not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode '{Config.BQ_LOAD_MODE}', expected one of {LOAD_MODES}")
+
     # Set credentials
     Config.set_gcp_credentials(credentials_path)
 
@@ -120,20 +975,70 @@ def run_load(
     else:
         data_dir = Path(data_dir)
 
-    # Upload parquet files to GCS
-    logger.info("Uploading files to Google Cloud Storage...")
+    profile_dir = None
+    if Config.PROFILE if profile is None else profile:
+        profile_dir = str(profiling.run_directory(metrics.current().run_id))
+    # Concurrent loads of different outputs in one run write separate profiles
+    profile_suffix = f"_{'_'.join(outputs)}" if outputs else ""
 
-    for file in data_dir.iterdir():
-        if file.suffix == ".parquet":
-            local_file = str(file)
-            gcs_file = f"raw_data/{file.name}"
-            upload_to_gcs(local_file, gcs_file)
+    checksum_cache = ChecksumCache(data_dir / Config.CHECKSUM_CACHE_FILE)
+    if upload:
+        # Upload parquet files to GCS
+        logger.info("Uploading files to Google Cloud Storage...")
+        files = collect_uploads(data_dir, outputs=outputs)
+        if files:
+            with profiling.profiled(f"upload{profile_suffix}", profile_dir):
+                GCSUploader(checksum_cache=checksum_cache).upload_many(files)
+    if not load:
+        logger.info("Upload to GCS completed successfully!")
+        return
 
     # Load to BigQuery
     logger.info("\nLoading data to BigQuery...")
-    load_to_bq("raw_data/yellow_taxi.parquet", "raw_yellow_taxi", "PARQUET")
-    load_to_bq("raw_data/green_taxi.parquet", "raw_green_taxi", "PARQUET")
-    load_to_bq("raw_data/taxi_zone.parquet", "raw_taxi_zone", "PARQUET")
+    ledger = LoadLedger(data_dir / Config.LOAD_LEDGER_FILE)
+    specs = []
+    tables = None if outputs is None else {base_output(output) for output in outputs}
+    monthly = {output_name(source) for source in Config.TRIP_SOURCES.values()}
+    for name, table_name in Config.BQ_TABLES.items():
+        if tables is not None and name not in tables:
+            continue
+        output = data_dir / name
+        if not output.is_dir() and name in monthly and not (data_dir / f"{name}.parquet").exists():
+            # Months streamed straight to GCS have no local copy (see convert_file);
+            # a wildcard matching nothing would fail the whole load batch
+            listed = outputs is not None and any(
+                requested != name and base_output(requested) == name for requested in outputs
+            )
+            if listed or _has_objects(f"raw_data/{name}/"):
+                specs.append({"gcs_path": f"raw_data/{name}/*.parquet", "table_name": table_name})
+            else:
+                logger.warning(f"No {name} files found locally or in GCS, {table_name} not loaded")
+        elif not output.is_dir():
+            specs.append({"gcs_path": f"raw_data/{name}.parquet", "table_name": table_name})
+        elif not any(output.glob(f"{Config.PARTITION_FIELD}=*")):
+            specs.append({"gcs_path": f"raw_data/{name}/*.parquet", "table_name": table_name})
+        elif Config.BQ_LOAD_MODE == "partitions":
+            specs.extend(plan_partition_loads(data_dir, name, table_name, ledger, checksum_cache))
+        else:
+            specs.append({"gcs_path": f"raw_data/{name}", "table_name": table_name,
+                          "partition_field": Config.PARTITION_FIELD,
+                          "clustering_fields": Config.BQ_CLUSTERING_FIELDS})
+
+    # Mart-shaped aggregates built during extraction (EXTRACT_AGGREGATES=true)
+    aggregates_dir = data_dir / Config.AGGREGATES_DIR
+    if aggregates_dir.is_dir() and (outputs is None or Config.AGGREGATES_DIR in outputs):
+        for file in sorted(aggregates_dir.glob("*.parquet")):
+            specs.append({"gcs_path": f"raw_data/{Config.AGGREGATES_DIR}/{file.name}",
+                          "table_name": f"agg_{file.stem}"})
+    checksum_cache.save()
+
+    try:
+        with profiling.profiled(f"bq_load{profile_suffix}", profile_dir):
+            results = load_many_to_bq(specs) if specs else []
+    except LoadError as e:
+        _record_partition_loads(ledger, specs, e.results)
+        raise
+    _record_partition_loads(ledger, specs, results)
 
     logger.info("Load to GCP completed successfully!")
 
@@ -149,3 +1054,4 @@ if __name__ == "__main__":
     legacy_data_dir = Config.PROJECT_ROOT / "raw_parquet"
 
     run_load(data_dir=str(legacy_data_dir))
+    metrics.current().write_summary("load")
@@ -0,0 +1,7 @@
+"""
+Transform module for running the dbt project
+"""
+
+from .dbt_build import run_dbt_build, DbtBuildError
+
+__all__ = ["run_dbt_build", "DbtBuildError"]
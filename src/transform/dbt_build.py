@@ -0,0 +1,180 @@
+"""
+Run the dbt project as a single dbt build with state-based selection
+"""
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..utils import metrics
+from ..utils.config import Config
+from ..utils.dbt_artifacts import (
+    RUN_RESULTS_FILE,
+    bytes_billed_report,
+    load_run_results,
+    node_stats,
+)
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Artifacts of the last successful build kept as the --state for the next one
+STATE_ARTIFACTS = ["manifest.json", "sources.json", "run_results.json"]
+
+# Models (and their tests) whose code changed or whose sources received new
+# data since the state was saved, plus everything downstream of them
+STATE_SELECTOR = ["state:modified+", "source_status:fresher+"]
+
+
+class DbtBuildError(RuntimeError):
+    """Raised when dbt build exits with a failure"""
+
+    def __init__(self, message: str, results: List[Dict]):
+        super().__init__(message)
+        self.results = results
+
+
+def has_state(state_dir: Path) -> bool:
+    """
+    Check whether a previous build left artifacts to compare against
+
+    Args:
+        state_dir: Directory of saved artifacts
+
+    Returns:
+        True if a manifest and source freshness results were saved
+    """
+    return all((Path(state_dir) / name).exists() for name in ("manifest.json", "sources.json"))
+
+
+def _dbt_args(command: List[str], project_dir: Path, profiles_dir: Path) -> List[str]:
+    """Build a dbt command line for the project"""
+    return [
+        "dbt", *command,
+        "--project-dir", str(project_dir),
+        "--profiles-dir", str(profiles_dir),
+    ]
+
+
+def build_command(
+    project_dir: Path,
+    profiles_dir: Path,
+    threads: int,
+    state_dir: Optional[Path] = None
+) -> List[str]:
+    """
+    Build the dbt build command line
+
+    Partial parsing reuses target/partial_parse.msgpack, so only changed
+    files are parsed again.
+
+    Args:
+        project_dir: dbt project directory
+        profiles_dir: Directory holding profiles.yml
+        threads: Models built concurrently
+        state_dir: Saved artifacts to select against (None builds everything)
+
+    Returns:
+        Command line arguments
+    """
+    args = _dbt_args(["build"], project_dir, profiles_dir) + [
+        "--partial-parse",
+        "--threads", str(threads),
+    ]
+    if state_dir is not None:
+        args += ["--select", *STATE_SELECTOR, "--state", str(state_dir)]
+    return args
+
+
+def save_state(target_dir: Path, state_dir: Path) -> None:
+    """
+    Keep the artifacts of a successful build as the state for the next one
+
+    Args:
+        target_dir: dbt target directory
+        state_dir: Directory of saved artifacts
+    """
+    state_dir = Path(state_dir)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    for name in STATE_ARTIFACTS:
+        artifact = Path(target_dir) / name
+        if artifact.exists():
+            shutil.copy2(artifact, state_dir / name)
+    logger.info(f"Saved dbt state to {state_dir}")
+
+
+def run_dbt_build(
+    project_dir: Optional[str] = None,
+    profiles_dir: Optional[str] = None,
+    state_dir: Optional[str] = None,
+    threads: Optional[int] = None,
+    full: bool = False
+) -> List[Dict]:
+    """
+    Build and test the dbt project in one dbt invocation
+
+    Source freshness is checked first on every run, full builds included, so
+    the saved state always holds the sources.json the next run compares with.
+    When a previous successful build saved its artifacts, only models that
+    changed or read fresher sources are built and tested, together with
+    everything downstream of them. The artifacts are saved again only if the
+    build succeeds, so failed models are selected again on the next run.
+
+    Args:
+        project_dir: dbt project directory (defaults to Config.DBT_PROJECT_DIR)
+        profiles_dir: Directory holding profiles.yml (defaults to Config.DBT_PROFILES_DIR)
+        state_dir: Saved artifacts directory (defaults to Config.DBT_STATE_DIR)
+        threads: Models built concurrently (defaults to Config.DBT_THREADS)
+        full: Build everything even if saved state exists
+
+    Returns:
+        Per-node timings and BigQuery statistics (see dbt_artifacts.node_stats)
+
+    Raises:
+        DbtBuildError: If dbt build fails
+    """
+    project_dir = Path(project_dir or Config.DBT_PROJECT_DIR)
+    profiles_dir = Path(profiles_dir or Config.DBT_PROFILES_DIR)
+    state_dir = Path(state_dir or Config.DBT_STATE_DIR)
+    target_dir = project_dir / "target"
+
+    selected_state = None
+    if Config.DBT_STATE_SELECTION:
+        # Writes target/sources.json, compared with the saved one by
+        # source_status and saved with the other artifacts for the next run;
+        # removed first so a failed check never saves stale results
+        (target_dir / "sources.json").unlink(missing_ok=True)
+        freshness = subprocess.run(
+            _dbt_args(["source", "freshness"], project_dir, profiles_dir), cwd=project_dir
+        )
+        if freshness.returncode != 0:
+            logger.warning("Source freshness check failed; building all models")
+        elif full:
+            logger.info("Full build requested; building all models")
+        elif has_state(state_dir):
+            selected_state = state_dir
+        else:
+            logger.info("No saved dbt state; building all models")
+
+    # Removed so a build that dies early is not reported with stale results
+    run_results = target_dir / RUN_RESULTS_FILE
+    run_results.unlink(missing_ok=True)
+
+    args = build_command(project_dir, profiles_dir, threads or Config.DBT_THREADS, selected_state)
+    logger.info(f"Running: {' '.join(args)}")
+    with metrics.stage("dbt", selection="state" if selected_state else "full") as stage:
+        process = subprocess.run(args, cwd=project_dir)
+
+        stats = node_stats(load_run_results(str(target_dir))) if run_results.exists() else []
+        logger.info(f"dbt build results:\n{bytes_billed_report(stats)}")
+        for stat in stats:
+            stage.add(rows=stat["rows_affected"] or 0, input_bytes=stat["bytes_processed"] or 0)
+            stage.observe(stat["seconds"])
+        stage.details["bytes_billed"] = sum(stat["bytes_billed"] or 0 for stat in stats)
+
+        if process.returncode != 0:
+            failed = [stat["node"] for stat in stats if stat["status"] in ("error", "fail")]
+            raise DbtBuildError(f"dbt build failed (exit {process.returncode}): {failed}", stats)
+
+    save_state(target_dir, state_dir)
+    return stats
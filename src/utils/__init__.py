@@ -3,6 +3,6 @@ Utility modules for configuration and logging
 """
 
 from .config import Config
-from .logger import setup_logger
+from .logger import setup_logger, log_context
 
-__all__ = ["Config", "setup_logger"]
+__all__ = ["Config", "setup_logger", "log_context"]
@@ -15,11 +15,30 @@ class Config:
     RAW_DATA_DIR = DATA_DIR / "raw"
     PROCESSED_DATA_DIR = DATA_DIR / "processed"
     STAGING_DATA_DIR = DATA_DIR / "staging"
+    DBT_PROJECT_DIR = PROJECT_ROOT / "dbt"
+    DBT_TARGET_DIR = DBT_PROJECT_DIR / "target"
+    DBT_PROFILES_DIR = PROJECT_ROOT / "config" / "dbt"
+    # Artifacts of the last successful dbt build, compared against by the next one
+    DBT_STATE_DIR = Path(os.getenv("DBT_STATE_DIR", str(DBT_PROJECT_DIR / "state")))
 
     # GCP Configuration
     GCS_BUCKET = os.getenv("GCS_BUCKET", "transport-analytics")
     PROJECT_ID = os.getenv("GCP_PROJECT_ID", "taxi-transport-analytics")
     BQ_DATASET = os.getenv("BQ_DATASET", "new_york_analytic")
+    # Processed output name -> raw BigQuery table
+    BQ_TABLES = {
+        "yellow_taxi": "raw_yellow_taxi",
+        "green_taxi": "raw_green_taxi",
+        "taxi_zone": "raw_taxi_zone",
+    }
+    # Seconds to wait for a batch of load jobs before cancelling the rest
+    BQ_LOAD_TIMEOUT = int(os.getenv("BQ_LOAD_TIMEOUT", "1800"))
+    # "truncate" reloads whole raw tables; "partitions" replaces only the day
+    # partitions of hive-partitioned outputs whose files changed
+    BQ_LOAD_MODE = os.getenv("BQ_LOAD_MODE", "truncate")
+    BQ_CLUSTERING_FIELDS = ["PULocationID"]
+    # Ledger of loaded partitions kept in the processed data directory
+    LOAD_LEDGER_FILE = ".load_ledger.json"
     CREDENTIALS_PATH = os.getenv(
         "GOOGLE_APPLICATION_CREDENTIALS",
         str(PROJECT_ROOT / "config" / "credentials" / "taxi-transport-analytics-fbfa6653d305.json")
@@ -30,9 +49,96 @@ class Config:
     GREEN_TAXI_CSV = "green_tripdata_2019-12.csv"
     TAXI_ZONE_CSV = "taxi_zone_lookup (1).csv"
 
+    # Source name -> raw file name (schemas are declared per source name)
+    DATA_FILES = {
+        "Yellow Taxi": YELLOW_TAXI_CSV,
+        "Green Taxi": GREEN_TAXI_CSV,
+        "Taxi Zone": TAXI_ZONE_CSV,
+    }
+    # Trip files of any month are discovered by name (see extract/sources.py)
+    # and converted to month-tagged outputs, e.g. yellow_taxi_2019-12
+    TRIP_FILE_PATTERN = r"^(?P<color>[a-z]+)_tripdata_(?P<month>\d{4}-\d{2})\.csv(?:\.(?:gz|bz2|zst|xz))?$"
+    # Color in trip file names -> source name
+    TRIP_SOURCES = {
+        "yellow": "Yellow Taxi",
+        "green": "Green Taxi",
+    }
+
     # Processing configuration
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "100000"))
     COMPRESSION = "snappy"
+    # CSV parsing engine: "pyarrow" (native, multi-threaded) or "pandas" (fallback)
+    EXTRACT_ENGINE = os.getenv("EXTRACT_ENGINE", "pyarrow")
+    # Number of source files converted concurrently (1 = serial)
+    EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "1"))
+    # Processes parsing newline-aligned byte ranges of one large CSV (1 = serial)
+    PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "1"))
+    SPLIT_SIZE_BYTES = int(os.getenv("SPLIT_SIZE_MB", "64")) * 1024 * 1024
+    # Read buffer of raw input streams (compressed inputs are inflated through it)
+    INPUT_BUFFER_BYTES = int(os.getenv("INPUT_BUFFER_MB", "4")) * 1024 * 1024
+    # Target peak memory of each converting process; chunk, block and row group
+    # sizes then follow the measured bytes per row (0 = fixed CHUNK_SIZE chunks)
+    MEMORY_BUDGET_BYTES = int(os.getenv("EXTRACT_MEMORY_BUDGET_MB", "0")) * 1024 * 1024
+    # Rows per Parquet row group, independent of the parse chunk size (0 = one row group per chunk)
+    ROW_GROUP_ROWS = int(os.getenv("ROW_GROUP_ROWS", "0"))
+    # "single" writes <name>.parquet, "parts" writes <name>/part-NNNNN.parquet,
+    # "partitioned" writes <name>/pickup_date=YYYY-MM-DD/part-N.parquet
+    OUTPUT_MODE = os.getenv("OUTPUT_MODE", "single")
+    PARTITION_FIELD = "pickup_date"
+    # Partition writers kept open at once when writing a partitioned dataset
+    MAX_OPEN_PARTITIONS = int(os.getenv("MAX_OPEN_PARTITIONS", "64"))
+    MAX_PARTITIONS = 4096
+    # Skip unchanged inputs and resume interrupted conversions (see extract/manifest.py)
+    INCREMENTAL = os.getenv("INCREMENTAL_EXTRACT", "false").lower() == "true"
+    # Chunk size of the resumable upload when writing Parquet straight to gs://
+    GCS_STREAM_CHUNK_BYTES = int(os.getenv("GCS_STREAM_CHUNK_MB", "16")) * 1024 * 1024
+    # Build daily/hourly/zone partial aggregates while extracting (see extract/aggregates.py)
+    EXTRACT_AGGREGATES = os.getenv("EXTRACT_AGGREGATES", "false").lower() == "true"
+    AGGREGATES_DIR = "aggregates"
+    # Add pickup/dropoff zone columns to trips from the taxi zone lookup (see extract/zones.py)
+    ENRICH_ZONES = os.getenv("ENRICH_ZONES", "false").lower() == "true"
+    # Check trip chunks against data-quality rules and quarantine the failing
+    # rows instead of writing them (see extract/validation.py)
+    VALIDATE_TRIPS = os.getenv("VALIDATE_TRIPS", "false").lower() == "true"
+    # Comma-separated rules to check (empty = every rule in validation.RULES)
+    VALIDATION_RULES = [rule.strip() for rule in os.getenv("VALIDATION_RULES", "").split(",") if rule.strip()]
+    # Quarantined rows and per-rule summaries, kept in the processed data directory
+    QUARANTINE_DIR = "quarantine"
+
+    # Upload configuration
+    UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "8"))
+    # Files from this size are split into parallel parts composed server-side
+    COMPOSITE_THRESHOLD_BYTES = int(os.getenv("COMPOSITE_THRESHOLD_MB", "256")) * 1024 * 1024
+    COMPOSITE_PARTS = int(os.getenv("COMPOSITE_PARTS", "8"))
+    # Prefix the parts are uploaded under, outside the raw_data/ load wildcards
+    COMPOSITE_TMP_PREFIX = os.getenv("COMPOSITE_TMP_PREFIX", "tmp/composite")
+    # Skip uploads whose GCS object already has the same CRC32C
+    SKIP_UNCHANGED_UPLOADS = os.getenv("SKIP_UNCHANGED_UPLOADS", "true").lower() == "true"
+    # Local checksum cache kept in the processed data directory
+    CHECKSUM_CACHE_FILE = ".checksums.json"
+    # Finished outputs waiting for upload before extraction blocks (streaming mode)
+    UPLOAD_QUEUE_DEPTH = int(os.getenv("UPLOAD_QUEUE_DEPTH", "16"))
+    # Upload Parquet outputs while extraction is still running
+    STREAM_UPLOADS = os.getenv("STREAM_UPLOADS", "false").lower() == "true"
+
+    # Transform configuration
+    # Models dbt builds concurrently
+    DBT_THREADS = int(os.getenv("DBT_THREADS", "4"))
+    # Only build models that changed or read fresher sources since the last
+    # successful build (see transform/dbt_build.py)
+    DBT_STATE_SELECTION = os.getenv("DBT_STATE_SELECTION", "true").lower() == "true"
+
+    # Observability
+    # Per-run stage metrics summaries, written as <METRICS_DIR>/<run_id>/<name>.json
+    METRICS_DIR = Path(os.getenv("METRICS_DIR", str(DATA_DIR / "metrics")))
+    # Profile extraction and load stages (off by default; see utils/profiling.py)
+    PROFILE = os.getenv("PROFILE", "false").lower() == "true"
+    # Profile artifacts, written under <PROFILES_DIR>/<run_id>/
+    PROFILES_DIR = Path(os.getenv("PROFILES_DIR", str(DATA_DIR / "profiles")))
+    # Interval between stack samples taken for the flamegraph
+    PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_MS", "5")) / 1000
+    # Allocation sites reported per chunk
+    PROFILE_TOP_ALLOCATIONS = int(os.getenv("PROFILE_TOP_ALLOCATIONS", "10"))
 
     @classmethod
     def get_raw_data_path(cls, filename: str) -> Path:
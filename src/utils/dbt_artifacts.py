@@ -0,0 +1,92 @@
+"""
+Readers for dbt run artifacts (target/run_results.json)
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from .config import Config
+
+RUN_RESULTS_FILE = "run_results.json"
+
+
+def load_run_results(target_dir: str = None) -> Dict:
+    """
+    Load run_results.json written by the last dbt invocation
+
+    Args:
+        target_dir: dbt target directory (defaults to Config.DBT_TARGET_DIR)
+
+    Returns:
+        Parsed run results
+    """
+    path = Path(target_dir or Config.DBT_TARGET_DIR) / RUN_RESULTS_FILE
+    return json.loads(path.read_text())
+
+
+def node_stats(run_results: Dict) -> List[Dict]:
+    """
+    Extract per-node timings and BigQuery job statistics
+
+    Args:
+        run_results: Parsed run_results.json
+
+    Returns:
+        One dict per executed node with node, unique_id, status, seconds,
+        bytes_processed, bytes_billed, slot_ms and rows_affected (the
+        BigQuery figures are None for nodes that ran no job)
+    """
+    stats = []
+    for result in run_results.get("results", []):
+        response = result.get("adapter_response") or {}
+        stats.append({
+            "node": result["unique_id"].split(".")[-1],
+            "unique_id": result["unique_id"],
+            "status": result["status"],
+            "seconds": round(result.get("execution_time") or 0.0, 3),
+            "bytes_processed": response.get("bytes_processed"),
+            "bytes_billed": response.get("bytes_billed"),
+            "slot_ms": response.get("slot_ms"),
+            "rows_affected": response.get("rows_affected"),
+        })
+    return stats
+
+
+def _format_bytes(value: int) -> str:
+    """Format a byte count with a binary unit"""
+    value = float(value or 0)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TiB"
+
+
+def bytes_billed_report(stats: List[Dict]) -> str:
+    """
+    Format a bytes-billed report, most expensive node first
+
+    Args:
+        stats: Output of node_stats
+
+    Returns:
+        Report text
+    """
+    lines = [f"{'node':<40} {'status':<8} {'seconds':>8} {'billed':>12} {'processed':>12}"]
+    for stat in sorted(stats, key=lambda s: s["bytes_billed"] or 0, reverse=True):
+        lines.append(
+            f"{stat['node']:<40} {stat['status']:<8} {stat['seconds']:>8.2f} "
+            f"{_format_bytes(stat['bytes_billed']):>12} {_format_bytes(stat['bytes_processed']):>12}"
+        )
+    total = sum(stat["bytes_billed"] or 0 for stat in stats)
+    lines.append(f"Total billed: {_format_bytes(total)} across {len(stats)} node(s)")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report bytes billed by the last dbt run")
+    parser.add_argument("target_dir", nargs="?", help="dbt target directory")
+    args = parser.parse_args()
+
+    print(bytes_billed_report(node_stats(load_run_results(args.target_dir))))
@@ -3,8 +3,37 @@ Logging setup for the Transport ELT Pipeline
 """
 import logging
 import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+
+# Name of the unit of work (e.g. a source file) prefixed to log messages
+_log_context: ContextVar[str] = ContextVar("log_context", default="")
+
+
+class ContextFilter(logging.Filter):
+    """Inject the current log context into records as %(context)s"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        record.context = f"[{context}] " if context else ""
+        return True
+
+
+@contextmanager
+def log_context(name: str) -> Iterator[None]:
+    """
+    Prefix log messages emitted inside the block with a context name
+
+    Args:
+        name: Context name, e.g. the source being converted
+    """
+    token = _log_context.set(name)
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
 
 
 def setup_logger(
@@ -32,10 +61,11 @@ def setup_logger(
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
+    console_handler.addFilter(ContextFilter())
 
     # Formatter
     formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        '%(asctime)s - %(name)s - %(levelname)s - %(context)s%(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     console_handler.setFormatter(formatter)
@@ -46,6 +76,7 @@ def setup_logger(
         log_file.parent.mkdir(parents=True, exist_ok=True)
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(level)
+        file_handler.addFilter(ContextFilter())
         file_handler.setFormatter(formatter)
         logger.addHandler(file_handler)
 
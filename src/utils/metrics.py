@@ -0,0 +1,477 @@
+"""
+Structured per-stage metrics for pipeline runs
+
+Each stage run (parse, write, convert, upload, bq_load, dbt) produces one
+record with its duration, rows, input/output bytes, throughput, the peak RSS
+of the process and a histogram of per-chunk latencies. Records are logged as
+JSON as soon as a stage ends and collected by the current MetricsRecorder,
+whose summary can be written to a file or handed to Airflow XCom.
+
+What the byte counters hold depends on the stage:
+    parse: output_bytes is the size of the Arrow data produced
+    write: input_bytes is the Arrow data consumed, output_bytes the Parquet written
+    convert: input_bytes is the raw file, output_bytes its Parquet output
+    upload: input_bytes and output_bytes are the bytes sent (skipped files count in details)
+    bq_load / dbt: input_bytes is what BigQuery read (bytes processed)
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .config import Config
+from .logger import setup_logger
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+logger = setup_logger(__name__)
+
+# Upper bounds in seconds of the chunk latency buckets; one more bucket holds the rest
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_MB = 1024 * 1024
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Get the peak resident set size of this process so far
+
+    Returns:
+        Peak RSS in bytes, or None where the platform does not report it
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes() -> Optional[int]:
+    """
+    Get the resident set size of this process now
+
+    Returns:
+        RSS in bytes (the peak so far where the current size is not
+        available), or None where neither is reported
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_bytes()
+
+
+def safe_name(value: str) -> str:
+    """Replace characters unsafe in file names (e.g. in Airflow run ids)"""
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", value)
+
+
+class LatencyHistogram:
+    """Bucketed histogram of chunk latencies with count, sum and max"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """
+        Record one latency
+
+        Args:
+            seconds: Latency in seconds
+        """
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound),
+                     len(LATENCY_BUCKETS))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile as the upper bound of the bucket it falls in
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Latency in seconds (capped at the observed max), or None if empty
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict:
+        """Serialize with p50/p95/p99 and the non-empty buckets keyed by upper bound"""
+        bounds = [str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "max": round(self.max, 6),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {bound: count for bound, count in zip(bounds, self.counts) if count},
+        }
+
+
+class StageMetrics:
+    """
+    Counters of one stage run, updated while the stage is open
+
+    The stage's seconds are the time counted through chunk(), timed() or
+    add_time() when any was (for stages interleaved with others, such as parse
+    and write), and its wall time otherwise. Counters may be updated from several threads.
+    """
+
+    def __init__(self, name: str, labels: Dict = None):
+        """
+        Args:
+            name: Stage name (e.g. "parse")
+            labels: Identifying fields added to the record (e.g. source)
+        """
+        self.name = name
+        self.labels = labels or {}
+        self.rows = 0
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.details: Dict = {}
+        # Overrides the status of the record (e.g. "unchanged" for a skipped input)
+        self.status: Optional[str] = None
+        self.latency = LatencyHistogram()
+        self._started = time.perf_counter()
+        self._busy = 0.0
+        self._timed_chunks = False
+        self._lock = threading.Lock()
+
+    def add(self, rows: int = 0, input_bytes: int = 0, output_bytes: int = 0) -> None:
+        """
+        Add to the row and byte counters
+
+        Args:
+            rows: Rows processed
+            input_bytes: Bytes read
+            output_bytes: Bytes written
+        """
+        with self._lock:
+            self.rows += rows or 0
+            self.input_bytes += input_bytes or 0
+            self.output_bytes += output_bytes or 0
+
+    def observe(self, seconds: float) -> None:
+        """
+        Record the latency of one chunk measured elsewhere (e.g. an upload result)
+
+        Args:
+            seconds: Latency in seconds
+        """
+        with self._lock:
+            self.latency.observe(seconds)
+
+    @property
+    def busy_seconds(self) -> float:
+        """Time counted through chunk(), timed() and add_time() so far"""
+        return self._busy
+
+    def add_time(self, seconds: float, chunk: bool = True) -> None:
+        """
+        Count time spent on the stage
+
+        Args:
+            seconds: Time spent
+            chunk: Also record it as one chunk latency
+        """
+        with self._lock:
+            if chunk:
+                self.latency.observe(seconds)
+            self._busy += seconds
+            self._timed_chunks = True
+        listener = _chunk_listener.get()
+        if chunk and listener is not None:
+            listener(self.name)
+
+    @contextmanager
+    def chunk(self) -> Iterator[None]:
+        """Time one chunk of work, counting it towards the stage's seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(time.perf_counter() - start)
+
+    def timed(self, items: Iterable) -> Iterator:
+        """
+        Iterate, timing the production of each item as a chunk of this stage
+
+        Suited to lazy readers, whose work happens when the next item is
+        requested. The final request that ends the iteration counts towards
+        the stage's seconds but not as a chunk.
+
+        Args:
+            items: Iterable to consume
+
+        Yields:
+            The items of iterable
+        """
+        iterator = iter(items)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(time.perf_counter() - start, chunk=False)
+                return
+            self.add_time(time.perf_counter() - start)
+            yield item
+
+    def finish(self, status: str = "success") -> Dict:
+        """
+        Close the stage
+
+        Args:
+            status: "success", "failed" or a stage-specific status
+
+        Returns:
+            Metrics record
+        """
+        seconds = self._busy if self._timed_chunks else time.perf_counter() - self._started
+        per_second = 1 / seconds if seconds > 0 else 0.0
+        return {
+            "stage": self.name,
+            **self.labels,
+            "status": status,
+            "seconds": round(seconds, 6),
+            "rows": self.rows,
+            "input_bytes": self.input_bytes,
+            "output_bytes": self.output_bytes,
+            "rows_per_sec": round(self.rows * per_second, 1),
+            "input_mb_per_sec": round(self.input_bytes / _MB * per_second, 3),
+            "output_mb_per_sec": round(self.output_bytes / _MB * per_second, 3),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "chunks": self.latency.to_dict(),
+            **({"details": self.details} if self.details else {}),
+        }
+
+
+class MetricsRecorder:
+    """
+    Collects the stage records of one run (or one unit of work within it)
+
+    Records are logged as JSON when added. A recorder opened with
+    recording() becomes the current one for the code it wraps; records made
+    in worker processes are returned to the parent and merged with extend().
+    """
+
+    def __init__(self, run_id: str = None, labels: Dict = None):
+        """
+        Args:
+            run_id: Run identifier (a timestamped random id if None)
+            labels: Fields added to every record (e.g. the source converted)
+        """
+        self.run_id = run_id or (
+            f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        )
+        self.labels = labels or {}
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.records: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, **labels) -> Iterator[StageMetrics]:
+        """
+        Measure a stage; the record is added when the block exits
+
+        Args:
+            name: Stage name
+            labels: Identifying fields of this stage run
+
+        Yields:
+            StageMetrics to update while the stage runs
+        """
+        metrics = self.start(name, **labels)
+        status = "failed"
+        try:
+            yield metrics
+            status = "success"
+        finally:
+            self.add(metrics.finish(metrics.status or status))
+
+    def start(self, name: str, **labels) -> StageMetrics:
+        """
+        Open a stage that outlives a with block (e.g. a background upload queue)
+
+        Add its record with add(metrics.finish(status)) once it is done.
+
+        Args:
+            name: Stage name
+            labels: Identifying fields of this stage run
+
+        Returns:
+            StageMetrics to update while the stage runs
+        """
+        return StageMetrics(name, {**self.labels, **labels})
+
+    def add(self, record: Dict) -> None:
+        """
+        Add a finished stage record and log it as JSON
+
+        Args:
+            record: Output of StageMetrics.finish
+        """
+        with self._lock:
+            self.records.append(record)
+        logger.info(json.dumps({"event": "stage_metrics", "run_id": self.run_id, **record},
+                               default=str))
+
+    def extend(self, records: List[Dict]) -> None:
+        """
+        Merge records already logged elsewhere (e.g. by a worker process)
+
+        Args:
+            records: Stage records
+        """
+        with self._lock:
+            self.records.extend(records)
+
+    def summary(self) -> Dict:
+        """
+        Summarize the run
+
+        Returns:
+            Dict with run_id, started_at, finished_at, totals per stage name
+            (runs, seconds, rows, bytes, throughput, max peak RSS) and the
+            individual stage records
+        """
+        with self._lock:
+            records = list(self.records)
+        totals: Dict[str, Dict] = {}
+        for record in records:
+            total = totals.setdefault(record["stage"], {
+                "runs": 0, "failed": 0, "seconds": 0.0, "rows": 0,
+                "input_bytes": 0, "output_bytes": 0, "peak_rss_bytes": None,
+            })
+            total["runs"] += 1
+            total["failed"] += record["status"] != "success"
+            for field in ("seconds", "rows", "input_bytes", "output_bytes"):
+                total[field] += record[field]
+            if record["peak_rss_bytes"] is not None:
+                total["peak_rss_bytes"] = max(total["peak_rss_bytes"] or 0, record["peak_rss_bytes"])
+        for total in totals.values():
+            total["seconds"] = round(total["seconds"], 6)
+            total["rows_per_sec"] = round(total["rows"] / total["seconds"], 1) if total["seconds"] else 0.0
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "totals": totals,
+            "stages": records,
+        }
+
+    def write_summary(self, name: str, metrics_dir: str = None) -> Path:
+        """
+        Write the run summary as JSON
+
+        Args:
+            name: File name without extension, e.g. "extract" or an Airflow task id
+            metrics_dir: Base directory (defaults to Config.METRICS_DIR)
+
+        Returns:
+            Path of <metrics_dir>/<run_id>/<name>.json
+        """
+        path = (Path(metrics_dir or Config.METRICS_DIR) / safe_name(self.run_id)
+                / f"{safe_name(name)}.json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.summary(), indent=2))
+        logger.info(f"Run metrics written to {path}")
+        return path
+
+
+# Recorder of the process, used when no recording() block is open
+_default_recorder = MetricsRecorder()
+_current_recorder: ContextVar[Optional[MetricsRecorder]] = ContextVar(
+    "current_recorder", default=None
+)
+# Called with the stage name after each timed chunk (see utils/profiling.py)
+_chunk_listener: ContextVar[Optional[Callable[[str], None]]] = ContextVar(
+    "chunk_listener", default=None
+)
+
+
+def current() -> MetricsRecorder:
+    """
+    Get the recorder stages are currently recorded to
+
+    Returns:
+        The recorder of the innermost recording() block, or the process default
+    """
+    return _current_recorder.get() or _default_recorder
+
+
+@contextmanager
+def recording(recorder: MetricsRecorder = None, **labels) -> Iterator[MetricsRecorder]:
+    """
+    Record the stages run inside the block to their own recorder
+
+    Args:
+        recorder: Recorder to use (a new one sharing the current run_id if None)
+        labels: Labels of the new recorder, added to the current recorder's
+
+    Yields:
+        The recorder
+    """
+    if recorder is None:
+        parent = current()
+        recorder = MetricsRecorder(parent.run_id, {**parent.labels, **labels})
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+
+
+def stage(name: str, **labels) -> Iterator[StageMetrics]:
+    """
+    Measure a stage on the current recorder (see MetricsRecorder.stage)
+
+    Args:
+        name: Stage name
+        labels: Identifying fields of this stage run
+
+    Returns:
+        Context manager yielding StageMetrics
+    """
+    return current().stage(name, **labels)
+
+
+@contextmanager
+def listening(listener: Callable[[str], None]) -> Iterator[None]:
+    """
+    Call a listener after every chunk timed in this context, on any stage
+
+    Args:
+        listener: Called with the stage name once a chunk is counted
+    """
+    token = _chunk_listener.set(listener)
+    try:
+        yield
+    finally:
+        _chunk_listener.reset(token)
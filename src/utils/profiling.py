@@ -0,0 +1,225 @@
+"""
+Opt-in CPU and allocation profiling of extraction and load stages
+
+Enabled with PROFILE=true or the profile argument of run_extraction and
+run_load. Each profiled unit of work (one conversion, the uploads, the
+BigQuery loads) writes three artifacts to <PROFILES_DIR>/<run_id>/:
+
+    <name>.pstats: deterministic cProfile statistics of the calling thread,
+        e.g. python -m pstats <name>.pstats, or snakeviz
+    <name>.collapsed: wall-clock stack samples of every Python thread in
+        collapsed format, e.g. flamegraph.pl <name>.collapsed > <name>.svg
+    <name>.allocations.json: the top tracemalloc allocation sites of each
+        chunk timed by a metrics stage (parse, write, ...) with the Arrow
+        memory pool size, since Arrow buffers are invisible to tracemalloc
+
+With profiling off, profiled() yields without starting anything.
+"""
+import cProfile
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pyarrow as pa
+
+from . import metrics
+from .config import Config
+from .logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Allocations made by the profiler itself are left out of the chunk reports
+_IGNORED_FILES = (tracemalloc.__file__, __file__)
+
+
+def run_directory(run_id: str) -> Path:
+    """
+    Get the directory of a run's profile artifacts
+
+    Args:
+        run_id: Run identifier (see metrics.MetricsRecorder)
+
+    Returns:
+        <PROFILES_DIR>/<run_id>
+    """
+    return Path(Config.PROFILES_DIR) / metrics.safe_name(run_id)
+
+
+def _frame_label(frame) -> str:
+    """Name a stack frame as function (file:first line), stable across samples"""
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Background thread sampling the stacks of all Python threads at an interval"""
+
+    def __init__(self, interval: float = None):
+        """
+        Args:
+            interval: Seconds between samples (defaults to Config.PROFILE_SAMPLE_INTERVAL)
+        """
+        self.interval = interval or Config.PROFILE_SAMPLE_INTERVAL
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path) -> None:
+        """Write the samples as collapsed stacks, one "frame;frame;... count" line each"""
+        with open(path, "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """
+    CPU profile, stack samples and per-chunk allocations of one unit of work
+
+    Use through profiled(); the profile covers the calling thread, the stack
+    samples and allocations every thread of the process.
+    """
+
+    def __init__(self, name: str, directory: str, top: int = None):
+        """
+        Args:
+            name: Artifact file name prefix (e.g. the output name converted)
+            directory: Directory the artifacts are written to
+            top: Allocation sites reported per chunk (defaults to Config.PROFILE_TOP_ALLOCATIONS)
+        """
+        self.name = metrics.safe_name(name)
+        self.directory = Path(directory)
+        self.top = top or Config.PROFILE_TOP_ALLOCATIONS
+        self.chunks: List[Dict] = []
+        self._profile = cProfile.Profile()
+        self._sampler = StackSampler()
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+        self._counts: Counter = Counter()
+        self._started = 0.0
+        self._lock = threading.Lock()
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+        )
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._snapshot = self._take_snapshot()
+        self._started = time.perf_counter()
+        self._sampler.start()
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+        self._sampler.stop()
+        if self._started_tracing:
+            tracemalloc.stop()
+
+    def on_chunk(self, stage: str) -> None:
+        """
+        Record the allocations made since the previous chunk of any stage
+
+        Args:
+            stage: Name of the stage that finished the chunk
+        """
+        with self._lock:
+            snapshot = self._take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            growth = [stat for stat in snapshot.compare_to(self._snapshot, "lineno")
+                      if stat.size_diff > 0][:self.top]
+            self._snapshot = snapshot
+            self._counts[stage] += 1
+            self.chunks.append({
+                "stage": stage,
+                "chunk": self._counts[stage],
+                "seconds": round(time.perf_counter() - self._started, 3),
+                "traced_bytes": current,
+                "traced_peak_bytes": peak,
+                "arrow_allocated_bytes": pa.total_allocated_bytes(),
+                "top": [
+                    {"where": str(stat.traceback), "size_diff": stat.size_diff,
+                     "count_diff": stat.count_diff}
+                    for stat in growth
+                ],
+            })
+
+    def write(self) -> List[Path]:
+        """
+        Write the pstats, collapsed stacks and allocations artifacts
+
+        Returns:
+            Paths of the files written
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        base = self.directory / self.name
+        paths = [Path(f"{base}.pstats"), Path(f"{base}.collapsed"), Path(f"{base}.allocations.json")]
+        self._profile.dump_stats(str(paths[0]))
+        self._sampler.write(paths[1])
+        paths[2].write_text(json.dumps({"name": self.name, "chunks": self.chunks}, indent=2))
+        return paths
+
+
+# Active profiler; profiled() blocks nested in it already are covered by it
+_current_profiler: Optional[Profiler] = None
+
+
+@contextmanager
+def profiled(name: str, directory: Optional[str]) -> Iterator[Optional[Profiler]]:
+    """
+    Profile the block if a profile directory is given
+
+    Args:
+        name: Artifact file name prefix (e.g. the output name converted)
+        directory: Directory for the artifacts (see run_directory), or None
+            to run the block unprofiled
+
+    Yields:
+        The Profiler, or None when profiling is off or already running
+    """
+    global _current_profiler
+    if directory is None or _current_profiler is not None:
+        yield None
+        return
+
+    profiler = Profiler(name, directory)
+    _current_profiler = profiler
+    profiler.start()
+    try:
+        with metrics.listening(profiler.on_chunk):
+            yield profiler
+    finally:
+        profiler.stop()
+        _current_profiler = None
+        paths = profiler.write()
+        logger.info(f"Profile of {name} written to {', '.join(str(path) for path in paths)}")
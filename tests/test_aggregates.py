@@ -0,0 +1,179 @@
+"""
+Unit tests for partial aggregates built during extraction
+"""
+import re
+from pathlib import Path
+import pytest
+from unittest.mock import patch
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.extract.aggregates import ZONE_PERFORMANCE_COLUMNS, partial_path, write_aggregates
+from src.extract.extract_parquet import convert_file
+from tests.test_extract import write_yellow_trips
+from tests.test_zones import write_zone_lookup
+
+ZONE_MART = Path(__file__).parent.parent / "dbt" / "models" / "marts" / "zone_perfomance_mart.sql"
+
+
+@pytest.fixture
+def yellow_csv(tmp_path):
+    """Yellow taxi CSV of 5000 trips"""
+    path = tmp_path / "yellow.csv"
+    write_yellow_trips(path)
+    return path
+
+
+def expected_daily(csv_file):
+    """fact_trip_summary_day computed with pandas from the raw CSV"""
+    trips = pd.read_csv(csv_file, parse_dates=['tpep_pickup_datetime'])
+    trips = trips[trips['trip_distance'] > 0]
+    daily = trips.groupby(trips['tpep_pickup_datetime'].dt.date).agg(
+        total_trips=('VendorID', 'size'),
+        total_fare_amount=('fare_amount', 'sum'),
+        avg_trip_distance=('trip_distance', 'mean'),
+        avg_passenger_count=('passenger_count', 'mean'),
+    )
+    return daily.reset_index(drop=True)
+
+
+def select_lists(sql_file):
+    """Output column names of each explicit SELECT list of a model, in order"""
+    sql = re.sub(r"--[^\n]*", "", Path(sql_file).read_text())
+    selects = []
+    for columns in re.findall(r"SELECT\s+(.*?)\s+FROM", sql, re.DOTALL):
+        if columns.strip() == "*":
+            continue
+        # Split on the commas outside parentheses
+        expressions, depth, current = [], 0, ""
+        for char in columns:
+            depth += {"(": 1, ")": -1}.get(char, 0)
+            if char == "," and depth == 0:
+                expressions.append(current)
+                current = ""
+            else:
+                current += char
+        expressions.append(current)
+        selects.append([expression.split()[-1] for expression in expressions])
+    return selects
+
+
+class TestAggregates:
+    """Test cases for aggregates module"""
+
+    @patch('src.extract.extract_parquet.Config.CHUNK_SIZE', 700)
+    @pytest.mark.parametrize("engine", ["pyarrow", "pandas"])
+    def test_daily_aggregates_match_full_scan(self, tmp_path, yellow_csv, engine):
+        """Test that merged chunk partials equal a group-by over the whole file"""
+        output_dir = tmp_path / "output"
+        output_dir.mkdir()
+
+        result = convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), engine,
+                              aggregate=True)
+        rows = write_aggregates(output_dir)
+
+        daily = pq.read_table(output_dir / "aggregates" / "trip_summary_day.parquet").to_pandas()
+        expected = expected_daily(yellow_csv)
+        assert result['status'] == 'success'
+        assert rows['trip_summary_day'] == len(expected)
+        assert daily['taxi_color'].unique().tolist() == ['yellow']
+        assert daily['total_trips'].tolist() == expected['total_trips'].tolist()
+        assert daily['total_fare_amount'].tolist() == pytest.approx(
+            expected['total_fare_amount'].round(2).tolist()
+        )
+        assert daily['avg_trip_distance'].tolist() == pytest.approx(
+            expected['avg_trip_distance'].tolist(), abs=0.006
+        )
+        assert daily['avg_passenger_count'].tolist() == pytest.approx(
+            expected['avg_passenger_count'].tolist(), abs=0.006
+        )
+
+    @patch('src.extract.extract_parquet.Config.SPLIT_SIZE_BYTES', 50_000)
+    def test_parts_mode_matches_single_mode(self, tmp_path, yellow_csv):
+        """Test that aggregating committed parts gives the same partial as streaming"""
+        (tmp_path / "single").mkdir()
+        convert_file("Yellow Taxi", str(yellow_csv), str(tmp_path / "single"), "pyarrow",
+                     aggregate=True)
+        convert_file("Yellow Taxi", str(yellow_csv), str(tmp_path / "parts"), "pyarrow",
+                     output_mode="parts", aggregate=True)
+
+        keys = ["trip_date", "trip_hour", "pickup_location_id", "dropoff_location_id",
+                "has_distance"]
+        single = pq.read_table(partial_path(tmp_path / "single", "yellow_taxi")).to_pandas()
+        parts = pq.read_table(partial_path(tmp_path / "parts", "yellow_taxi")).to_pandas()
+        single = single.sort_values(keys).reset_index(drop=True)
+        parts = parts.sort_values(keys).reset_index(drop=True)
+        assert single['trips'].sum() == 5000
+        pd.testing.assert_frame_equal(single, parts, check_exact=False)
+
+    def test_hourly_and_zone_rollups(self, tmp_path, yellow_csv):
+        """Test that the hourly mart filters zero distances and the zone mart doesn't"""
+        output_dir = tmp_path / "output"
+        output_dir.mkdir()
+        convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow", aggregate=True)
+
+        write_zone_lookup(tmp_path / "zones.csv")
+
+        write_aggregates(output_dir, tmp_path / "zones.csv")
+
+        hourly = pq.read_table(output_dir / "aggregates" / "revenue_breakdown_hourly.parquet")
+        zones = pq.read_table(output_dir / "aggregates" / "zone_performance.parquet").to_pandas()
+        trips = pd.read_csv(yellow_csv, parse_dates=['tpep_pickup_datetime'])
+        # Every 300th trip has a zero distance
+        assert sum(hourly['total_trips'].to_pylist()) == 5000 - 17
+        assert zones['total_trips'].sum() == 5000
+        # IDs above 200 and the zone left empty fall back to UNKNOWN like in the mart
+        assert zones.loc[zones['pickup_zone'] == 'UNKNOWN', 'total_trips'].sum() == (
+            (trips['PULocationID'] >= 200).sum()
+        )
+        assert zones['total_trip_distance'].sum() == pytest.approx(trips['trip_distance'].sum())
+        assert zones['total_passenger_count'].sum() == trips['passenger_count'].sum()
+        assert not zones.duplicated(['trip_date', 'pickup_zone', 'dropoff_zone', 'taxi_color']).any()
+        assert hourly.column_names == [
+            'trip_date', 'trip_hour', 'taxi_color', 'total_trips', 'total_amount_usd',
+            'total_fare_amount_usd', 'total_tip_amount_usd', 'avg_trip_distance_miles',
+            'avg_passenger_count',
+        ]
+
+    def test_zone_performance_matches_mart_schema(self, tmp_path, yellow_csv):
+        """Test that zone_performance has the columns and types of zone_perfomance_mart"""
+        output_dir = tmp_path / "output"
+        convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow", aggregate=True)
+        write_zone_lookup(tmp_path / "zones.csv")
+
+        write_aggregates(output_dir, tmp_path / "zones.csv")
+
+        schema = pq.read_schema(output_dir / "aggregates" / "zone_performance.parquet")
+        # Both branches of the mart: the aggregate source and the int_all_trips scan
+        assert select_lists(ZONE_MART) == [ZONE_PERFORMANCE_COLUMNS] * 2
+        assert schema.names == ZONE_PERFORMANCE_COLUMNS
+        # BigQuery result types of the mart: DATE, INT64 counts, STRING zones,
+        # FLOAT64 sums and an INT64 passenger sum
+        assert [str(field.type) for field in schema] == [
+            'date32[day]', 'int64', 'string', 'string', 'double', 'double', 'double',
+            'int64', 'int64', 'int64', 'string',
+        ]
+
+    def test_zone_performance_needs_zone_lookup(self, tmp_path, yellow_csv):
+        """Test that zone_performance is skipped when there is no lookup to name the zones"""
+        output_dir = tmp_path / "output"
+        convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow", aggregate=True)
+
+        rows = write_aggregates(output_dir, tmp_path / "missing.csv")
+
+        assert "zone_performance" not in rows and "trip_summary_day" in rows
+        assert not (output_dir / "aggregates" / "zone_performance.parquet").exists()
+
+    def test_unchanged_input_without_partial_is_reconverted(self, tmp_path, yellow_csv):
+        """Test that enabling aggregates forces one conversion of unchanged inputs"""
+        output_dir = tmp_path / "output"
+        convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow", incremental=True)
+
+        first = convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow",
+                             incremental=True, aggregate=True)
+        second = convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow",
+                              incremental=True, aggregate=True)
+
+        assert first['status'] == 'success'
+        assert second['status'] == 'unchanged'
+        assert partial_path(output_dir, "yellow_taxi").exists()
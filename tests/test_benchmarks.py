@@ -0,0 +1,71 @@
+"""
+Unit tests for the benchmark data generator and suite
+"""
+import hashlib
+from unittest.mock import patch
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from benchmarks.generate_data import generate_dataset
+from benchmarks.run_benchmarks import compare, run_case
+from src.extract.extract_parquet import returnBatches
+from src.extract.schemas import YELLOW_TAXI_SCHEMA
+from src.utils.config import Config
+
+
+def sha256(path):
+    """Hash a generated file"""
+    return hashlib.sha256(open(path, "rb").read()).hexdigest()
+
+
+class TestBenchmarks:
+    """Test cases for the benchmarks package"""
+
+    def test_generator_is_deterministic_and_parses(self, tmp_path):
+        """Test that a seed reproduces the same files, which parse under the declared schema"""
+        first = generate_dataset(str(tmp_path / "a"), 20_000, seed=7)
+        second = generate_dataset(str(tmp_path / "b"), 20_000, seed=7)
+        other = generate_dataset(str(tmp_path / "c"), 20_000, seed=8)
+
+        assert sha256(first["Yellow Taxi"]) == sha256(second["Yellow Taxi"])
+        assert sha256(first["Yellow Taxi"]) != sha256(other["Yellow Taxi"])
+
+        batches = list(returnBatches(first["Yellow Taxi"], 5_000, engine="pyarrow",
+                                     schema=YELLOW_TAXI_SCHEMA))
+        vendors = [batch.column("VendorID") for batch in batches]
+        locations = [batch.column("PULocationID") for batch in batches]
+        rows = sum(batch.num_rows for batch in batches)
+        nulls = sum(vendor.null_count for vendor in vendors)
+        busiest = max(pc.value_counts(pa.chunked_array(locations)).field("counts").to_pylist())
+
+        assert rows == 20_000
+        assert 0 < nulls < rows * 0.05
+        # Zipf skew: the busiest zone gets far more than a uniform 1/265 share
+        assert busiest > rows / 265 * 5
+
+    def test_run_case_reports_metrics(self, tmp_path):
+        """Test that a case reports extraction, upload and load metrics"""
+        paths = generate_dataset(str(tmp_path / "raw"), 5_000, compression="gzip")
+        case = {"source": "Yellow Taxi", "rows": 5_000, "engine": "pyarrow",
+                "chunk_size": 1_000, "codec": "zstd", "input_compression": "gzip"}
+
+        with patch.object(Config, "CHUNK_SIZE"), patch.object(Config, "COMPRESSION"):
+            record = run_case(case, paths["Yellow Taxi"], str(tmp_path))
+
+        assert record["rows_per_sec"] > 0
+        assert record["peak_rss_mb"] > 0
+        assert record["output_bytes"] > 0
+        assert record["upload_mb_per_sec"] > 0
+        assert record["load_rows_per_sec"] > 0
+        assert list((tmp_path / "bucket").rglob("*.parquet"))
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        """Test that only metrics worse than the tolerance are reported"""
+        case = {"source": "Yellow Taxi", "rows": 1000, "engine": "pyarrow",
+                "chunk_size": 100, "codec": "snappy", "input_compression": None}
+        baseline = {"results": [{**case, "rows_per_sec": 1000, "peak_rss_mb": 100.0}]}
+        results = {"results": [{**case, "rows_per_sec": 950, "peak_rss_mb": 150.0}]}
+
+        regressions = compare(results, baseline, tolerance=0.1)
+
+        assert [(r["metric"], r["change"]) for r in regressions] == [("peak_rss_mb", -0.5)]
@@ -0,0 +1,70 @@
+"""
+Unit tests for dbt artifact readers
+"""
+import json
+
+from src.utils.dbt_artifacts import bytes_billed_report, load_run_results, node_stats
+
+
+RUN_RESULTS = {
+    "results": [
+        {
+            "unique_id": "model.my_new_project.int_all_trips",
+            "status": "success",
+            "execution_time": 12.3456,
+            "adapter_response": {
+                "bytes_processed": 3 * 1024 ** 3,
+                "bytes_billed": 3 * 1024 ** 3,
+                "slot_ms": 52000,
+                "rows_affected": 7000000,
+            },
+        },
+        {
+            "unique_id": "model.my_new_project.fact_trip_summary_day",
+            "status": "success",
+            "execution_time": 2.5,
+            "adapter_response": {
+                "bytes_processed": 200 * 1024 ** 2,
+                "bytes_billed": 200 * 1024 ** 2,
+                "slot_ms": 900,
+                "rows_affected": 62,
+            },
+        },
+        {
+            "unique_id": "test.my_new_project.not_null_int_all_trips_pickup_datetime.5a1",
+            "status": "pass",
+            "execution_time": 1.0,
+            "adapter_response": {},
+        },
+    ]
+}
+
+
+class TestDbtArtifacts:
+    """Test cases for dbt_artifacts module"""
+
+    def test_node_stats(self, tmp_path):
+        """Test reading timings and BigQuery statistics per node"""
+        (tmp_path / "run_results.json").write_text(json.dumps(RUN_RESULTS))
+
+        stats = node_stats(load_run_results(str(tmp_path)))
+
+        assert stats[0] == {
+            "node": "int_all_trips",
+            "unique_id": "model.my_new_project.int_all_trips",
+            "status": "success",
+            "seconds": 12.346,
+            "bytes_processed": 3 * 1024 ** 3,
+            "bytes_billed": 3 * 1024 ** 3,
+            "slot_ms": 52000,
+            "rows_affected": 7000000,
+        }
+        assert stats[2]["bytes_billed"] is None
+
+    def test_bytes_billed_report(self):
+        """Test that the report lists the most expensive node first with a total"""
+        report = bytes_billed_report(node_stats(RUN_RESULTS)).splitlines()
+
+        assert report[1].startswith("int_all_trips")
+        assert "3.0 GiB" in report[1]
+        assert report[-1] == "Total billed: 3.2 GiB across 3 node(s)"
@@ -0,0 +1,100 @@
+"""
+Unit tests for the dbt build runner
+"""
+import json
+import pytest
+from unittest.mock import Mock, patch
+
+from src.transform.dbt_build import DbtBuildError, build_command, run_dbt_build
+from tests.test_dbt_artifacts import RUN_RESULTS
+
+
+@pytest.fixture
+def dbt_dirs(tmp_path):
+    """dbt project, profiles and state directories"""
+    project_dir = tmp_path / "dbt"
+    (project_dir / "target").mkdir(parents=True)
+    return project_dir, tmp_path / "profiles", tmp_path / "state"
+
+
+def fake_dbt(project_dir, returncode=0):
+    """subprocess.run replacement writing the artifacts dbt would write"""
+    def run(args, cwd):
+        target_dir = project_dir / "target"
+        (target_dir / "manifest.json").write_text("{}")
+        if args[1] == "source":
+            (target_dir / "sources.json").write_text("{}")
+        else:
+            (target_dir / "run_results.json").write_text(json.dumps(RUN_RESULTS))
+        return Mock(returncode=returncode)
+    return run
+
+
+class TestDbtBuild:
+    """Test cases for dbt_build module"""
+
+    def test_build_command(self, tmp_path):
+        """Test partial parsing, threads and state selection arguments"""
+        args = build_command(tmp_path, tmp_path / "profiles", 8, tmp_path / "state")
+
+        assert args[:2] == ["dbt", "build"]
+        assert "--partial-parse" in args
+        assert args[args.index("--threads") + 1] == "8"
+        select = args.index("--select")
+        assert args[select + 1:select + 3] == ["state:modified+", "source_status:fresher+"]
+        assert args[args.index("--state") + 1] == str(tmp_path / "state")
+        assert "--select" not in build_command(tmp_path, tmp_path, 8)
+
+    def test_first_build_runs_everything_and_saves_state(self, dbt_dirs):
+        """Test that without saved state all models are built and state is saved"""
+        project_dir, profiles_dir, state_dir = dbt_dirs
+
+        with patch('src.transform.dbt_build.subprocess.run',
+                   side_effect=fake_dbt(project_dir)) as run:
+            stats = run_dbt_build(str(project_dir), str(profiles_dir), str(state_dir))
+
+        freshness, build = [call[0][0] for call in run.call_args_list]
+        assert freshness[1:3] == ["source", "freshness"]
+        assert "--select" not in build
+        assert stats[0]["node"] == "int_all_trips"
+        assert sorted(path.name for path in state_dir.iterdir()) == [
+            "manifest.json", "run_results.json", "sources.json"
+        ]
+
+    def test_next_build_selects_against_state(self, dbt_dirs):
+        """Test that the state saved by a first full build selects the second build"""
+        project_dir, profiles_dir, state_dir = dbt_dirs
+
+        with patch('src.transform.dbt_build.subprocess.run',
+                   side_effect=fake_dbt(project_dir)) as run:
+            run_dbt_build(str(project_dir), str(profiles_dir), str(state_dir))
+            run_dbt_build(str(project_dir), str(profiles_dir), str(state_dir))
+
+        commands = [call[0][0] for call in run.call_args_list]
+        assert [command[1] for command in commands] == ["source", "build", "source", "build"]
+        assert "--select" not in commands[1]
+        assert commands[3][commands[3].index("--state") + 1] == str(state_dir)
+
+    def test_full_build_saves_state(self, dbt_dirs):
+        """Test that a requested full build ignores saved state but still saves it"""
+        project_dir, profiles_dir, state_dir = dbt_dirs
+
+        with patch('src.transform.dbt_build.subprocess.run',
+                   side_effect=fake_dbt(project_dir)) as run:
+            run_dbt_build(str(project_dir), str(profiles_dir), str(state_dir))
+            run_dbt_build(str(project_dir), str(profiles_dir), str(state_dir), full=True)
+
+        assert "--select" not in run.call_args[0][0]
+        assert (state_dir / "sources.json").exists()
+
+    def test_failed_build_keeps_previous_state(self, dbt_dirs):
+        """Test that a failing build raises and does not overwrite saved state"""
+        project_dir, profiles_dir, state_dir = dbt_dirs
+
+        with patch('src.transform.dbt_build.subprocess.run',
+                   side_effect=fake_dbt(project_dir, returncode=1)):
+            with pytest.raises(DbtBuildError) as error:
+                run_dbt_build(str(project_dir), str(profiles_dir), str(state_dir))
+
+        assert len(error.value.results) == 3
+        assert not state_dir.exists()
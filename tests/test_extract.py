@@ -1,12 +1,72 @@
 """
 Unit tests for data extraction module
 """
+import bz2
+import gzip
+import lzma
 import pytest
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
-from src.extract.extract_parquet import returnBatches, return_parquet, run_extraction
+from src.extract.extract_parquet import (
+    ExtractionError,
+    returnBatches,
+    return_parquet,
+    return_parquet_parallel,
+    run_extraction,
+    split_byte_ranges,
+)
+from src.extract.compression import detect_compression
+from src.extract.schemas import YELLOW_TAXI_SCHEMA
+from src.utils.config import Config
+
+COMPRESSORS = {
+    'gzip': gzip.compress,
+    'bz2': bz2.compress,
+    'zstd': lambda data: pa.Codec('zstd').compress(data, asbytes=True),
+    'xz': lzma.compress,
+}
+
+
+def write_sources(raw_dir, rows=1000):
+    """Write small CSVs for every configured source into raw_dir"""
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    for filename in Config.DATA_FILES.values():
+        pd.DataFrame({
+            'LocationID': range(rows),
+            'Borough': ['Manhattan'] * rows,
+        }).to_csv(raw_dir / filename, index=False)
+
+
+def write_yellow_trips(path, rows=5000):
+    """Write a yellow taxi CSV with varied values and some empty codes"""
+    pickup = pd.date_range('2019-12-01', periods=rows, freq='37s')
+    pd.DataFrame({
+        'VendorID': [1 + i % 2 for i in range(rows)],
+        'tpep_pickup_datetime': pickup.strftime('%Y-%m-%d %H:%M:%S'),
+        'tpep_dropoff_datetime': (pickup + pd.Timedelta(minutes=9)).strftime('%Y-%m-%d %H:%M:%S'),
+        'passenger_count': pd.array(
+            [None if i % 7 == 0 else i % 6 + 1 for i in range(rows)], dtype='Int64'
+        ),
+        'trip_distance': [round(i % 300 / 10, 2) for i in range(rows)],
+        'RatecodeID': pd.array([None if i % 11 == 0 else 1 for i in range(rows)], dtype='Int64'),
+        'store_and_fwd_flag': [None if i % 11 == 0 else 'YN'[i % 2] for i in range(rows)],
+        'PULocationID': [i % 265 + 1 for i in range(rows)],
+        'DOLocationID': [(i * 7) % 265 + 1 for i in range(rows)],
+        'payment_type': [i % 4 + 1 for i in range(rows)],
+        'fare_amount': [round(2.5 + i % 500 / 10, 2) for i in range(rows)],
+        'extra': 0.5,
+        'mta_tax': 0.5,
+        'tip_amount': [round(i % 90 / 10, 2) for i in range(rows)],
+        'tolls_amount': 0.0,
+        'improvement_surcharge': 0.3,
+        'total_amount': [round(3.8 + i % 500 / 10, 2) for i in range(rows)],
+        'congestion_surcharge': 2.5,
+    }).to_csv(path, index=False)
 
 
 class TestExtractParquet:
@@ -31,6 +91,63 @@ class TestExtractParquet:
         assert 'col1' in batches[0].columns
         assert 'col2' in batches[0].columns
 
+    def test_return_batches_pyarrow(self, tmp_path):
+        """Test CSV streaming with the native pyarrow engine"""
+        csv_file = tmp_path / "test.csv"
+        df = pd.DataFrame({
+            'col1': range(1000),
+            'col2': range(1000, 2000)
+        })
+        df.to_csv(csv_file, index=False)
+
+        batches = list(returnBatches(str(csv_file), 100, engine="pyarrow"))
+
+        assert all(isinstance(batch, pa.RecordBatch) for batch in batches)
+        assert sum(batch.num_rows for batch in batches) == 1000
+        assert batches[0].schema.names == ['col1', 'col2']
+
+    @pytest.mark.parametrize("engine", ["pyarrow", "pandas"])
+    @pytest.mark.parametrize("codec", list(COMPRESSORS))
+    def test_return_batches_compressed(self, tmp_path, codec, engine):
+        """Test that compressed CSVs are detected by content and streamed"""
+        # Plain .csv name: the codec must come from the magic bytes
+        csv_file = tmp_path / "test.csv"
+        data = pd.DataFrame({'col1': range(1000), 'col2': range(1000, 2000)}).to_csv(index=False)
+        csv_file.write_bytes(COMPRESSORS[codec](data.encode()))
+
+        batches = list(returnBatches(str(csv_file), 100, engine=engine))
+        table = pa.concat_tables([
+            pa.Table.from_batches([batch]) if engine == "pyarrow"
+            else pa.Table.from_pandas(batch, preserve_index=False)
+            for batch in batches
+        ])
+
+        assert detect_compression(str(csv_file)) == codec
+        assert table.column_names == ['col1', 'col2']
+        assert table['col1'].to_pylist() == list(range(1000))
+
+    def test_return_batches_unknown_engine(self, tmp_path):
+        """Test that an unknown engine is rejected"""
+        with pytest.raises(ValueError):
+            returnBatches(str(tmp_path / "test.csv"), 100, engine="polars")
+
+    def test_return_parquet_pyarrow(self, tmp_path):
+        """Test Parquet writing from Arrow RecordBatches"""
+        csv_file = tmp_path / "test.csv"
+        df = pd.DataFrame({
+            'col1': range(1000),
+            'col2': [f"value_{i}" for i in range(1000)]
+        })
+        df.to_csv(csv_file, index=False)
+        parquet_file = tmp_path / "test.parquet"
+
+        rows = return_parquet(
+            returnBatches(str(csv_file), 100, engine="pyarrow"), str(parquet_file)
+        )
+
+        assert rows == 1000
+        pd.testing.assert_frame_equal(pq.read_table(parquet_file).to_pandas(), df)
+
     @patch('src.extract.extract_parquet.pq.ParquetWriter')
     @patch('src.extract.extract_parquet.pa.Table')
     def test_return_parquet(self, mock_table, mock_writer):
@@ -84,3 +201,222 @@ class TestExtractParquet:
 
         # Check that warnings were logged
         assert "MISSING" in caplog.text or "Skipping" in caplog.text
+
+    def test_run_extraction_parallel(self, tmp_path):
+        """Test converting all sources concurrently in a process pool"""
+        write_sources(tmp_path / "raw")
+
+        results = run_extraction(
+            raw_data_dir=str(tmp_path / "raw"),
+            output_dir=str(tmp_path / "output"),
+            workers=3
+        )
+
+        assert [result['name'] for result in results] == list(Config.DATA_FILES)
+        assert all(result['status'] == 'success' for result in results)
+        assert all(result['rows'] == 1000 for result in results)
+        for result in results:
+            assert pq.read_table(result['output']).num_rows == 1000
+
+    def test_run_extraction_reports_failures_per_file(self, tmp_path):
+        """Test that one failing file doesn't drop the other results"""
+        write_sources(tmp_path / "raw")
+        # Location IDs that don't fit the declared int16 column
+        pd.DataFrame({'LocationID': ['not-a-number'] * 10}).to_csv(
+            tmp_path / "raw" / Config.TAXI_ZONE_CSV, index=False
+        )
+
+        with pytest.raises(ExtractionError) as exc_info:
+            run_extraction(
+                raw_data_dir=str(tmp_path / "raw"),
+                output_dir=str(tmp_path / "output"),
+                workers=2
+            )
+
+        statuses = {result['name']: result['status'] for result in exc_info.value.results}
+        assert statuses == {
+            'Yellow Taxi': 'success',
+            'Green Taxi': 'success',
+            'Taxi Zone': 'failed',
+        }
+
+    def test_run_extraction_selected_outputs(self, tmp_path):
+        """Test converting only the named work items, as one per-file DAG task does"""
+        write_sources(tmp_path / "raw")
+
+        results = run_extraction(
+            raw_data_dir=str(tmp_path / "raw"),
+            output_dir=str(tmp_path / "output"),
+            outputs=['taxi_zone']
+        )
+
+        assert [result['name'] for result in results] == ['Taxi Zone']
+        assert [path.name for path in (tmp_path / "output").iterdir()] == ['taxi_zone.parquet']
+        with pytest.raises(ValueError, match="No raw file found"):
+            run_extraction(raw_data_dir=str(tmp_path / "raw"), outputs=['yellow_taxi_2020-01'])
+
+    def test_run_extraction_months_share_partitions(self, tmp_path):
+        """Test that monthly files of a source keep their own files in shared day partitions"""
+        raw_dir = tmp_path / "raw"
+        raw_dir.mkdir()
+        write_yellow_trips(raw_dir / "yellow_tripdata_2019-11.csv", rows=100)
+        write_yellow_trips(raw_dir / "yellow_tripdata_2019-12.csv.gz", rows=200)
+        handed_over = []
+
+        results = run_extraction(
+            raw_data_dir=str(raw_dir),
+            output_dir=str(tmp_path / "output"),
+            output_mode="partitioned",
+            on_output=handed_over.append
+        )
+
+        # Both synthetic months start on 2019-12-01, so they share that day
+        day = tmp_path / "output" / "yellow_taxi" / "pickup_date=2019-12-01"
+        assert [result['output_name'] for result in results] == [
+            'yellow_taxi_2019-11', 'yellow_taxi_2019-12', 'taxi_zone'
+        ]
+        assert sorted(path.name for path in day.iterdir()) == [
+            'yellow_taxi_2019-11-part-0.parquet', 'yellow_taxi_2019-12-part-0.parquet'
+        ]
+        assert len(handed_over) == 2
+        assert pq.read_table(day.parent).num_rows == 300
+
+        # Converting one month again leaves the other month's files alone
+        run_extraction(raw_data_dir=str(raw_dir), output_dir=str(tmp_path / "output"),
+                       output_mode="partitioned", outputs=['yellow_taxi_2019-12'])
+        assert pq.read_table(day.parent).num_rows == 300
+
+    @patch('src.extract.extract_parquet.Config.SPLIT_SIZE_BYTES', 50_000)
+    def test_run_extraction_streams_committed_parts(self, tmp_path):
+        """Test that on_output receives each part file once, as soon as it exists"""
+        (tmp_path / "raw").mkdir()
+        write_yellow_trips(tmp_path / "raw" / Config.YELLOW_TAXI_CSV)
+        handed_over = []
+
+        results = run_extraction(
+            raw_data_dir=str(tmp_path / "raw"),
+            output_dir=str(tmp_path / "output"),
+            output_mode="parts",
+            on_output=lambda path: handed_over.append((path, Path(path).exists())),
+        )
+
+        parts = sorted(
+            (tmp_path / "output" / "yellow_taxi" / "yellow_taxi_2019-12").glob("part-*.parquet")
+        )
+        assert results[0]['status'] == 'success'
+        assert len(parts) > 1
+        assert handed_over == [(str(part), True) for part in parts]
+
+    def test_run_extraction_stops_when_on_output_fails(self, tmp_path):
+        """Test that a failing consumer stops extraction of the remaining files"""
+        write_sources(tmp_path / "raw")
+
+        def on_output(path):
+            raise RuntimeError("upload queue failed")
+
+        with pytest.raises(RuntimeError, match="upload queue failed"):
+            run_extraction(
+                raw_data_dir=str(tmp_path / "raw"),
+                output_dir=str(tmp_path / "output"),
+                on_output=on_output,
+            )
+
+        outputs = [path.relative_to(tmp_path / "output").as_posix()
+                   for path in (tmp_path / "output").rglob("*.parquet")]
+        assert outputs == ['yellow_taxi/yellow_taxi_2019-12.parquet']
+
+    def test_split_byte_ranges(self, tmp_path):
+        """Test that byte ranges cover every data line exactly once"""
+        csv_file = tmp_path / "yellow.csv"
+        write_yellow_trips(csv_file)
+        data = csv_file.read_bytes()
+
+        column_names, ranges = split_byte_ranges(str(csv_file), 10_000)
+
+        assert column_names == YELLOW_TAXI_SCHEMA.names
+        assert len(ranges) > 1
+        assert ranges[0][0] == data.index(b"\n") + 1
+        assert ranges[-1][1] == len(data)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            assert end == start
+            assert data[end - 1:end] == b"\n"
+
+    @pytest.mark.parametrize("output_mode", ["single", "parts"])
+    def test_return_parquet_parallel_matches_serial(self, tmp_path, output_mode):
+        """Test that byte-range parsing is row-for-row equal to the serial path"""
+        csv_file = tmp_path / "yellow.csv"
+        write_yellow_trips(csv_file)
+
+        return_parquet(
+            returnBatches(str(csv_file), 1000, engine="pyarrow", schema=YELLOW_TAXI_SCHEMA),
+            str(tmp_path / "serial.parquet"),
+            schema=YELLOW_TAXI_SCHEMA
+        )
+        rows = return_parquet_parallel(
+            str(csv_file),
+            str(tmp_path / "parallel"),
+            schema=YELLOW_TAXI_SCHEMA,
+            workers=2,
+            range_bytes=50_000,
+            output_mode=output_mode
+        )
+
+        serial = pq.read_table(tmp_path / "serial.parquet")
+        if output_mode == "parts":
+            parts = sorted((tmp_path / "parallel").glob("part-*.parquet"))
+            assert len(parts) > 1
+            parallel = pa.concat_tables([pq.read_table(part) for part in parts])
+        else:
+            parallel = pq.read_table(tmp_path / "parallel")
+            assert pq.ParquetFile(tmp_path / "parallel").num_row_groups > 1
+
+        assert rows == serial.num_rows == 5000
+        assert parallel.to_pylist() == serial.to_pylist()
+
+    @pytest.mark.parametrize("engine", ["pyarrow", "pandas"])
+    def test_return_parquet_partitioned(self, tmp_path, engine):
+        """Test hive-partitioned output by pickup date"""
+        csv_file = tmp_path / "yellow.csv"
+        write_yellow_trips(csv_file)  # 5000 trips, 37s apart, starting 2019-12-01
+        dataset_dir = tmp_path / "yellow_taxi"
+
+        rows = return_parquet(
+            returnBatches(str(csv_file), 1000, engine=engine, schema=YELLOW_TAXI_SCHEMA),
+            str(dataset_dir),
+            schema=YELLOW_TAXI_SCHEMA,
+            partition_column="tpep_pickup_datetime"
+        )
+
+        partitions = sorted(path.name for path in dataset_dir.iterdir())
+        assert rows == 5000
+        assert partitions == ["pickup_date=2019-12-01", "pickup_date=2019-12-02", "pickup_date=2019-12-03"]
+
+        dataset = ds.dataset(dataset_dir, format="parquet", partitioning="hive")
+        assert dataset.count_rows() == 5000
+        day_one = dataset.to_table(filter=ds.field("pickup_date") == "2019-12-01")
+        assert day_one.num_rows == 86400 // 37 + 1
+
+    def test_return_parquet_partitioned_rewrites_only_touched_days(self, tmp_path):
+        """Test that a rerun replaces the days it contains and keeps the others"""
+        csv_file = tmp_path / "yellow.csv"
+        write_yellow_trips(csv_file)
+        dataset_dir = tmp_path / "yellow_taxi"
+
+        def write(path):
+            return return_parquet(
+                returnBatches(str(path), 1000, engine="pyarrow", schema=YELLOW_TAXI_SCHEMA),
+                str(dataset_dir),
+                schema=YELLOW_TAXI_SCHEMA,
+                partition_column="tpep_pickup_datetime"
+            )
+
+        write(csv_file)
+        # Rerun with only the first 100 trips, all on 2019-12-01
+        rerun_file = tmp_path / "rerun.csv"
+        rerun_file.write_text("".join(csv_file.read_text().splitlines(keepends=True)[:101]))
+        write(rerun_file)
+
+        dataset = ds.dataset(dataset_dir, format="parquet", partitioning="hive")
+        counts = dataset.to_table().group_by("pickup_date").aggregate([([], "count_all")])
+        counts = dict(zip(counts["pickup_date"].to_pylist(), counts["count_all"].to_pylist()))
+        assert counts == {"2019-12-01": 100, "2019-12-02": 2335, "2019-12-03": 329}
@@ -0,0 +1,119 @@
+"""
+Unit tests for streaming Parquet output to GCS
+"""
+import gc
+import os
+import pytest
+from unittest.mock import Mock, patch
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from google.cloud.storage.fileio import BlobWriter
+
+from src.extract.extract_parquet import returnBatches, return_parquet, run_extraction
+from src.extract.gcs_output import split_gcs_path
+from src.extract.schemas import YELLOW_TAXI_SCHEMA
+from tests.test_extract import write_yellow_trips
+
+
+class RecordingWriter(BlobWriter):
+    """BlobWriter uploading to memory: the chunk never fills, so the only upload is the finalizing one"""
+
+    def __init__(self, uploads):
+        super().__init__(Mock(chunk_size=1 << 40), ignore_flush=True)
+        self.uploads = uploads
+
+    def _upload_chunks_from_buffer(self, num_chunks):
+        self.uploads.append(self._buffer.read())
+
+
+class TestGCSOutput:
+    """Test cases for gcs_output module"""
+
+    def test_split_gcs_path(self):
+        """Test splitting a GCS URI into bucket and object"""
+        assert split_gcs_path('gs://bucket/raw_data/yellow_taxi.parquet') == (
+            'bucket', 'raw_data/yellow_taxi.parquet'
+        )
+        with pytest.raises(ValueError):
+            split_gcs_path('gs://bucket')
+
+    def test_return_parquet_streams_to_gcs_writer(self, tmp_path):
+        """Test that a gs:// output is written through the writer and finalized"""
+        csv_file = tmp_path / "yellow.csv"
+        write_yellow_trips(csv_file)
+        uploads = []
+        writer = RecordingWriter(uploads)
+
+        with patch('src.extract.gcs_output.open_gcs_writer', return_value=writer) as mock_open:
+            rows = return_parquet(
+                returnBatches(str(csv_file), 1000, engine="pyarrow", schema=YELLOW_TAXI_SCHEMA),
+                'gs://bucket/raw_data/yellow_taxi.parquet',
+                schema=YELLOW_TAXI_SCHEMA
+            )
+
+        mock_open.assert_called_once_with('gs://bucket/raw_data/yellow_taxi.parquet', client=None)
+        assert rows == 5000
+        assert pq.read_table(pa.BufferReader(uploads[0])).num_rows == 5000
+        assert not (tmp_path / "yellow_taxi.parquet").exists()
+
+    def test_failed_write_is_not_finalized(self, tmp_path):
+        """Test that an error mid-stream abandons the upload instead of publishing it"""
+        csv_file = tmp_path / "yellow.csv"
+        write_yellow_trips(csv_file)
+        uploads = []
+        writer = RecordingWriter(uploads)
+        # A session started by earlier chunks
+        session, transport = Mock(resumable_url='https://upload/session'), Mock()
+        writer._upload_and_transport = (session, transport)
+
+        def failing_batches():
+            batches = returnBatches(str(csv_file), 1000, engine="pyarrow")
+            yield next(batches)
+            raise MemoryError("worker killed")
+
+        with patch('src.extract.gcs_output.open_gcs_writer', return_value=writer):
+            with pytest.raises(MemoryError):
+                return_parquet(failing_batches(), 'gs://bucket/raw_data/yellow_taxi.parquet')
+
+        # Dropping the writers must not finalize the upload either
+        del writer
+        gc.collect()
+        assert uploads == []
+        transport.request.assert_called_once_with('DELETE', 'https://upload/session')
+
+    def test_run_extraction_rejects_local_only_modes(self, tmp_path):
+        """Test that part files and partitioned datasets can't be streamed"""
+        with pytest.raises(ValueError, match="single"):
+            run_extraction(raw_data_dir=str(tmp_path), output_dir='gs://bucket/raw_data',
+                           output_mode='parts')
+
+    @pytest.mark.skipif(
+        not os.getenv('STORAGE_EMULATOR_HOST'),
+        reason="needs a local fake-GCS server (set STORAGE_EMULATOR_HOST)"
+    )
+    def test_stream_round_trip_against_fake_gcs(self, tmp_path):
+        """Test a multi-chunk resumable upload round trip against a fake-GCS server"""
+        from google.cloud import storage
+
+        client = storage.Client()
+        bucket_name = 'transport-elt-test'
+        if not client.lookup_bucket(bucket_name):
+            client.create_bucket(bucket_name)
+        csv_file = tmp_path / "yellow.csv"
+        write_yellow_trips(csv_file, rows=60000)
+        local_file = tmp_path / "yellow.parquet"
+        return_parquet(returnBatches(str(csv_file), 10000, engine="pyarrow",
+                                     schema=YELLOW_TAXI_SCHEMA),
+                       str(local_file), schema=YELLOW_TAXI_SCHEMA)
+
+        # 256 KiB chunks force several resumable upload requests
+        with patch('src.extract.gcs_output.Config.GCS_STREAM_CHUNK_BYTES', 256 * 1024):
+            return_parquet(returnBatches(str(csv_file), 10000, engine="pyarrow",
+                                         schema=YELLOW_TAXI_SCHEMA),
+                           f'gs://{bucket_name}/raw_data/yellow_taxi.parquet',
+                           schema=YELLOW_TAXI_SCHEMA)
+
+        data = client.bucket(bucket_name).blob('raw_data/yellow_taxi.parquet').download_as_bytes()
+        assert len(data) > 256 * 1024
+        assert pq.read_table(pa.BufferReader(data)).equals(pq.read_table(local_file))
@@ -1,11 +1,38 @@
 """
 Unit tests for data loading module
 """
+import json
+import os
+import threading
 import pytest
+from datetime import datetime
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 
-from src.load.load_to_gcp import upload_to_gcs, load_to_bq, run_load
+from src.load.load_to_gcp import (
+    ChecksumCache,
+    GCSUploader,
+    LoadError,
+    UploadError,
+    UploadQueue,
+    upload_to_gcs,
+    load_many_to_bq,
+    load_to_bq,
+    local_crc32c,
+    run_load,
+)
+
+
+def make_storage_client():
+    """Build a mock storage client whose blobs are created per object name"""
+    client = MagicMock()
+    blobs = {}
+
+    def blob(name):
+        return blobs.setdefault(name, MagicMock(name=name))
+
+    client.bucket.return_value.blob.side_effect = blob
+    return client, blobs
 
 
 class TestLoadToGCP:
@@ -86,11 +113,32 @@ class TestLoadToGCP:
         # Verify job configuration includes CSV-specific settings
         assert mock_client_instance.load_table_from_uri.called
 
-    @patch('src.load.load_to_gcp.upload_to_gcs')
-    @patch('src.load.load_to_gcp.load_to_bq')
+    @patch('src.load.load_to_gcp.bigquery.Client')
+    def test_load_to_bq_partitioned(self, mock_bq_client):
+        """Test loading a hive-partitioned dataset into a date-partitioned table"""
+        mock_client_instance = MagicMock()
+        mock_bq_client.return_value = mock_client_instance
+
+        load_to_bq(
+            gcs_path='raw_data/yellow_taxi',
+            table_name='raw_yellow_taxi',
+            bucket_name='test-bucket',
+            partition_field='pickup_date'
+        )
+
+        uri, _ = mock_client_instance.load_table_from_uri.call_args[0]
+        job_config = mock_client_instance.load_table_from_uri.call_args[1]['job_config']
+        assert uri == 'gs://test-bucket/raw_data/yellow_taxi/*'
+        assert job_config.hive_partitioning.source_uri_prefix == (
+            'gs://test-bucket/raw_data/yellow_taxi/{pickup_date:DATE}'
+        )
+        assert job_config.time_partitioning.field == 'pickup_date'
+
+    @patch('src.load.load_to_gcp.GCSUploader')
+    @patch('src.load.load_to_gcp.load_many_to_bq')
     @patch('src.load.load_to_gcp.Config.set_gcp_credentials')
     @patch('src.load.load_to_gcp.Path')
-    def test_run_load(self, mock_path, mock_set_creds, mock_load_bq, mock_upload):
+    def test_run_load(self, mock_path, mock_set_creds, mock_load_bq, mock_uploader):
         """Test full load process"""
         # Mock Path.iterdir to return fake parquet files
         mock_file1 = MagicMock()
@@ -116,8 +164,128 @@ class TestLoadToGCP:
         mock_set_creds.assert_called_once_with('/test/creds.json')
 
         # Verify upload and load were called
-        assert mock_upload.call_count >= 2  # At least 2 files uploaded
-        assert mock_load_bq.call_count == 3  # 3 tables loaded
+        uploaded = mock_uploader.return_value.upload_many.call_args[0][0]
+        assert len(uploaded) >= 2  # At least 2 files uploaded
+        mock_load_bq.assert_called_once()
+        assert len(mock_load_bq.call_args[0][0]) == 3  # 3 tables loaded in one batch
+
+    @patch('src.load.load_to_gcp.GCSUploader')
+    @patch('src.load.load_to_gcp.load_many_to_bq')
+    @patch('src.load.load_to_gcp.Config.set_gcp_credentials')
+    def test_run_load_partitioned(self, mock_set_creds, mock_load_bq, mock_uploader, tmp_path):
+        """Test uploading and loading a hive-partitioned dataset"""
+        partition = tmp_path / "yellow_taxi" / "pickup_date=2019-12-01"
+        partition.mkdir(parents=True)
+        (partition / "part-0.parquet").touch()
+        (tmp_path / "green_taxi.parquet").touch()
+
+        run_load(data_dir=str(tmp_path))
+
+        uploaded = {gcs for _, gcs in mock_uploader.return_value.upload_many.call_args[0][0]}
+        assert uploaded == {
+            'raw_data/yellow_taxi/pickup_date=2019-12-01/part-0.parquet',
+            'raw_data/green_taxi.parquet',
+        }
+        specs = mock_load_bq.call_args[0][0]
+        assert {'gcs_path': 'raw_data/yellow_taxi', 'table_name': 'raw_yellow_taxi',
+                'partition_field': 'pickup_date', 'clustering_fields': ['PULocationID']} in specs
+        assert {'gcs_path': 'raw_data/green_taxi.parquet', 'table_name': 'raw_green_taxi'} in specs
+
+    @patch('src.load.load_to_gcp.storage.Client')
+    @patch('src.load.load_to_gcp.GCSUploader')
+    @patch('src.load.load_to_gcp.load_many_to_bq')
+    @patch('src.load.load_to_gcp.Config.set_gcp_credentials')
+    def test_run_load_aggregates(self, mock_set_creds, mock_load_bq, mock_uploader, mock_client,
+                                 tmp_path):
+        """Test that extraction aggregates are loaded and sources with no files are skipped"""
+        mock_client.return_value.list_blobs.return_value = iter([])
+        (tmp_path / "aggregates" / "partials").mkdir(parents=True)
+        (tmp_path / "aggregates" / "trip_summary_day.parquet").touch()
+        (tmp_path / "aggregates" / "partials" / "yellow_taxi.parquet").touch()
+
+        run_load(data_dir=str(tmp_path))
+
+        specs = mock_load_bq.call_args[0][0]
+        assert {'gcs_path': 'raw_data/aggregates/trip_summary_day.parquet',
+                'table_name': 'agg_trip_summary_day'} in specs
+        assert not any('partials' in spec['gcs_path'] for spec in specs)
+        # No local or uploaded trip files: no wildcard load that would match nothing
+        assert not any(spec['table_name'] in ('raw_yellow_taxi', 'raw_green_taxi')
+                       for spec in specs)
+
+    @patch('src.load.load_to_gcp.GCSUploader')
+    @patch('src.load.load_to_gcp.load_many_to_bq')
+    @patch('src.load.load_to_gcp.Config.set_gcp_credentials')
+    def test_run_load_selected_outputs(self, mock_set_creds, mock_load_bq, mock_uploader,
+                                       tmp_path):
+        """Test that a per-file load only uploads and loads its own output"""
+        (tmp_path / "yellow_taxi.parquet").touch()
+        (tmp_path / "green_taxi.parquet").touch()
+        (tmp_path / "aggregates").mkdir()
+        (tmp_path / "aggregates" / "trip_summary_day.parquet").touch()
+
+        run_load(data_dir=str(tmp_path), outputs=["green_taxi"])
+
+        uploaded = [gcs for _, gcs in mock_uploader.return_value.upload_many.call_args[0][0]]
+        assert uploaded == ['raw_data/green_taxi.parquet']
+        assert mock_load_bq.call_args[0][0] == [
+            {'gcs_path': 'raw_data/green_taxi.parquet', 'table_name': 'raw_green_taxi'}
+        ]
+
+    @patch('src.load.load_to_gcp.GCSUploader')
+    @patch('src.load.load_to_gcp.load_many_to_bq')
+    @patch('src.load.load_to_gcp.Config.set_gcp_credentials')
+    def test_run_load_one_month(self, mock_set_creds, mock_load_bq, mock_uploader, tmp_path):
+        """Test that a month uploads its own objects and reloads its table from every month"""
+        for month in ["2019-11", "2019-12"]:
+            partition = tmp_path / "yellow_taxi" / "pickup_date=2019-12-01"
+            partition.mkdir(parents=True, exist_ok=True)
+            (partition / f"yellow_taxi_{month}-part-0.parquet").touch()
+
+        run_load(data_dir=str(tmp_path), outputs=["yellow_taxi_2019-12"])
+
+        uploaded = [gcs for _, gcs in mock_uploader.return_value.upload_many.call_args[0][0]]
+        assert uploaded == [
+            'raw_data/yellow_taxi/pickup_date=2019-12-01/yellow_taxi_2019-12-part-0.parquet'
+        ]
+        assert mock_load_bq.call_args[0][0] == [
+            {'gcs_path': 'raw_data/yellow_taxi', 'table_name': 'raw_yellow_taxi',
+             'partition_field': 'pickup_date', 'clustering_fields': ['PULocationID']}
+        ]
+
+    @patch('src.load.load_to_gcp.storage.Client')
+    @patch('src.load.load_to_gcp.GCSUploader')
+    @patch('src.load.load_to_gcp.load_many_to_bq')
+    @patch('src.load.load_to_gcp.Config.set_gcp_credentials')
+    def test_run_load_months_then_tables(self, mock_set_creds, mock_load_bq, mock_uploader,
+                                         mock_client, tmp_path):
+        """Test that months are uploaded without loading and each table is then loaded once"""
+        # Green months were streamed straight to GCS
+        mock_client.return_value.list_blobs.side_effect = lambda bucket, prefix, max_results: (
+            iter([MagicMock()]) if prefix == 'raw_data/green_taxi/' else iter([])
+        )
+        for month in ["2019-11", "2019-12"]:
+            (tmp_path / "yellow_taxi").mkdir(exist_ok=True)
+            (tmp_path / "yellow_taxi" / f"yellow_taxi_{month}.parquet").touch()
+        (tmp_path / "taxi_zone.parquet").touch()
+        (tmp_path / "aggregates").mkdir()
+        (tmp_path / "aggregates" / "trip_summary_day.parquet").touch()
+
+        for month in ["2019-11", "2019-12"]:
+            run_load(data_dir=str(tmp_path), outputs=[f"yellow_taxi_{month}"], load=False)
+        mock_load_bq.assert_not_called()
+        assert mock_uploader.return_value.upload_many.call_count == 2
+
+        mock_uploader.reset_mock()
+        run_load(data_dir=str(tmp_path), outputs=["yellow_taxi", "green_taxi", "taxi_zone"],
+                 upload=False)
+
+        mock_uploader.return_value.upload_many.assert_not_called()
+        assert mock_load_bq.call_args[0][0] == [
+            {'gcs_path': 'raw_data/yellow_taxi/*.parquet', 'table_name': 'raw_yellow_taxi'},
+            {'gcs_path': 'raw_data/green_taxi/*.parquet', 'table_name': 'raw_green_taxi'},
+            {'gcs_path': 'raw_data/taxi_zone.parquet', 'table_name': 'raw_taxi_zone'},
+        ]
 
     @patch('src.load.load_to_gcp.Path.iterdir')
     def test_run_load_no_files(self, mock_iterdir):
@@ -127,3 +295,415 @@ class TestLoadToGCP:
 
         # This should not raise an error
         run_load(data_dir='/empty/dir')
+
+
+def make_load_job(events, table_name, rows=100, slot_ms=2500, result_error=None):
+    """Build a stub load job that records when it is waited on"""
+    job = MagicMock()
+    job.job_id = f"job_{table_name}"
+    job.input_file_bytes = rows * 10
+    job.output_rows = rows
+    job.started = datetime(2024, 1, 1, 0, 0, 0)
+    job.ended = datetime(2024, 1, 1, 0, 0, 4)
+    job._properties = {"statistics": {"totalSlotMs": str(slot_ms)}}
+    job.done.return_value = result_error is None
+
+    def result(timeout=None):
+        events.append(("result", table_name))
+        if result_error:
+            raise result_error
+        return job
+
+    job.result.side_effect = result
+    return job
+
+
+class TestLoadManyToBQ:
+    """Test cases for concurrent BigQuery load jobs"""
+
+    def make_client(self, events, **errors):
+        """Stub client returning one load job per destination table"""
+        client = MagicMock()
+
+        def load_table_from_uri(uri, table_ref, job_config=None):
+            table_name = client.dataset.return_value.table.call_args[0][0]
+            events.append(("submit", table_name))
+            return make_load_job(events, table_name, result_error=errors.get(table_name))
+
+        client.load_table_from_uri.side_effect = load_table_from_uri
+        return client
+
+    def test_jobs_submitted_before_waiting(self):
+        """Test that every job is submitted from one client before any is awaited"""
+        events = []
+        client = self.make_client(events)
+        specs = [
+            {'gcs_path': 'raw_data/yellow_taxi', 'table_name': 'raw_yellow_taxi',
+             'partition_field': 'pickup_date'},
+            {'gcs_path': 'raw_data/green_taxi.parquet', 'table_name': 'raw_green_taxi'},
+        ]
+
+        results = load_many_to_bq(specs, bucket_name='test-bucket', client=client)
+
+        assert [kind for kind, _ in events] == ['submit', 'submit', 'result', 'result']
+        assert results[0] == {
+            'gcs_path': 'raw_data/yellow_taxi', 'table_name': 'raw_yellow_taxi',
+            'partition': None, 'status': 'loaded', 'error': None, 'job_id': 'job_raw_yellow_taxi',
+            'bytes': 1000, 'rows': 100, 'slot_ms': 2500, 'seconds': 4.0,
+        }
+        uris = [call[0][0] for call in client.load_table_from_uri.call_args_list]
+        assert uris == ['gs://test-bucket/raw_data/yellow_taxi/*',
+                        'gs://test-bucket/raw_data/green_taxi.parquet']
+
+    def test_timed_out_job_is_cancelled(self):
+        """Test that a job still running at the deadline is cancelled and reported"""
+        from concurrent.futures import TimeoutError
+        events = []
+        client = self.make_client(events, raw_green_taxi=TimeoutError())
+        specs = [
+            {'gcs_path': 'raw_data/yellow_taxi.parquet', 'table_name': 'raw_yellow_taxi'},
+            {'gcs_path': 'raw_data/green_taxi.parquet', 'table_name': 'raw_green_taxi'},
+        ]
+
+        with pytest.raises(LoadError, match='raw_green_taxi') as error:
+            load_many_to_bq(specs, bucket_name='test-bucket', client=client, timeout=5)
+
+        loaded, timed_out = error.value.results
+        assert loaded['status'] == 'loaded'
+        assert timed_out['status'] == 'failed'
+        assert timed_out['error'].startswith('TimeoutError')
+
+
+class TestPartitionLoads:
+    """Test cases for partition-level incremental loads"""
+
+    def write_partitions(self, data_dir, dates):
+        """Write one part file per pickup date partition"""
+        for date in dates:
+            partition = data_dir / "yellow_taxi" / f"pickup_date={date}"
+            partition.mkdir(parents=True, exist_ok=True)
+            (partition / "part-0.parquet").write_bytes(date.encode())
+
+    def test_load_partition_through_decorator(self):
+        """Test that a partition load targets table$YYYYMMDD with clustering"""
+        events = []
+        client = TestLoadManyToBQ().make_client(events)
+
+        load_many_to_bq([{
+            'gcs_path': 'raw_data/yellow_taxi', 'table_name': 'raw_yellow_taxi',
+            'partition_field': 'pickup_date', 'partition': '2019-12-01',
+            'clustering_fields': ['PULocationID'],
+        }], bucket_name='test-bucket', client=client)
+
+        uri, _ = client.load_table_from_uri.call_args[0]
+        job_config = client.load_table_from_uri.call_args[1]['job_config']
+        client.dataset.return_value.table.assert_called_once_with('raw_yellow_taxi$20191201')
+        assert uri == 'gs://test-bucket/raw_data/yellow_taxi/pickup_date=2019-12-01/*'
+        assert job_config.write_disposition == 'WRITE_TRUNCATE'
+        assert job_config.time_partitioning.field == 'pickup_date'
+        assert job_config.clustering_fields == ['PULocationID']
+
+    @patch('src.load.load_to_gcp.Config.BQ_TABLES', {'yellow_taxi': 'raw_yellow_taxi'})
+    @patch('src.load.load_to_gcp.Config.BQ_LOAD_MODE', 'partitions')
+    @patch('src.load.load_to_gcp.GCSUploader')
+    @patch('src.load.load_to_gcp.load_many_to_bq')
+    @patch('src.load.load_to_gcp.Config.set_gcp_credentials')
+    def test_only_changed_partitions_reloaded(self, mock_set_creds, mock_load_bq,
+                                              mock_uploader, tmp_path):
+        """Test that the ledger limits reruns to new or changed partitions"""
+        def loaded(specs):
+            return [{'status': 'loaded', 'job_id': f"job_{spec['partition']}", 'rows': 10}
+                    for spec in specs]
+
+        mock_load_bq.side_effect = loaded
+        self.write_partitions(tmp_path, ['2019-12-01', '2019-12-02'])
+        run_load(data_dir=str(tmp_path))
+
+        (tmp_path / "yellow_taxi" / "pickup_date=2019-12-02" / "part-0.parquet").write_bytes(b"new")
+        self.write_partitions(tmp_path, ['2019-12-03'])
+        run_load(data_dir=str(tmp_path))
+
+        first, second = [call[0][0] for call in mock_load_bq.call_args_list]
+        assert [spec['partition'] for spec in first] == ['2019-12-01', '2019-12-02']
+        assert [spec['partition'] for spec in second] == ['2019-12-02', '2019-12-03']
+
+        ledger = json.loads((tmp_path / ".load_ledger.json").read_text())['raw_yellow_taxi']
+        assert sorted(ledger) == ['2019-12-01', '2019-12-02', '2019-12-03']
+        assert ledger['2019-12-03']['files'] == [
+            'raw_data/yellow_taxi/pickup_date=2019-12-03/part-0.parquet'
+        ]
+        assert ledger['2019-12-03']['job_id'] == 'job_2019-12-03'
+
+    @patch('src.load.load_to_gcp.Config.BQ_TABLES', {'yellow_taxi': 'raw_yellow_taxi'})
+    @patch('src.load.load_to_gcp.Config.BQ_LOAD_MODE', 'partitions')
+    @patch('src.load.load_to_gcp.GCSUploader')
+    @patch('src.load.load_to_gcp.load_many_to_bq')
+    @patch('src.load.load_to_gcp.Config.set_gcp_credentials')
+    def test_failed_partition_not_recorded(self, mock_set_creds, mock_load_bq,
+                                           mock_uploader, tmp_path):
+        """Test that a failed partition load is retried on the next run"""
+        mock_load_bq.side_effect = LoadError('Load failed for: raw_yellow_taxi', [
+            {'status': 'loaded', 'job_id': 'job_1', 'rows': 10},
+            {'status': 'failed', 'job_id': 'job_2', 'rows': None},
+        ])
+        self.write_partitions(tmp_path, ['2019-12-01', '2019-12-02'])
+
+        with pytest.raises(LoadError):
+            run_load(data_dir=str(tmp_path))
+
+        ledger = json.loads((tmp_path / ".load_ledger.json").read_text())['raw_yellow_taxi']
+        assert list(ledger) == ['2019-12-01']
+
+
+class TestGCSUploader:
+    """Test cases for the shared-client concurrent uploader"""
+
+    def test_small_file_single_upload(self, tmp_path):
+        """Test that small files are uploaded in one request"""
+        local_file = tmp_path / "zone.parquet"
+        local_file.write_bytes(b"x" * 100)
+        client, blobs = make_storage_client()
+
+        uploader = GCSUploader('test-bucket', client=client, composite_threshold=1000)
+        result = uploader.upload_file(str(local_file), 'raw_data/zone.parquet')
+
+        blobs['raw_data/zone.parquet'].upload_from_filename.assert_called_once_with(str(local_file))
+        assert result['bytes'] == 100
+
+    def test_large_file_parallel_composite_upload(self, tmp_path):
+        """Test that large files are uploaded as parts and composed"""
+        data = os.urandom(10_000)
+        local_file = tmp_path / "yellow.parquet"
+        local_file.write_bytes(data)
+        client, blobs = make_storage_client()
+        uploaded = {}
+
+        def capture(name):
+            def upload_from_file(f, size):
+                uploaded[name] = f.read(size)
+            return upload_from_file
+
+        for i in range(4):
+            name = f'tmp/composite/raw_data/yellow.parquet.part-{i:02d}'
+            client.bucket.return_value.blob(name).upload_from_file.side_effect = capture(name)
+
+        uploader = GCSUploader('test-bucket', client=client,
+                               composite_threshold=1000, composite_parts=4)
+        uploader.upload_file(str(local_file), 'raw_data/yellow.parquet')
+
+        parts = [blobs[f'tmp/composite/raw_data/yellow.parquet.part-{i:02d}'] for i in range(4)]
+        assert b"".join(uploaded[part._mock_name] for part in parts) == data
+        blobs['raw_data/yellow.parquet'].compose.assert_called_once_with(parts)
+        assert all(part.delete.called for part in parts)
+        assert not any(name.startswith('raw_data/yellow.parquet.') for name in blobs)
+
+    def test_failed_part_upload_deletes_uploaded_parts(self, tmp_path):
+        """Test that the parts already uploaded are deleted when another part fails"""
+        local_file = tmp_path / "yellow.parquet"
+        local_file.write_bytes(os.urandom(10_000))
+        client, blobs = make_storage_client()
+        client.bucket.return_value.blob('tmp/composite/raw_data/yellow.parquet.part-02') \
+            .upload_from_file.side_effect = ConnectionError("reset")
+
+        uploader = GCSUploader('test-bucket', client=client,
+                               composite_threshold=1000, composite_parts=4)
+        with pytest.raises(ConnectionError):
+            uploader.upload_file(str(local_file), 'raw_data/yellow.parquet')
+
+        parts = [blobs[f'tmp/composite/raw_data/yellow.parquet.part-{i:02d}'] for i in range(4)]
+        assert all(part.upload_from_file.called and part.delete.called for part in parts)
+        assert 'raw_data/yellow.parquet' not in blobs  # nothing composed
+
+    def test_upload_many_reports_failures_per_file(self, tmp_path):
+        """Test that one failed upload doesn't drop the other results"""
+        files = []
+        for name in ['yellow', 'green', 'zone']:
+            local_file = tmp_path / f"{name}.parquet"
+            local_file.write_bytes(b"x" * 10)
+            files.append((str(local_file), f'raw_data/{name}.parquet'))
+        client, blobs = make_storage_client()
+        client.bucket.return_value.blob('raw_data/green.parquet') \
+            .upload_from_filename.side_effect = ConnectionError("reset")
+
+        with pytest.raises(UploadError) as exc_info:
+            GCSUploader('test-bucket', client=client, max_workers=3).upload_many(files)
+
+        statuses = [result['status'] for result in exc_info.value.results]
+        assert statuses == ['uploaded', 'failed', 'uploaded']
+        assert client.bucket.call_count == 1  # One shared client and bucket
+
+    @pytest.mark.skipif(
+        not os.getenv('STORAGE_EMULATOR_HOST'),
+        reason="needs a local fake-GCS server (set STORAGE_EMULATOR_HOST)"
+    )
+    def test_composite_upload_against_fake_gcs(self, tmp_path):
+        """Test a composite upload round trip against a fake-GCS server"""
+        from google.cloud import storage
+
+        client = storage.Client()
+        bucket_name = 'transport-elt-test'
+        if not client.lookup_bucket(bucket_name):
+            client.create_bucket(bucket_name)
+        data = os.urandom(3 * 1024 * 1024)
+        local_file = tmp_path / "yellow.parquet"
+        local_file.write_bytes(data)
+
+        uploader = GCSUploader(bucket_name, client=client,
+                               composite_threshold=1024 * 1024, composite_parts=3)
+        uploader.upload_file(str(local_file), 'raw_data/yellow.parquet')
+        rerun = uploader.upload_file(str(local_file), 'raw_data/yellow.parquet')
+
+        assert client.bucket(bucket_name).blob('raw_data/yellow.parquet').download_as_bytes() == data
+        assert rerun['status'] == 'skipped'
+
+    def test_unchanged_object_is_skipped(self, tmp_path):
+        """Test that a file matching the existing object's CRC32C isn't uploaded"""
+        local_file = tmp_path / "zone.parquet"
+        local_file.write_bytes(b"zones")
+        client, blobs = make_storage_client()
+        client.bucket.return_value.get_blob.return_value = MagicMock(
+            crc32c=local_crc32c(str(local_file))
+        )
+
+        result = GCSUploader('test-bucket', client=client).upload_file(
+            str(local_file), 'raw_data/zone.parquet'
+        )
+
+        assert result['status'] == 'skipped'
+        assert 'raw_data/zone.parquet' not in blobs
+
+    def test_changed_object_is_uploaded(self, tmp_path):
+        """Test that a CRC32C mismatch uploads the file"""
+        local_file = tmp_path / "zone.parquet"
+        local_file.write_bytes(b"zones")
+        client, blobs = make_storage_client()
+        client.bucket.return_value.get_blob.return_value = MagicMock(crc32c='AAAAAA==')
+
+        result = GCSUploader('test-bucket', client=client).upload_file(
+            str(local_file), 'raw_data/zone.parquet'
+        )
+
+        assert result['status'] == 'uploaded'
+        assert blobs['raw_data/zone.parquet'].upload_from_filename.called
+
+
+class TestChecksumCache:
+    """Test cases for local checksum caching"""
+
+    def test_local_crc32c_streams_in_blocks(self, tmp_path):
+        """Test that block-wise hashing matches hashing the whole file"""
+        import base64
+        import google_crc32c
+        data = os.urandom(3000)
+        local_file = tmp_path / "data.bin"
+        local_file.write_bytes(data)
+
+        with patch('src.load.load_to_gcp._CHECKSUM_BLOCK_BYTES', 1024):
+            crc32c = local_crc32c(str(local_file))
+
+        assert crc32c == base64.b64encode(google_crc32c.Checksum(data).digest()).decode()
+
+    def test_cache_rehashes_only_changed_files(self, tmp_path):
+        """Test that cached checksums are reused until size or mtime change"""
+        local_file = tmp_path / "yellow.parquet"
+        local_file.write_bytes(b"v1")
+        cache_file = tmp_path / ".checksums.json"
+
+        with patch('src.load.load_to_gcp.local_crc32c', wraps=local_crc32c) as mock_crc:
+            cache = ChecksumCache(cache_file)
+            first = cache.crc32c(str(local_file))
+            cache.save()
+            assert ChecksumCache(cache_file).crc32c(str(local_file)) == first
+            assert mock_crc.call_count == 1
+
+            local_file.write_bytes(b"v2 changed")
+            assert ChecksumCache(cache_file).crc32c(str(local_file)) != first
+            assert mock_crc.call_count == 2
+
+
+    def test_concurrent_saves_keep_each_others_entries(self, tmp_path):
+        """Test that caches saved by separate per-file tasks are merged, not overwritten"""
+        yellow, green = tmp_path / "yellow.parquet", tmp_path / "green.parquet"
+        yellow.write_bytes(b"yellow")
+        green.write_bytes(b"green")
+        cache_file = tmp_path / ".checksums.json"
+
+        first, second = ChecksumCache(cache_file), ChecksumCache(cache_file)
+        first.crc32c(str(yellow))
+        second.crc32c(str(green))
+        first.save()
+        second.save()
+
+        assert len(json.loads(cache_file.read_text())) == 2
+
+
+class TestUploadQueue:
+    """Test cases for streaming uploads during extraction"""
+
+    def make_uploader(self, upload_file):
+        """Stub uploader with two workers and an in-memory checksum cache"""
+        uploader = MagicMock()
+        uploader.max_workers = 2
+        uploader.upload_file.side_effect = upload_file
+        return uploader
+
+    def test_submitted_files_uploaded_with_relative_paths(self, tmp_path):
+        """Test that queued files keep their layout under the GCS prefix"""
+        uploader = self.make_uploader(
+            lambda local, gcs: {'local_path': local, 'gcs_path': gcs, 'status': 'uploaded',
+                                'bytes': 1, 'seconds': 0.0, 'error': None}
+        )
+
+        with UploadQueue(tmp_path, uploader=uploader, max_pending=1) as uploads:
+            uploads.submit(str(tmp_path / "green_taxi.parquet"))
+            uploads.submit(str(tmp_path / "yellow_taxi" / "part-00000.parquet"))
+
+        assert sorted(result['gcs_path'] for result in uploads.results) == [
+            'raw_data/green_taxi.parquet',
+            'raw_data/yellow_taxi/part-00000.parquet',
+        ]
+        uploader.checksum_cache.save.assert_called_once()
+
+    def test_failed_upload_stops_producer(self, tmp_path):
+        """Test that submit raises after an upload failed and close reports it"""
+        failed = threading.Event()
+
+        def upload_file(local, gcs):
+            failed.set()
+            raise ConnectionError("connection reset")
+
+        uploads = UploadQueue(tmp_path, uploader=self.make_uploader(upload_file))
+        uploads.submit(str(tmp_path / "green_taxi.parquet"))
+        failed.wait(5)
+        uploads._queue.join()
+
+        with pytest.raises(UploadError):
+            uploads.submit(str(tmp_path / "yellow_taxi.parquet"))
+        with pytest.raises(UploadError) as error:
+            uploads.close()
+        assert error.value.results[0]['error'] == 'ConnectionError: connection reset'
+
+    def test_producer_error_cancels_pending_uploads(self, tmp_path):
+        """Test that an extraction error drops queued files instead of uploading them"""
+        picked, release = threading.Event(), threading.Event()
+        started = []
+
+        def upload_file(local, gcs):
+            started.append(gcs)
+            picked.set()
+            release.wait(5)
+            return {'local_path': local, 'gcs_path': gcs, 'status': 'uploaded',
+                    'bytes': 1, 'seconds': 0.0, 'error': None}
+
+        uploader = self.make_uploader(upload_file)
+        uploader.max_workers = 1
+        with pytest.raises(RuntimeError):
+            with UploadQueue(tmp_path, uploader=uploader) as uploads:
+                for i in range(3):
+                    uploads.submit(str(tmp_path / f"part-{i}.parquet"))
+                picked.wait(5)
+                threading.Timer(0.2, release.set).start()
+                raise RuntimeError("extraction failed")
+
+        assert len(started) == 1
+        assert len(uploads.results) == 1
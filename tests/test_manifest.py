@@ -0,0 +1,125 @@
+"""
+Unit tests for incremental, resumable extraction
+"""
+import hashlib
+import os
+import pytest
+from unittest.mock import patch
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.extract import extract_parquet
+from src.extract.extract_parquet import convert_file
+from src.extract.manifest import Manifest, file_hash
+from tests.test_extract import write_yellow_trips
+
+
+@pytest.fixture
+def yellow_csv(tmp_path):
+    """Yellow taxi CSV of 5000 trips"""
+    path = tmp_path / "yellow.csv"
+    write_yellow_trips(path)
+    return path
+
+
+class TestManifest:
+    """Test cases for manifest module"""
+
+    def test_file_hash_streams_in_blocks(self, tmp_path):
+        """Test that hashing matches hashlib for files larger than one block"""
+        path = tmp_path / "data.bin"
+        data = os.urandom(3 * 1024 * 1024)
+        path.write_bytes(data)
+
+        with patch('src.extract.manifest._HASH_BLOCK_BYTES', 1024 * 1024):
+            assert file_hash(str(path)) == hashlib.sha256(data).hexdigest()
+
+    def test_unchanged_input_is_skipped(self, tmp_path, yellow_csv):
+        """Test that a second incremental run skips an unchanged file"""
+        output_dir = tmp_path / "output"
+
+        first = convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow",
+                             incremental=True)
+        output_mtime = os.stat(first["output"]).st_mtime_ns
+        second = convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow",
+                              incremental=True)
+
+        assert first["status"] == "success"
+        assert second["status"] == "unchanged"
+        assert second["rows"] == 5000
+        assert os.stat(first["output"]).st_mtime_ns == output_mtime
+
+    def test_touched_input_with_same_content_is_skipped(self, tmp_path, yellow_csv):
+        """Test that a new mtime alone falls back to the content hash"""
+        output_dir = tmp_path / "output"
+        convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow", incremental=True)
+
+        os.utime(yellow_csv, (1, 1))
+        result = convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow",
+                              incremental=True)
+
+        assert result["status"] == "unchanged"
+        assert Manifest(str(output_dir)).get("yellow_taxi")["mtime"] == 1
+
+    def test_changed_input_is_reconverted(self, tmp_path, yellow_csv):
+        """Test that changed content is converted again"""
+        output_dir = tmp_path / "output"
+        convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow", incremental=True)
+
+        write_yellow_trips(yellow_csv, rows=4000)
+        result = convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow",
+                              incremental=True)
+
+        assert result["status"] == "success"
+        assert result["rows"] == 4000
+        assert Manifest(str(output_dir)).get("yellow_taxi")["sha256"] == file_hash(str(yellow_csv))
+
+    def test_changed_input_is_hashed_once(self, tmp_path, yellow_csv):
+        """Test that the unchanged check and the new record share one read of the input"""
+        output_dir = tmp_path / "output"
+        convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow", incremental=True)
+
+        # Same size, new content and mtime, so the unchanged check has to hash it
+        # (the last congestion_surcharge 2.5 becomes 2.9)
+        yellow_csv.write_bytes(yellow_csv.read_bytes()[:-2] + b"9\n")
+        os.utime(yellow_csv, (1, 1))
+        with patch('src.extract.manifest.hashlib.sha256', wraps=hashlib.sha256) as hashed:
+            result = convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow",
+                                  incremental=True)
+
+        assert result["status"] == "success"
+        assert hashed.call_count == 1
+        assert Manifest(str(output_dir)).get("yellow_taxi")["sha256"] == file_hash(str(yellow_csv))
+
+    @patch('src.extract.extract_parquet.Config.SPLIT_SIZE_BYTES', 50_000)
+    def test_interrupted_conversion_resumes_from_last_part(self, tmp_path, yellow_csv):
+        """Test that a crash mid-file resumes after the last committed part"""
+        output_dir = tmp_path / "output"
+        write_part = extract_parquet._write_range_part
+        calls = []
+
+        def crash_on_third_part(*args):
+            calls.append(args)
+            if len(calls) == 3:
+                raise MemoryError("worker killed")
+            return write_part(*args)
+
+        with patch('src.extract.extract_parquet._write_range_part', crash_on_third_part):
+            failed = convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow",
+                                  output_mode="parts", incremental=True)
+
+        entry = Manifest(str(output_dir)).get("yellow_taxi")
+        assert failed["status"] == "failed"
+        assert entry["status"] == "in_progress"
+        assert entry["last_chunk"] == 1
+
+        with patch('src.extract.extract_parquet._write_range_part', wraps=write_part) as resumed_part:
+            result = convert_file("Yellow Taxi", str(yellow_csv), str(output_dir), "pyarrow",
+                                  output_mode="parts", incremental=True)
+
+        parts = sorted((output_dir / "yellow_taxi").glob("part-*"))
+        table = pa.concat_tables([pq.read_table(part) for part in parts])
+        assert result["status"] == "success"
+        assert result["rows"] == table.num_rows == 5000
+        assert resumed_part.call_count == len(parts) - 2
+        assert table["PULocationID"].to_pylist() == [i % 265 + 1 for i in range(5000)]
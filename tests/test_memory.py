@@ -0,0 +1,71 @@
+"""
+Unit tests for memory-budgeted chunk and row group sizing
+"""
+import pytest
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.extract.extract_parquet import _RowGroupWriter, convert_file
+from src.extract.memory import MIN_CHUNK_ROWS, WRITER_COLUMN_BYTES, MemoryBudget
+from .test_extract import write_yellow_trips
+
+MB = 1024 * 1024
+
+
+class TestMemoryBudget:
+    """Test cases for MemoryBudget sizing and budgeted conversions"""
+
+    def test_chunks_follow_row_size(self):
+        """Test that wider rows get fewer rows per chunk and measured chunks resize the next"""
+        narrow = MemoryBudget(100 * MB, "pyarrow", 50, 100, columns=2, baseline_bytes=20 * MB)
+        wide = MemoryBudget(100 * MB, "pyarrow", 500, 1000, columns=2, baseline_bytes=20 * MB)
+
+        assert narrow.available == 80 * MB - 2 * WRITER_COLUMN_BYTES
+        assert wide.chunk_rows < narrow.chunk_rows / 5
+        assert wide.block_size == int(wide.chunk_rows * 500)
+
+        rows = narrow.chunk_rows
+        narrow.observe(1000, 1000 * 400)
+        assert narrow.chunk_rows < rows
+
+    def test_budget_floors_and_row_group_cap(self, caplog):
+        """Test the minimum chunk size of a too small budget and row groups capped by the budget"""
+        starved = MemoryBudget(10 * MB, "pandas", 100, 100, 100, 700, baseline_bytes=20 * MB)
+        grouped = MemoryBudget(100 * MB, "pyarrow", 50, 100, baseline_bytes=0,
+                               row_group_rows=10_000_000)
+
+        assert starved.chunk_rows == MIN_CHUNK_ROWS
+        assert "converting in the minimum chunks" in caplog.text
+        assert grouped.row_group_rows * 100 * 2 <= grouped.available / 2
+        assert grouped.range_bytes(workers=2, window=4) & (grouped.range_bytes(2, 4) - 1) == 0
+
+    def test_row_group_writer_fixed_sizes(self, tmp_path):
+        """Test that row groups have the requested size whatever the chunk sizes written"""
+        path = tmp_path / "out.parquet"
+        schema = pa.schema([("x", pa.int64())])
+        writer = _RowGroupWriter(str(path), schema, 400)
+        start = 0
+        for size in (150, 700, 30, 120):
+            writer.write_table(pa.table({"x": range(start, start + size)}, schema=schema))
+            start += size
+        writer.close()
+
+        metadata = pq.ParquetFile(path).metadata
+        assert [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)] == [400, 400, 200]
+        assert pq.read_table(path)["x"].to_pylist() == list(range(1000))
+
+    @pytest.mark.parametrize("engine", ["pyarrow", "pandas"])
+    def test_convert_file_with_budget(self, tmp_path, engine):
+        """Test that a budgeted conversion writes every row in chunks of the budget's size"""
+        path = tmp_path / "yellow_tripdata_2019-12.csv"
+        write_yellow_trips(path, rows=5000)
+
+        result = convert_file("Yellow Taxi", str(path), str(tmp_path / "output"), engine,
+                              memory_budget=1)
+
+        metadata = pq.ParquetFile(result["output"]).metadata
+        assert result["status"] == "success"
+        assert result["rows"] == 5000 and metadata.num_rows == 5000
+        sizes = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+        assert len(sizes) >= 5000 // MIN_CHUNK_ROWS
+        assert max(sizes) <= MIN_CHUNK_ROWS
@@ -0,0 +1,94 @@
+"""
+Unit tests for the per-stage metrics module
+"""
+import json
+import pytest
+
+from src.extract.extract_parquet import convert_file, run_extraction
+from src.utils import metrics
+from src.utils.config import Config
+from .test_extract import write_sources
+
+
+class TestMetrics:
+    """Test cases for stage metrics and recorders"""
+
+    def test_histogram_quantiles(self):
+        """Test that quantiles fall in the bucket holding the requested rank"""
+        histogram = metrics.LatencyHistogram()
+        for _ in range(90):
+            histogram.observe(0.002)
+        for _ in range(10):
+            histogram.observe(0.7)
+
+        assert histogram.quantile(0.5) == 0.005
+        assert histogram.quantile(0.99) == 0.7
+        assert histogram.to_dict()["buckets"] == {"0.005": 90, "1.0": 10}
+        assert metrics.LatencyHistogram().quantile(0.5) is None
+
+    def test_stage_records_counters_and_failure(self):
+        """Test that a stage record carries its counters and a failed status on error"""
+        recorder = metrics.MetricsRecorder(run_id="run-1", labels={"source": "yellow"})
+
+        with recorder.stage("parse", engine="pyarrow") as stage:
+            for rows in stage.timed([100, 200]):
+                stage.add(rows=rows, output_bytes=rows * 8)
+        with pytest.raises(ValueError):
+            with recorder.stage("write"):
+                raise ValueError("disk full")
+
+        parse, write = recorder.records
+        assert parse["stage"] == "parse"
+        assert (parse["source"], parse["engine"]) == ("yellow", "pyarrow")
+        assert (parse["status"], parse["rows"], parse["output_bytes"]) == ("success", 300, 2400)
+        assert parse["chunks"]["count"] == 2
+        assert write["status"] == "failed"
+
+    def test_records_logged_and_summary_written(self, tmp_path, caplog):
+        """Test that each record is logged as JSON and the summary totals stages per name"""
+        recorder = metrics.MetricsRecorder(run_id="scheduled__2025-01-05T00:00:00")
+        with metrics.recording(recorder):
+            for rows in (10, 30):
+                with metrics.stage("upload") as stage:
+                    stage.add(rows=rows)
+
+        logged = [json.loads(record.getMessage()) for record in caplog.records
+                  if record.getMessage().startswith("{")]
+        path = recorder.write_summary("load", metrics_dir=str(tmp_path))
+        summary = json.loads(path.read_text())
+
+        assert [record["event"] for record in logged] == ["stage_metrics"] * 2
+        assert logged[0]["run_id"] == recorder.run_id
+        assert path.parent.parent == tmp_path and path.name == "load.json"
+        assert summary["totals"]["upload"]["runs"] == 2
+        assert summary["totals"]["upload"]["rows"] == 40
+        assert metrics.current() is not recorder
+
+    def test_convert_file_reports_stage_metrics(self, tmp_path):
+        """Test that a conversion returns parse, write and convert records with its rows"""
+        write_sources(tmp_path / "raw", rows=500)
+        path = tmp_path / "raw" / Config.DATA_FILES["Yellow Taxi"]
+
+        result = convert_file("Yellow Taxi", str(path), str(tmp_path / "output"), "pyarrow")
+
+        records = {record["stage"]: record for record in result["metrics"]}
+        assert set(records) >= {"parse", "write", "convert"}
+        assert records["convert"]["rows"] == 500
+        assert records["convert"]["input_bytes"] == path.stat().st_size
+        assert records["write"]["output_bytes"] > 0
+        assert len({record["source"] for record in result["metrics"]}) == 1
+
+    def test_run_extraction_merges_worker_metrics(self, tmp_path):
+        """Test that records made in worker processes reach the caller's recorder"""
+        write_sources(tmp_path / "raw", rows=200)
+
+        with metrics.recording(metrics.MetricsRecorder(run_id="run-2")) as recorder:
+            results = run_extraction(
+                raw_data_dir=str(tmp_path / "raw"),
+                output_dir=str(tmp_path / "output"),
+                workers=2
+            )
+
+        converts = [record for record in recorder.records if record["stage"] == "convert"]
+        assert len(converts) == len(results)
+        assert sum(record["rows"] for record in converts) == sum(r["rows"] for r in results)
@@ -0,0 +1,63 @@
+"""
+Unit tests for the opt-in profiling module
+"""
+import json
+import pstats
+
+from src.extract.extract_parquet import run_extraction
+from src.utils import metrics, profiling
+from src.utils.config import Config
+from .test_extract import write_sources
+
+
+class TestProfiling:
+    """Test cases for profiled() and the extraction profile option"""
+
+    def test_profiling_off_starts_nothing(self, tmp_path):
+        """Test that without a directory the block runs unprofiled and writes nothing"""
+        with profiling.profiled("convert", None) as profiler:
+            assert metrics._chunk_listener.get() is None
+            with metrics.stage("parse") as stage:
+                with stage.chunk():
+                    pass
+
+        assert profiler is None
+        assert not list(tmp_path.iterdir())
+
+    def test_profiled_block_writes_artifacts(self, tmp_path):
+        """Test that a profiled block writes pstats, collapsed stacks and per-chunk allocations"""
+        def chunks():
+            for _ in range(3):
+                yield [bytearray(1024) for _ in range(100)]
+
+        with profiling.profiled("yellow_taxi", str(tmp_path)):
+            with metrics.stage("parse") as stage:
+                for blocks in stage.timed(chunks()):
+                    pass
+
+        stats = pstats.Stats(str(tmp_path / "yellow_taxi.pstats"))
+        allocations = json.loads((tmp_path / "yellow_taxi.allocations.json").read_text())
+
+        assert stats.total_calls > 0
+        assert (tmp_path / "yellow_taxi.collapsed").exists()
+        assert [chunk["chunk"] for chunk in allocations["chunks"]] == [1, 2, 3]
+        assert all(chunk["stage"] == "parse" for chunk in allocations["chunks"])
+        assert allocations["chunks"][0]["traced_peak_bytes"] >= 100 * 1024
+        assert len(blocks) == 100
+
+    def test_run_extraction_profiles_each_conversion(self, tmp_path, monkeypatch):
+        """Test that profile=True writes one profile per converted file under the run id"""
+        write_sources(tmp_path / "raw", rows=200)
+        monkeypatch.setattr(Config, "PROFILES_DIR", tmp_path / "profiles")
+
+        with metrics.recording(metrics.MetricsRecorder(run_id="manual__1")):
+            results = run_extraction(
+                raw_data_dir=str(tmp_path / "raw"),
+                output_dir=str(tmp_path / "output"),
+                profile=True
+            )
+
+        run_dir = tmp_path / "profiles" / "manual__1"
+        assert sorted(path.name for path in run_dir.glob("*.pstats")) == sorted(
+            f"{result['output_name']}.pstats" for result in results
+        )
@@ -0,0 +1,73 @@
+"""
+Unit tests for declared source schemas
+"""
+import pytest
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.extract.extract_parquet import returnBatches, return_parquet
+from src.extract.schemas import (
+    YELLOW_TAXI_SCHEMA,
+    get_schema,
+    pandas_read_options,
+)
+from src.utils.config import Config
+
+
+YELLOW_HEADER = (
+    "VendorID,tpep_pickup_datetime,tpep_dropoff_datetime,passenger_count,"
+    "trip_distance,RatecodeID,store_and_fwd_flag,PULocationID,DOLocationID,"
+    "payment_type,fare_amount,extra,mta_tax,tip_amount,tolls_amount,"
+    "improvement_surcharge,total_amount,congestion_surcharge\n"
+)
+
+
+def write_yellow_csv(path, rows=2000):
+    """Write a yellow taxi CSV whose first half has empty code columns"""
+    lines = [YELLOW_HEADER]
+    for i in range(rows):
+        code = "" if i < rows // 2 else "1"
+        flag = "" if i < rows // 2 else "N"
+        lines.append(
+            f"1,2019-12-01 00:26:58,2019-12-01 00:41:45,{code},4.2,{code},{flag},"
+            f"142,116,1,14.5,3,0.5,3.7,0,0.3,22,2.5\n"
+        )
+    path.write_text("".join(lines))
+
+
+class TestSchemas:
+    """Test cases for schemas module"""
+
+    def test_every_data_file_has_schema(self):
+        """Test that each configured source declares a schema"""
+        for name in Config.DATA_FILES:
+            assert isinstance(get_schema(name), pa.Schema)
+
+    def test_pandas_read_options(self):
+        """Test translation of a declared schema to pandas read_csv arguments"""
+        dtypes, parse_dates = pandas_read_options(YELLOW_TAXI_SCHEMA)
+
+        assert dtypes["passenger_count"] == "Int8"
+        assert dtypes["PULocationID"] == "Int16"
+        assert dtypes["store_and_fwd_flag"] == "category"
+        assert parse_dates == ["tpep_pickup_datetime", "tpep_dropoff_datetime"]
+
+    @pytest.mark.parametrize("engine", ["pyarrow", "pandas"])
+    def test_schema_applied_with_null_first_chunk(self, tmp_path, engine):
+        """Test that empty codes in early chunks don't change the written types"""
+        csv_file = tmp_path / "yellow.csv"
+        write_yellow_csv(csv_file)
+        parquet_file = tmp_path / "yellow.parquet"
+
+        rows = return_parquet(
+            returnBatches(str(csv_file), 500, engine=engine, schema=YELLOW_TAXI_SCHEMA),
+            str(parquet_file),
+            schema=YELLOW_TAXI_SCHEMA
+        )
+
+        table = pq.read_table(parquet_file)
+        assert rows == 2000
+        assert table.schema.remove_metadata().equals(YELLOW_TAXI_SCHEMA)
+        assert table["passenger_count"].null_count == 1000
+        # Not widened from float32 (4.199999809265137)
+        assert set(table["trip_distance"].to_pylist()) == {4.2}
@@ -0,0 +1,45 @@
+"""
+Unit tests for raw source discovery
+"""
+from src.extract.sources import base_output, discover_sources, output_name
+from src.utils.config import Config
+
+
+class TestSources:
+    """Test cases for sources module"""
+
+    def test_output_names(self):
+        """Test month-tagged output names and their shared base"""
+        assert output_name("Yellow Taxi", "2019-12") == "yellow_taxi_2019-12"
+        assert output_name("Taxi Zone") == "taxi_zone"
+        assert base_output("yellow_taxi_2019-12") == "yellow_taxi"
+        assert base_output("taxi_zone") == "taxi_zone"
+
+    def test_discover_months(self, tmp_path):
+        """Test that every month of every known color is found, ordered by month"""
+        for name in [
+            "green_tripdata_2019-11.csv.gz",
+            "yellow_tripdata_2019-12.csv",
+            "yellow_tripdata_2019-11.csv",
+            "yellow_tripdata_2019-11.csv.gz",  # duplicate of the .csv
+            "fhv_tripdata_2019-11.csv",         # no source for this color
+            "yellow_tripdata_2019-11.parquet",  # not a CSV
+            Config.TAXI_ZONE_CSV,
+        ]:
+            (tmp_path / name).touch()
+
+        items = discover_sources(str(tmp_path))
+
+        assert [item["output"] for item in items] == [
+            "yellow_taxi_2019-11", "green_taxi_2019-11", "yellow_taxi_2019-12", "taxi_zone",
+        ]
+        assert items[0] == {
+            "name": "Yellow Taxi", "color": "yellow", "month": "2019-11",
+            "path": str(tmp_path / "yellow_tripdata_2019-11.csv"), "output": "yellow_taxi_2019-11",
+        }
+        assert items[1]["path"].endswith(".csv.gz")
+        assert items[3]["month"] is None
+
+    def test_discover_empty_directory(self, tmp_path):
+        """Test that a missing directory yields no work items"""
+        assert discover_sources(str(tmp_path / "missing")) == []
@@ -0,0 +1,135 @@
+"""
+Unit tests for trip validation and the quarantine output
+"""
+import json
+from datetime import datetime
+import pytest
+from unittest.mock import patch
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.extract.extract_parquet import run_extraction
+from src.extract.validation import REASON_COLUMN, TripValidator, quarantine_path, select_rules
+from src.utils import metrics
+from src.utils.config import Config
+from tests.test_extract import write_yellow_trips
+from tests.test_zones import write_zone_lookup
+
+
+def trips_table():
+    """Six trips: valid, negative fare, reversed times, previous month, unknown zone, zero distance"""
+    december = datetime(2019, 12, 5, 10)
+    pickups = [december, december, december, datetime(2019, 11, 30, 23), december, december]
+    return pa.table({
+        "tpep_pickup_datetime": pa.array(pickups, pa.timestamp("us")),
+        "tpep_dropoff_datetime": pa.array(
+            [datetime(2019, 12, 5, 11)] * 2 + [datetime(2019, 12, 5, 9)] + [datetime(2019, 12, 5, 11)] * 3,
+            pa.timestamp("us")
+        ),
+        "PULocationID": pa.array([1, 2, 3, 4, 999, None], pa.int16()),
+        "trip_distance": [1.5, 2.0, 1.0, 3.0, 2.0, 0.0],
+        "fare_amount": [10.0, -5.0, 7.0, None, 8.0, 3.0],
+    })
+
+
+class TestTripValidator:
+    """Test cases for validation module"""
+
+    def test_rules_split_valid_and_quarantined_rows(self, tmp_path):
+        """Test that failing rows are quarantined with their first reason and counted per rule"""
+        path = quarantine_path(tmp_path, "yellow_taxi_2019-12")
+        validator = TripValidator(
+            "tpep_pickup_datetime", "tpep_dropoff_datetime", path, month="2019-12",
+            location_ids=pa.array(range(1, 266), pa.int32())
+        )
+
+        valid = validator(trips_table())
+        summary = validator.close()
+
+        quarantined = pq.read_table(path)
+        assert valid["PULocationID"].to_pylist() == [1]
+        assert quarantined[REASON_COLUMN].to_pylist() == [
+            "negative_fare", "dropoff_before_pickup", "pickup_outside_month",
+            "unknown_pickup_location", "unknown_pickup_location",
+        ]
+        # The last row fails both unknown_pickup_location (null ID) and zero_distance
+        assert summary["rules"] == {
+            "negative_fare": 1, "dropoff_before_pickup": 1, "pickup_outside_month": 1,
+            "unknown_pickup_location": 2, "zero_distance": 1,
+        }
+        assert (summary["rows_checked"], summary["rows_quarantined"]) == (6, 5)
+        assert json.loads(path.with_suffix(".json").read_text()) == summary
+
+    def test_failed_reconversion_leaves_no_summary(self, tmp_path):
+        """Test that a failed conversion removes the previous quarantine and summary"""
+        path = quarantine_path(tmp_path, "yellow_taxi_2019-12")
+        first = TripValidator("tpep_pickup_datetime", "tpep_dropoff_datetime", path, month="2019-12")
+        first(trips_table())
+        first.close()
+        assert path.exists() and path.with_suffix(".json").exists()
+
+        second = TripValidator("tpep_pickup_datetime", "tpep_dropoff_datetime", path, month="2019-12")
+        second(trips_table().slice(0, 2))
+        second.close("failed")
+
+        assert not path.exists() and not path.with_suffix(".json").exists()
+        assert list(path.parent.iterdir()) == []
+
+    def test_rule_selection(self, tmp_path, monkeypatch):
+        """Test configured rules, rules skipped without context and unknown rule names"""
+        monkeypatch.setattr(Config, "VALIDATION_RULES", ["zero_distance", "pickup_outside_month"])
+        validator = TripValidator("tpep_pickup_datetime", "tpep_dropoff_datetime",
+                                  tmp_path / "q.parquet")
+
+        valid = validator(trips_table())
+        validator.close()
+
+        assert select_rules() == ["pickup_outside_month", "zero_distance"]
+        assert validator.rules == ["zero_distance"]
+        assert valid.num_rows == 5
+        with pytest.raises(ValueError, match="Unknown validation rules"):
+            select_rules(["zero_distance", "too_fast"])
+
+    @pytest.mark.parametrize("output_mode", ["single", "parts", "partitioned"])
+    @patch('src.extract.extract_parquet.Config.SPLIT_SIZE_BYTES', 100_000)
+    def test_run_extraction_quarantines_trips(self, tmp_path, output_mode):
+        """Test that trip outputs hold only valid rows and the rest is quarantined in the same pass"""
+        raw_dir = tmp_path / "raw"
+        raw_dir.mkdir()
+        write_yellow_trips(raw_dir / "yellow_tripdata_2019-12.csv", rows=3000)
+        write_zone_lookup(raw_dir / Config.TAXI_ZONE_CSV)
+
+        with metrics.recording(metrics.MetricsRecorder(run_id="run-3")) as recorder:
+            results = run_extraction(
+                raw_data_dir=str(raw_dir),
+                output_dir=str(tmp_path / "output"),
+                output_mode=output_mode,
+                validate=True
+            )
+
+        yellow = results[0]
+        output = pq.read_table(yellow["output"], columns=["PULocationID", "trip_distance"])
+        quarantined = pq.read_table(quarantine_path(tmp_path / "output", "yellow_taxi_2019-12"))
+        summary = json.loads(
+            (tmp_path / "output" / "quarantine" / "yellow_taxi_2019-12.json").read_text()
+        )
+        validate = [record for record in recorder.records if record["stage"] == "validate"]
+
+        assert yellow["rows"] + yellow["quarantined"] == 3000
+        assert output.num_rows == yellow["rows"] and quarantined.num_rows == yellow["quarantined"]
+        assert max(output["PULocationID"].to_pylist()) <= 200
+        assert min(output["trip_distance"].to_pylist()) > 0
+        assert summary["rows_quarantined"] == yellow["quarantined"]
+        assert summary["rules"]["unknown_pickup_location"] > 0
+        assert len(validate) == 1 and validate[0]["rows"] == 3000
+        assert validate[0]["details"]["rows_quarantined"] == yellow["quarantined"]
+
+    def test_parts_with_parse_workers_rejected(self, tmp_path):
+        """Test that validation of parts split across parsing workers fails instead of being skipped"""
+        raw_dir = tmp_path / "raw"
+        raw_dir.mkdir()
+        write_yellow_trips(raw_dir / "yellow_tripdata_2019-12.csv", rows=100)
+
+        with pytest.raises(ValueError, match="parse_workers=1"):
+            run_extraction(raw_data_dir=str(raw_dir), output_dir=str(tmp_path / "output"),
+                           output_mode="parts", parse_workers=2, validate=True)
@@ -0,0 +1,69 @@
+"""
+Unit tests for taxi zone enrichment
+"""
+import pytest
+from unittest.mock import patch
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.extract.extract_parquet import run_extraction
+from src.extract.zones import ZoneEnricher
+from src.utils.config import Config
+from tests.test_extract import write_yellow_trips
+
+
+def write_zone_lookup(path):
+    """Write a taxi zone lookup covering location IDs 1-200 with one empty zone"""
+    lines = ["LocationID,Borough,Zone,service_zone\n"]
+    for location_id in range(1, 201):
+        zone = "" if location_id == 200 else f"Zone {location_id}"
+        lines.append(f"{location_id},Borough {location_id % 5},{zone},Boro Zone\n")
+    path.write_text("".join(lines))
+
+
+class TestZoneEnricher:
+    """Test cases for zones module"""
+
+    def test_enrich_known_and_unknown_locations(self, tmp_path):
+        """Test lookups by location ID with UNKNOWN for nulls, gaps and out-of-range IDs"""
+        write_zone_lookup(tmp_path / "zones.csv")
+        enricher = ZoneEnricher.from_csv(str(tmp_path / "zones.csv"))
+        trips = pa.table({
+            "PULocationID": pa.array([1, 7, None, 250, -3, 200], pa.int16()),
+            "DOLocationID": pa.array([2, 2, 2, 2, 2, 0], pa.int16()),
+        })
+
+        enriched = enricher(trips)
+
+        assert enriched["pickup_zone"].to_pylist() == [
+            "Zone 1", "Zone 7", "UNKNOWN", "UNKNOWN", "UNKNOWN", "UNKNOWN"
+        ]
+        assert enriched["pickup_borough"].to_pylist()[:3] == ["Borough 1", "Borough 2", "UNKNOWN"]
+        assert enriched["dropoff_service_zone"].to_pylist()[-2:] == ["Boro Zone", "UNKNOWN"]
+        assert pa.types.is_dictionary(enriched.schema.field("dropoff_zone").type)
+
+    @pytest.mark.parametrize("output_mode", ["single", "parts"])
+    @patch('src.extract.extract_parquet.Config.SPLIT_SIZE_BYTES', 50_000)
+    def test_run_extraction_enriches_trips(self, tmp_path, output_mode):
+        """Test that trip outputs carry zone columns whether or not workers write them"""
+        raw_dir = tmp_path / "raw"
+        raw_dir.mkdir()
+        write_yellow_trips(raw_dir / Config.YELLOW_TAXI_CSV)
+        write_zone_lookup(raw_dir / Config.TAXI_ZONE_CSV)
+
+        results = run_extraction(
+            raw_data_dir=str(raw_dir),
+            output_dir=str(tmp_path / "output"),
+            output_mode=output_mode,
+            parse_workers=2,
+            enrich_zones=True
+        )
+
+        yellow = pq.read_table(results[0]["output"])
+        zones = pq.read_table(results[1]["output"])
+        pickup_ids = yellow["PULocationID"].to_pylist()
+        assert yellow.num_rows == 5000
+        assert yellow["pickup_zone"].to_pylist() == [
+            f"Zone {i}" if i < 200 else "UNKNOWN" for i in pickup_ids
+        ]
+        assert "pickup_zone" not in zones.column_names